@@ -0,0 +1,67 @@
+"""Compare the FETCH literal parser with the old candidate heuristic on 1 MB messages.
+
+Run from the repository root: ``python benchmarks/bench_fetch.py``.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from email_blog_fetch import iter_fetch_bodies  # noqa: E402
+from email_blog_messages import extract_fetch_message_bytes  # noqa: E402
+
+MESSAGE_BYTES = 1_048_576
+ROUNDS = 200
+
+
+def make_response(uid: int) -> list[bytes | bytearray]:
+    line = b"x" * 76 + b"\r\n"
+    raw = b"Subject: Big\r\n\r\n" + line * (MESSAGE_BYTES // len(line))
+    return [
+        f"{uid} FETCH (UID {uid} RFC822.SIZE {len(raw)} BODY[] {{{len(raw)}}}".encode(),
+        bytearray(raw),
+        b")",
+        b"FETCH completed.",
+    ]
+
+
+def legacy_extract(data: list) -> bytes | None:
+    """The previous parser: copy every item, then pick the largest message-like one."""
+    candidates = [bytes(item) for item in data if isinstance(item, (bytes, bytearray))]
+    message_candidates = [
+        item
+        for item in candidates
+        if (b"\r\n\r\n" in item or b"\n\n" in item) and not item.lstrip().startswith(b"* ")
+    ]
+    return max(message_candidates, key=len) if message_candidates else None
+
+
+def measure(label: str, extract, data) -> None:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        extract(data)
+    elapsed = time.perf_counter() - start
+    # Allocation is measured on a separate pass so tracing does not skew timings.
+    tracemalloc.start()
+    extract(data)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>10}: {elapsed / ROUNDS * 1e6:8.1f} us/response, peak {peak / 1024:8.1f} KiB")
+
+
+def main() -> None:
+    single = make_response(1)
+    multi = single[:-1] + make_response(2)
+    print(f"{ROUNDS} FETCH responses carrying a {MESSAGE_BYTES // 1024} KiB message")
+    measure("legacy", legacy_extract, single)
+    measure("literal", extract_fetch_message_bytes, single)
+    measure("multi-uid", lambda data: dict(iter_fetch_bodies(data)), multi)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measure mbox import throughput into a fresh post store.
+
+Run from the repository root: ``python benchmarks/bench_import.py [jobs]``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+from email.message import EmailMessage
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from email_blog_import import import_messages, iter_mbox_messages  # noqa: E402
+from email_blog_store import PostStore  # noqa: E402
+
+MESSAGES = 20_000
+
+
+def write_mbox(path: Path, count: int) -> None:
+    rng = random.Random(count)
+    with open(path, "wb") as handle:
+        for number in range(count):
+            msg = EmailMessage()
+            msg["From"] = f"writer{number % 50}@example.com"
+            msg["Subject"] = f"Post {number}"
+            msg["Date"] = f"Mon, 01 Jan 2024 {number % 24:02d}:00:00 +0000"
+            msg["Message-ID"] = f"<post-{number}@example.com>"
+            msg.set_content(" ".join(f"word{rng.randrange(5000)}" for _ in range(300)))
+            handle.write(b"From writer@example.com Mon Jan  1 00:00:00 2024\n")
+            handle.write(msg.as_bytes())
+            handle.write(b"\n")
+
+
+def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        mbox = Path(tmp) / "archive.mbox"
+        write_mbox(mbox, MESSAGES)
+        size_mib = mbox.stat().st_size / 2**20
+
+        started = time.perf_counter()
+        scanned = sum(1 for _ in iter_mbox_messages(mbox))
+        scan_seconds = time.perf_counter() - started
+        print(f"scan  {scanned} messages ({size_mib:.0f} MiB) in {scan_seconds:.2f}s")
+
+        store = PostStore(Path(tmp) / "posts.sqlite3")
+        started = time.perf_counter()
+        progress = import_messages(
+            iter_mbox_messages(mbox), store, jobs=jobs, on_progress=lambda _p: None
+        )
+        seconds = time.perf_counter() - started
+        store.close()
+        print(
+            f"import {progress.imported} messages with {jobs} jobs in {seconds:.2f}s "
+            f"({progress.imported * 60 / seconds:,.0f} messages/min)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure the post cache footprint with tracemalloc: dict records vs. EmailPost.
+
+Run from the repository root: ``python benchmarks/bench_post_memory.py``.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from email_blog_posts import EmailPost  # noqa: E402
+
+SENDERS = [f"Author {n} <author{n}@example.com>" for n in range(20)]
+WORDS = "the quick brown fox jumps over lazy dog email blog post newsletter update".split()
+
+
+def body(rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(5, 40)):
+        paragraphs.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))))
+    return "\n\n".join(paragraphs)
+
+
+def raw_records(count: int) -> list[dict[str, str]]:
+    rng = random.Random(count)
+    records = []
+    for uid in range(count):
+        content = body(rng)
+        records.append(
+            {
+                "subject": f"Post {uid}",
+                # Decoded headers are fresh strings per message, not shared objects.
+                "from": "".join(rng.choice(SENDERS)),
+                "date": "Mon, 01 Jan 2024 12:34:56 +0000",
+                "content": content,
+                "content_type": "text/plain",
+                "uid": str(uid),
+                "message_id": f"<{uid}@example.com>",
+                "html": content.replace("\n", "<br>"),
+            }
+        )
+    return records
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    cache = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del cache
+    return size
+
+
+def main() -> None:
+    for count in (100, 10_000):
+        dict_bytes = measure(lambda count=count: raw_records(count))
+        post_bytes = measure(
+            lambda count=count: [EmailPost.from_mapping(r) for r in raw_records(count)]
+        )
+        print(
+            f"{count:6d} posts  dict {dict_bytes / 1e6:8.2f} MB  "
+            f"EmailPost {post_bytes / 1e6:8.2f} MB  ({post_bytes / dict_bytes:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the bleach and stdlib sanitizer engines on a newsletter-sized HTML body.
+
+Run from the repository root: ``python benchmarks/bench_sanitizer.py``.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from email_blog_rendering import sanitize_html  # noqa: E402
+
+SECTION = """
+<table width="100%" style="background:#fff"><tr><td class="content">
+  <h2 style="font-family:Arial">Weekly update</h2>
+  <p style="margin:0">Read the <a href="https://example.com/post?id=1&amp;ref=mail"
+     onclick="track()">full story</a> or visit https://example.com/archive today.</p>
+  <ul><li>First <b>point</b></li><li>Second <em>point</em></li></ul>
+  <img src="https://tracker.example/pixel.gif" width="1" height="1">
+  <div><span>Unsubscribe</span> &middot; <a href="mailto:news@example.com">Contact</a></div>
+</td></tr></table>
+"""
+
+
+def newsletter(sections: int) -> str:
+    return "<html><head><style>p{color:red}</style></head><body>" + SECTION * sections
+
+
+def time_per_call(func, *args, runs: int = 5) -> float:
+    """Return the best-of-three seconds per call of ``func(*args)``."""
+    return min(timeit.repeat(lambda: func(*args), number=runs, repeat=3)) / runs
+
+
+def main() -> None:
+    for sections in (10, 100, 400):
+        body = newsletter(sections)
+        print(f"{len(body) / 1024:7.1f} KiB input")
+        results = {}
+        for engine in ("bleach", "stdlib"):
+            results[engine] = time_per_call(sanitize_html, body, engine)
+            print(f"  {engine:6s} {results[engine] * 1000:8.2f} ms/body")
+        print(f"  speedup {results['bleach'] / results['stdlib']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
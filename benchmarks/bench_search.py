@@ -0,0 +1,80 @@
+"""Measure search query latency against a 10k-post BM25 index.
+
+Run from the repository root: ``python benchmarks/bench_search.py``.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from email_blog_posts import EmailPost  # noqa: E402
+from email_blog_search import SEARCH_PAGE_SIZE, SearchIndex  # noqa: E402
+
+POSTS = 10_000
+QUERIES = ["kubernetes", "release notes", "invoice march", "word1", "zzz-missing"]
+# A Zipf-like vocabulary: a few very common words and a long tail of rare ones.
+VOCABULARY = [f"word{n}" for n in range(20_000)]
+COMMON = "the a of and to in is for on with".split()
+
+
+def make_posts(count: int) -> list[EmailPost]:
+    rng = random.Random(count)
+    posts = []
+    for uid in range(count):
+        words = [
+            (
+                rng.choice(COMMON)
+                if rng.random() < 0.4
+                else VOCABULARY[int(rng.paretovariate(1.1)) % len(VOCABULARY)]
+            )
+            for _ in range(rng.randint(50, 600))
+        ]
+        if uid % 50 == 0:
+            words += ["kubernetes", "release", "notes"]
+        if uid % 500 == 0:
+            words += ["invoice", "march"]
+        posts.append(
+            EmailPost(
+                uid=str(uid),
+                subject=f"Post {uid}",
+                sender=f"author{uid % 20}@example.com",
+                date="Mon, 01 Jan 2024 12:34:56 +0000",
+                content=" ".join(words),
+            )
+        )
+    return posts
+
+
+def time_query(index: SearchIndex, query: str, cold: bool, rounds: int = 200) -> float:
+    elapsed = 0.0
+    for _ in range(rounds):
+        if cold:
+            index._results.clear()
+        start = time.perf_counter()
+        index.search(query, limit=SEARCH_PAGE_SIZE)
+        elapsed += time.perf_counter() - start
+    return elapsed / rounds
+
+
+def main() -> None:
+    posts = make_posts(POSTS)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for post in posts:
+        index.add(post)
+    print(f"indexed {POSTS} posts in {time.perf_counter() - start:.2f}s")
+    index.search("warm")  # compute length norms once
+    for query in QUERIES:
+        _, total = index.search(query)
+        cold = time_query(index, query, cold=True) * 1e6
+        warm = time_query(index, query, cold=False) * 1e6
+        print(f"{query!r:16} {total:6d} hits  cold {cold:8.1f} us  cached {warm:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
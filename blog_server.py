@@ -1,15 +1,25 @@
+import argparse
 import asyncio
+import functools
 import logging
 import os
+from typing import Any
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 
+from email_blog_import import import_messages, iter_source_messages
 from email_blog_server import EmailBlogServer
+from email_blog_store import PostStore
+from email_blog_workers import run_leader
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Variables from the real environment; .env never overrides them, even on reload.
+PROCESS_ENV_KEYS = frozenset(os.environ)
+_dotenv_keys: set[str] = set()
+
 
 def parse_bool(value: str | None) -> bool:
     """Parse common truthy environment values."""
@@ -32,10 +42,81 @@ def parse_csv(name: str) -> list[str]:
     return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
 
 
-async def main() -> None:
-    """Load configuration and run the email blog server."""
-    # Load environment variables from .env file
+def reload_dotenv() -> None:
+    """Re-read .env so edits (including removed keys) apply to later ``os.getenv`` calls."""
+    values = {
+        key: value
+        for key, value in dotenv_values().items()
+        if value is not None and key not in PROCESS_ENV_KEYS
+    }
+    for key in _dotenv_keys - values.keys():
+        os.environ.pop(key, None)
+    os.environ.update(values)
+    _dotenv_keys.clear()
+    _dotenv_keys.update(values)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options that override environment settings."""
+    parser = argparse.ArgumentParser(description="Publish an IMAP mailbox as a blog.")
+    parser.add_argument(
+        "--export-dir",
+        help="write a static copy of the blog here after every ingest (env STATIC_EXPORT_DIR)",
+    )
+    parser.add_argument(
+        "--no-http",
+        action="store_true",
+        help="do not start the HTTP server, e.g. when nginx serves --export-dir (env SERVE_HTTP)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of SO_REUSEPORT HTTP worker processes (env WEB_WORKERS, default 1)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    importer = commands.add_parser(
+        "import", help="bulk-import mbox files or Maildir directories into the post store"
+    )
+    importer.add_argument("sources", nargs="+", help="mbox file or Maildir directory")
+    importer.add_argument("--store", help="post store database (env POST_STORE_PATH)")
+    importer.add_argument(
+        "--jobs", type=int, help="parser processes (env IMPORT_JOBS, default CPU count)"
+    )
+    return parser.parse_args(argv)
+
+
+def run_import(args: argparse.Namespace) -> None:
+    """Import mail archives into the post store and report totals."""
     load_dotenv()
+    store_path = args.store or os.getenv("POST_STORE_PATH")
+    if not store_path:
+        logger.error("Importing requires --store or POST_STORE_PATH")
+        raise SystemExit(1)
+    jobs = args.jobs or parse_int("IMPORT_JOBS", os.cpu_count() or 1)
+    store = PostStore(store_path)
+    try:
+        for source in args.sources:
+            logger.info("Importing %s into %s", source, store_path)
+            progress = import_messages(
+                iter_source_messages(source),
+                store,
+                jobs=jobs,
+                allowed_senders=parse_csv("ALLOWED_SENDERS"),
+                max_email_bytes=parse_int("MAX_EMAIL_BYTES", 1_048_576),
+                max_body_chars=parse_int("MAX_BODY_CHARS", 100_000),
+                media_dir=os.getenv("MEDIA_DIR") or None,
+            )
+            logger.info("Finished %s: %s", source, progress)
+    finally:
+        store.close()
+
+
+def load_config(args: argparse.Namespace) -> dict[str, Any]:
+    """Read the server settings from the environment and .env; exit if they are unusable.
+
+    Called once at startup and again on every SIGHUP.
+    """
+    reload_dotenv()
 
     # Get configuration from environment variables
     imap_server = os.getenv("IMAP_SERVER")
@@ -46,6 +127,8 @@ async def main() -> None:
     blog_title = os.getenv("BLOG_TITLE")
     public_url = os.getenv("PUBLIC_URL")
     render_mode = os.getenv("RENDER_MODE", "plain")
+    sanitizer = os.getenv("HTML_SANITIZER", "bleach")
+    code_guess_lang = parse_bool(os.getenv("MARKDOWN_GUESS_LANG", "true"))
     mailbox = os.getenv("IMAP_MAILBOX", "INBOX")
     access_token = os.getenv("BLOG_ACCESS_TOKEN")
     allowed_senders = parse_csv("ALLOWED_SENDERS")
@@ -53,35 +136,125 @@ async def main() -> None:
     max_body_chars = parse_int("MAX_BODY_CHARS", 100_000)
     allow_public_bind = parse_bool(os.getenv("ALLOW_PUBLIC_BIND"))
     allow_public_without_auth = parse_bool(os.getenv("ALLOW_PUBLIC_WITHOUT_AUTH"))
+    static_dir = args.export_dir or os.getenv("STATIC_EXPORT_DIR") or None
+    static_page_size = parse_int("STATIC_PAGE_SIZE", 20)
+    serve_http = not args.no_http and parse_bool(os.getenv("SERVE_HTTP", "true"))
+    ingest_fetch_concurrency = parse_int("INGEST_FETCH_CONCURRENCY", 1)
+    ingest_parse_concurrency = parse_int("INGEST_PARSE_CONCURRENCY", 2)
+    ingest_queue_size = parse_int("INGEST_QUEUE_SIZE", 16)
+    post_cache_max_bytes = parse_int("POST_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    render_cache_max_bytes = parse_int("RENDER_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+    search_index_path = os.getenv("SEARCH_INDEX_PATH") or None
+    excerpt_chars = parse_int("EXCERPT_CHARS", 0)
+    excerpt_blocks = parse_int("EXCERPT_BLOCKS", 3)
+    stale_while_revalidate = parse_bool(os.getenv("STALE_WHILE_REVALIDATE"))
+    ingest_token = os.getenv("INGEST_TOKEN") or None
+    lmtp_host = os.getenv("LMTP_HOST", "127.0.0.1")
+    lmtp_port = parse_int("LMTP_PORT", 0) or None
+    post_store_path = os.getenv("POST_STORE_PATH") or None
+    backfill_max_messages = parse_int("BACKFILL_MAX_MESSAGES", 0)
+    backfill_batch_size = parse_int("BACKFILL_BATCH_SIZE", 50)
+    backfill_rate = parse_int("BACKFILL_RATE", 60)
+    shed_loop_lag_ms = parse_int("SHED_LOOP_LAG_MS", 0)
+    shed_max_in_flight = parse_int("SHED_MAX_IN_FLIGHT", 0)
+    shed_retry_after = parse_int("SHED_RETRY_AFTER", 1)
+    ingest_tick_budget_ms = parse_int("INGEST_TICK_BUDGET_MS", 4)
+    ingest_max_defer_ms = parse_int("INGEST_MAX_DEFER_MS", 50)
+    media_dir = os.getenv("MEDIA_DIR") or None
+    live_updates = parse_bool(os.getenv("LIVE_UPDATES"))
+    sse_heartbeat = parse_int("SSE_HEARTBEAT", 15)
+    sse_max_clients = parse_int("SSE_MAX_CLIENTS", 10_000)
+    imap_trace_buffer = parse_int("IMAP_TRACE_BUFFER", 0)
+    imap_trace_file = os.getenv("IMAP_TRACE_FILE") or None
+    imap_trace_file_bytes = parse_int("IMAP_TRACE_FILE_BYTES", 10 * 1024 * 1024)
+    imap_slow_ms = parse_int("IMAP_SLOW_MS", 0)
+    admin_token = os.getenv("ADMIN_TOKEN") or None
 
     if not all([imap_server, email_addr, password]):
         logger.error("Please set IMAP_SERVER, EMAIL, and PASSWORD in your .env file")
         raise SystemExit(1)
+    if not serve_http and not static_dir:
+        logger.error("Disabling HTTP requires STATIC_EXPORT_DIR or --export-dir")
+        raise SystemExit(1)
+
+    return {
+        "imap_server": imap_server,
+        "email_addr": email_addr,
+        "password": password,
+        "host": host,
+        "port": port,
+        "blog_title": blog_title,
+        "public_url": public_url,
+        "render_mode": render_mode,
+        "sanitizer": sanitizer,
+        "code_guess_lang": code_guess_lang,
+        "mailbox": mailbox,
+        "access_token": access_token,
+        "allowed_senders": allowed_senders,
+        "max_email_bytes": max_email_bytes,
+        "max_body_chars": max_body_chars,
+        "allow_public_bind": allow_public_bind,
+        "allow_public_without_auth": allow_public_without_auth,
+        "serve_http": serve_http,
+        "static_dir": static_dir,
+        "static_page_size": static_page_size,
+        "ingest_fetch_concurrency": ingest_fetch_concurrency,
+        "ingest_parse_concurrency": ingest_parse_concurrency,
+        "ingest_queue_size": ingest_queue_size,
+        "post_cache_max_bytes": post_cache_max_bytes,
+        "render_cache_max_bytes": render_cache_max_bytes,
+        "search_index_path": search_index_path,
+        "excerpt_chars": excerpt_chars,
+        "excerpt_blocks": excerpt_blocks,
+        "stale_while_revalidate": stale_while_revalidate,
+        "ingest_token": ingest_token,
+        "lmtp_host": lmtp_host,
+        "lmtp_port": lmtp_port,
+        "post_store_path": post_store_path,
+        "backfill_max_messages": backfill_max_messages,
+        "backfill_batch_size": backfill_batch_size,
+        "backfill_rate": backfill_rate,
+        "shed_loop_lag_ms": shed_loop_lag_ms,
+        "shed_max_in_flight": shed_max_in_flight,
+        "shed_retry_after": shed_retry_after,
+        "ingest_tick_budget_ms": ingest_tick_budget_ms,
+        "ingest_max_defer_ms": ingest_max_defer_ms,
+        "media_dir": media_dir,
+        "live_updates": live_updates,
+        "sse_heartbeat": sse_heartbeat,
+        "sse_max_clients": sse_max_clients,
+        "imap_trace_buffer": imap_trace_buffer,
+        "imap_trace_file": imap_trace_file,
+        "imap_trace_file_bytes": imap_trace_file_bytes,
+        "imap_slow_ms": imap_slow_ms,
+        "admin_token": admin_token,
+    }
+
+
+async def main(args: argparse.Namespace | None = None) -> None:
+    """Load configuration and run the email blog server."""
+    args = args or parse_args([])
+    server_kwargs = load_config(args)
+    config_loader = functools.partial(load_config, args)
+    web_workers = args.workers or parse_int("WEB_WORKERS", 1)
+    if server_kwargs["serve_http"] and web_workers > 1:
+        # One ingest leader plus N SO_REUSEPORT HTTP workers
+        await run_leader(server_kwargs, web_workers, config_loader)
+        return
 
     # Create and start the server
-    server = EmailBlogServer(
-        imap_server,
-        email_addr,
-        password,
-        host,
-        port,
-        blog_title,
-        public_url=public_url,
-        render_mode=render_mode,
-        mailbox=mailbox,
-        access_token=access_token,
-        allowed_senders=allowed_senders,
-        max_email_bytes=max_email_bytes,
-        max_body_chars=max_body_chars,
-        allow_public_bind=allow_public_bind,
-        allow_public_without_auth=allow_public_without_auth,
-    )
+    server = EmailBlogServer(**server_kwargs)
+    server.config_loader = config_loader
     await server.start()
     await server.wait_closed()
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        cli_args = parse_args()
+        if cli_args.command == "import":
+            run_import(cli_args)
+        else:
+            asyncio.run(main(cli_args))
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
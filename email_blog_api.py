@@ -0,0 +1,88 @@
+"""Select and serialize posts for the JSON API."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from urllib.parse import quote
+
+from email_blog_posts import EmailPost
+
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+class CursorNotFound(LookupError):
+    """The ``after``/``before`` cursor names a post that is no longer cached."""
+
+
+def post_json_prefix(post: EmailPost) -> bytes:
+    """Encode a post's summary fields as a JSON object missing its closing brace.
+
+    Callers cache this per post and finish it with ``finish_post_json``, so
+    optional fields such as the rendered HTML are appended without
+    re-encoding the rest.
+    """
+    fields = {
+        "uid": post.uid,
+        "url": f"/email/{quote(post.slug, safe='')}",
+        "subject": post.subject,
+        "sender": post.sender,
+        "date": post.date,
+        "timestamp": post.timestamp,
+        "message_id": post.message_id,
+        "excerpt": post.excerpt,
+    }
+    return json.dumps(fields, **_COMPACT).encode("utf-8")[:-1]
+
+
+def finish_post_json(prefix: bytes, **extra: object) -> bytes:
+    """Close a cached post prefix, appending ``extra`` fields."""
+    if not extra:
+        return prefix + b"}"
+    return prefix + b"," + json.dumps(extra, **_COMPACT).encode("utf-8")[1:]
+
+
+def select_posts(
+    posts: Iterable[EmailPost],
+    limit: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> tuple[list[EmailPost], bool]:
+    """Pick one page from newest-first ``posts``; return it and whether more remain.
+
+    ``after`` selects the ``limit`` posts published right after that UID,
+    oldest first, so a client can keep polling with the last UID it saw.
+    ``before`` continues a newest-first listing past that UID. Only the posts
+    up to the cursor are visited, so a poll with nothing new is O(1).
+    """
+    if after is not None:
+        newer = []
+        for post in posts:
+            if post.uid == after:
+                newer.reverse()
+                return newer[:limit], len(newer) > limit
+            newer.append(post)
+        raise CursorNotFound(after)
+
+    iterator = iter(posts)
+    if before is not None:
+        for post in iterator:
+            if post.uid == before:
+                break
+        else:
+            raise CursorNotFound(before)
+    page = []
+    for post in iterator:
+        if len(page) == limit:
+            return page, True
+        page.append(post)
+    return page, False
+
+
+def encode_listing(items: list[bytes], **fields: object) -> bytes:
+    """Join encoded posts into ``{"posts": [...], **fields}``."""
+    tail = json.dumps(fields, **_COMPACT).encode("utf-8")[1:] if fields else b"}"
+    separator = b"," if fields else b""
+    return b'{"posts":[' + b",".join(items) + b"]" + separator + tail
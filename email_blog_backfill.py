@@ -0,0 +1,100 @@
+"""Backfill older mailbox history slowly, without competing with live ingest."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKFILL_BATCH_SIZE = 50
+DEFAULT_BACKFILL_RATE = 60
+BACKFILL_CURSOR_KEY = "backfill_cursor"
+
+
+class HistoryBackfill:
+    """Fetch older UIDs newest-to-oldest in batches, at most ``rate`` messages a minute.
+
+    Only the newest ``max_messages`` UIDs in the mailbox are considered. Before
+    each message the backfill waits for ``live_idle`` to be set, so live ingest
+    always goes first. After each batch ``publish`` receives the parsed posts
+    and the cursor (``"<uidvalidity>:<lowest uid done>"``) is saved, so a
+    restart resumes below the last finished batch; a cursor saved for another
+    UIDVALIDITY is ignored. ``publish``, ``skip`` and the cursor callbacks may
+    be coroutine functions, so store I/O can run off the event loop.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[bytes | None]],
+        parse: Callable[[str, bytes], Awaitable[Any]],
+        publish: Callable[[list[Any]], Awaitable[None] | None],
+        load_cursor: Callable[[], Awaitable[str | None] | str | None],
+        save_cursor: Callable[[str], Awaitable[None] | None],
+        live_idle: asyncio.Event,
+        skip: Callable[[str], Awaitable[bool] | bool] = lambda uid: False,
+        batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+        rate: int = DEFAULT_BACKFILL_RATE,
+        max_messages: int = 0,
+    ):
+        self.fetch = fetch
+        self.parse = parse
+        self.publish = publish
+        self.load_cursor = load_cursor
+        self.save_cursor = save_cursor
+        self.live_idle = live_idle
+        self.skip = skip
+        self.batch_size = max(1, batch_size)
+        self.rate = max(1, rate)
+        self.max_messages = max(0, max_messages)
+
+    def pending_uids(
+        self, uids: list[str], uid_validity: str | None, cursor: str | None
+    ) -> list[str]:
+        """Return the UIDs still to backfill below ``cursor``, newest first."""
+        ordered = sorted(uids, key=int)[-self.max_messages :] if self.max_messages else []
+        cursor_validity, _, cursor_uid = (cursor or "").partition(":")
+        if cursor_uid.isdigit() and cursor_validity == (uid_validity or ""):
+            ordered = [uid for uid in ordered if int(uid) < int(cursor_uid)]
+        return ordered[::-1]
+
+    async def run(self, uids: list[str], uid_validity: str | None) -> int:
+        """Backfill ``uids`` (all UIDs in the mailbox); return how many posts were published."""
+        cursor = await _settle(self.load_cursor()) if self.max_messages else None
+        pending = self.pending_uids(uids, uid_validity, cursor)
+        if pending:
+            logger.info("Backfilling %s older messages", len(pending))
+        published = 0
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            started = time.monotonic()
+            posts = []
+            fetched = 0
+            for uid in batch:
+                if await _settle(self.skip(uid)):
+                    continue
+                await self.live_idle.wait()
+                fetched += 1
+                raw = await self.fetch(uid)
+                post = await self.parse(uid, raw) if raw is not None else None
+                if post is not None:
+                    posts.append(post)
+            if posts:
+                await _settle(self.publish(posts))
+                published += len(posts)
+            await _settle(self.save_cursor(f"{uid_validity or ''}:{batch[-1]}"))
+            if fetched:
+                await asyncio.sleep(
+                    max(0.0, fetched * 60 / self.rate - (time.monotonic() - started))
+                )
+        if pending:
+            logger.info("History backfill finished: %s posts published", published)
+        return published
+
+
+async def _settle(result: Any) -> Any:
+    """Await ``result`` if a callback returned a coroutine."""
+    return await result if asyncio.iscoroutine(result) else result
@@ -0,0 +1,227 @@
+"""Bound the post and render caches by approximate memory use."""
+
+from __future__ import annotations
+
+import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+from email_blog_posts import EmailPost, as_post
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POST_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_RENDER_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class PostCache:
+    """Newest-first post cache that evicts the oldest posts beyond a byte budget.
+
+    Each record is charged ``post.nbytes()`` on insert and refunded on removal;
+    ``touch`` re-charges it after a derived field such as the excerpt changes.
+    The newest post is always kept, even when it alone exceeds the budget.
+    ``on_evict`` is called with every post dropped to make room so secondary
+    structures can forget it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_POST_CACHE_BYTES,
+        on_evict: Callable[[EmailPost], None] | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.nbytes = 0
+        # Keyed by UID, newest first, so lookups, removals and evictions are all O(1).
+        self._posts: OrderedDict[str, EmailPost] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+
+    def appendleft(self, post: EmailPost | Mapping[str, Any]) -> EmailPost:
+        """Insert a post as the newest entry and evict the oldest ones over budget."""
+        post = as_post(post)
+        self.remove(post.uid)
+        self._posts[post.uid] = post
+        self._posts.move_to_end(post.uid, last=False)
+        self._account(post)
+        self._evict()
+        return post
+
+    def append(self, post: EmailPost | Mapping[str, Any]) -> EmailPost:
+        """Insert a post as the oldest entry (used when backfilling history)."""
+        post = as_post(post)
+        self.remove(post.uid)
+        self._posts[post.uid] = post
+        self._account(post)
+        self._evict()
+        return post
+
+    def get(self, uid: str) -> EmailPost | None:
+        """Return the cached post with this UID, if any."""
+        return self._posts.get(uid)
+
+    def remove(self, uid: str) -> EmailPost | None:
+        """Drop one post by UID without calling ``on_evict``."""
+        post = self._posts.pop(uid, None)
+        if post is None:
+            return None
+        self.nbytes -= self._sizes.pop(uid)
+        return post
+
+    def touch(self, post: EmailPost) -> None:
+        """Re-charge a cached post whose size changed, evicting the oldest posts if needed."""
+        size = self._sizes.get(post.uid)
+        if size is None or self._posts[post.uid] is not post:
+            return
+        new_size = post.nbytes()
+        if new_size == size:
+            return
+        self._sizes[post.uid] = new_size
+        self.nbytes += new_size - size
+        self._evict()
+
+    def rename(self, uids: Mapping[str, str]) -> None:
+        """Move cached posts to new UIDs (``{old: new}``), keeping their order.
+
+        Every old UID is released before any new one is claimed, so a post may
+        take a UID another renamed post is giving up. A post still holding a
+        claimed UID is replaced (and refunded) like a re-inserted one.
+        """
+        moving = [uid for uid in uids if uid in self._posts]
+        if not moving:
+            return
+        for uid in moving:
+            self.nbytes -= self._sizes.pop(uid)
+        claimed = {uids[uid] for uid in moving}
+        for uid in claimed - uids.keys():
+            if uid in self._posts:
+                self.nbytes -= self._sizes.pop(uid)
+        posts, self._posts = self._posts, OrderedDict()
+        for uid, post in posts.items():
+            if uid in uids:
+                post.uid = uids[uid]
+                self._posts[post.uid] = post
+                self._account(post)
+            elif uid not in claimed:
+                self._posts[uid] = post
+
+    def clear(self) -> None:
+        self._posts.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+    def __iter__(self) -> Iterator[EmailPost]:
+        return iter(self._posts.values())
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._posts
+
+    def _account(self, post: EmailPost) -> None:
+        size = post.nbytes()
+        self.nbytes += size - self._sizes.get(post.uid, 0)
+        self._sizes[post.uid] = size
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes and len(self._posts) > 1:
+            uid, post = self._posts.popitem()
+            self.nbytes -= self._sizes.pop(uid)
+            logger.debug("Evicted post %s from cache (%s bytes in use)", uid, self.nbytes)
+            if self.on_evict:
+                self.on_evict(post)
+
+
+class RenderCache:
+    """LRU byte budget shared by rendered post fragments and cached whole pages.
+
+    Fragments stay on their ``EmailPost`` (``post.html``); evicting one simply
+    clears that attribute so it is re-rendered the next time it is needed.
+    Pages are stored here, tagged with the cache generation they were built for.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._fragments: dict[str, EmailPost] = {}
+        self._pages: dict[str, tuple[int, str]] = {}
+
+    def touch_fragment(self, post: EmailPost) -> None:
+        """Charge (or refresh) the rendered fragment attached to ``post``."""
+        if post.html is None:
+            self.drop_fragment(post.uid)
+            return
+        key = ("fragment", post.uid)
+        self._fragments[post.uid] = post
+        self._charge(key, sys.getsizeof(post.html))
+
+    def drop_fragment(self, uid: str) -> None:
+        """Forget a fragment's accounting, e.g. when its post leaves the cache."""
+        self._fragments.pop(uid, None)
+        self._release(("fragment", uid))
+
+    def get_page(self, name: str, generation: int) -> str | None:
+        """Return a cached page if it was built for ``generation``."""
+        cached = self._pages.get(name)
+        if cached is None or cached[0] != generation:
+            return None
+        self._entries.move_to_end(("page", name))
+        return cached[1]
+
+    def get_stale_page(self, name: str) -> str | None:
+        """Return the cached page for ``name`` whatever generation it was built for."""
+        cached = self._pages.get(name)
+        return cached[1] if cached else None
+
+    def put_page(self, name: str, generation: int, text: str) -> None:
+        self._pages[name] = (generation, text)
+        self._charge(("page", name), sys.getsizeof(text))
+
+    def clear_pages(self) -> None:
+        for name in list(self._pages):
+            del self._pages[name]
+            self._release(("page", name))
+
+    def clear(self) -> None:
+        for post in self._fragments.values():
+            post.html = None
+        self._fragments.clear()
+        self._pages.clear()
+        self._entries.clear()
+        self.nbytes = 0
+
+    @property
+    def fragment_count(self) -> int:
+        return len(self._fragments)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def _charge(self, key: tuple[str, str], size: int) -> None:
+        self.nbytes += size - self._entries.get(key, 0)
+        self._entries[key] = size
+        self._entries.move_to_end(key)
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            oldest, _ = next(iter(self._entries.items()))
+            if oldest == key:
+                break
+            self._evict(oldest)
+
+    def _release(self, key: tuple[str, str]) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.nbytes -= size
+
+    def _evict(self, key: tuple[str, str]) -> None:
+        kind, name = key
+        self._release(key)
+        if kind == "fragment":
+            post = self._fragments.pop(name, None)
+            if post is not None:
+                post.html = None
+        else:
+            self._pages.pop(name, None)
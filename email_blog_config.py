@@ -8,7 +8,11 @@ from urllib.parse import urlparse
 
 from aiohttp import web
 
-CONTENT_SECURITY_POLICY = "default-src 'none'; style-src 'unsafe-inline'; base-uri 'self';"
+CONTENT_SECURITY_POLICY = (
+    "default-src 'none'; style-src 'unsafe-inline'; img-src 'self'; base-uri 'self';"
+)
+# Pages that load the live-update script also need same-origin scripts and EventSource.
+LIVE_CONTENT_SECURITY_POLICY = CONTENT_SECURITY_POLICY + " script-src 'self'; connect-src 'self';"
 DEFAULT_MAX_EMAIL_BYTES = 1_048_576
 DEFAULT_MAX_BODY_CHARS = 100_000
 
@@ -0,0 +1,135 @@
+"""Fan out live post notifications to Server-Sent Events subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_SECONDS = 15
+DEFAULT_MAX_CLIENTS = 10_000
+# Messages a subscriber may fall behind by before it is disconnected.
+SUBSCRIBER_QUEUE_SIZE = 16
+RECONNECT_MS = 5_000
+HEARTBEAT_MESSAGE = b": keepalive\n\n"
+
+
+class Subscriber:
+    """One connected event stream: a short queue of encoded messages and a wakeup."""
+
+    __slots__ = ("messages", "ready", "dropped", "_on_drop")
+
+    def __init__(self, on_drop: Callable[[], None] | None = None):
+        self.messages: deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        self.dropped = False
+        self._on_drop = on_drop
+
+    def take(self) -> list[bytes]:
+        """Return and clear the queued messages."""
+        self.ready.clear()
+        messages = list(self.messages)
+        self.messages.clear()
+        return messages
+
+    def _offer(self, message: bytes) -> bool:
+        if len(self.messages) >= SUBSCRIBER_QUEUE_SIZE:
+            return False
+        self.messages.append(message)
+        self.ready.set()
+        return True
+
+    def _drop(self) -> None:
+        self.dropped = True
+        self.messages.clear()
+        self.ready.set()
+        if self._on_drop:
+            self._on_drop()
+
+
+class EventBroadcaster:
+    """Deliver each published event to every subscriber, encoded once.
+
+    An idle subscriber costs a deque and an ``asyncio.Event``; there is no
+    task or timer per connection. One heartbeat task writes an SSE comment to
+    everyone every ``heartbeat`` seconds, which keeps proxies from closing
+    idle streams and reveals clients that went away. A subscriber more than
+    ``SUBSCRIBER_QUEUE_SIZE`` messages behind is dropped rather than buffered.
+    """
+
+    def __init__(
+        self,
+        heartbeat: float = DEFAULT_HEARTBEAT_SECONDS,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+    ):
+        self.heartbeat = max(1.0, heartbeat)
+        self.max_clients = max(1, max_clients)
+        self.dropped_total = 0
+        self._subscribers: set[Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_clients
+
+    def subscribe(self, on_drop: Callable[[], None] | None = None) -> Subscriber:
+        """Register a subscriber; ``on_drop`` is called if it is disconnected for lagging."""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(on_drop)
+        self._subscribers.add(subscriber)
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._send_heartbeats())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: str) -> None:
+        """Send one event to every subscriber; safe to call from any thread."""
+        if not self._subscribers or self._loop is None:
+            return
+        lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+        message = f"event: {event}\n{lines}\n".encode()
+        if _running_loop() is self._loop:
+            self._deliver(message)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, message)
+
+    async def close(self) -> None:
+        """Disconnect every subscriber and stop the heartbeat."""
+        for subscriber in list(self._subscribers):
+            subscriber.dropped = True
+            subscriber.ready.set()
+        self._subscribers.clear()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+
+    def _deliver(self, message: bytes) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber._offer(message):
+                continue
+            logger.debug("Dropping event stream subscriber that fell behind")
+            self._subscribers.discard(subscriber)
+            self.dropped_total += 1
+            subscriber._drop()
+
+    async def _send_heartbeats(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._deliver(HEARTBEAT_MESSAGE)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -0,0 +1,114 @@
+"""Truncate rendered post HTML into a short, well-formed excerpt."""
+
+from __future__ import annotations
+
+import html
+from html.parser import HTMLParser
+
+from email_blog_sanitizer import VOID_TAGS
+
+DEFAULT_EXCERPT_BLOCKS = 3
+ELLIPSIS = "…"
+EXCERPT_BLOCK_TAGS = frozenset(
+    {"p", "pre", "blockquote", "ul", "ol", "table", "div", "hr", "h1", "h2", "h3", "h4", "h5", "h6"}
+)
+
+
+class ExcerptBuilder(HTMLParser):
+    """Copy HTML until a text or block budget is spent, then close every open tag.
+
+    ``max_chars`` counts visible text characters; text is cut at a word boundary
+    and ends with an ellipsis. ``max_blocks`` counts top-level block elements
+    (and blank-line breaks in plain-text renders, which are ``<br><br>`` runs).
+    Input is expected to be sanitized output, so start tags are copied verbatim.
+    """
+
+    def __init__(self, max_chars: int, max_blocks: int = DEFAULT_EXCERPT_BLOCKS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.max_blocks = max(1, max_blocks)
+        self._out: list[str] = []
+        self._open: list[str] = []
+        self._chars = 0
+        self._blocks = 0
+        self._previous_br = False
+        self._done = False
+        self.truncated = False
+
+    def build(self, html_in: str) -> str | None:
+        """Return the excerpt, or None when the whole fragment fits the budget."""
+        self.feed(html_in)
+        self.close()
+        while self._open:
+            self._out.append(f"</{self._open.pop()}>")
+        if not self.truncated:
+            return None
+        excerpt = "".join(self._out).strip()
+        while excerpt.endswith("<br>"):
+            excerpt = excerpt.removesuffix("<br>").rstrip()
+        return excerpt
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._done:
+            self.truncated = True
+            return
+        self._out.append(self.get_starttag_text() or f"<{tag}>")
+        if tag == "br" and not self._open:
+            if self._previous_br:
+                self._end_block()
+            self._previous_br = True
+            return
+        self._previous_br = False
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+        elif tag in EXCERPT_BLOCK_TAGS and not self._open:
+            self._end_block()
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and not self._done:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._done or tag not in self._open:
+            return
+        while self._open:
+            current = self._open.pop()
+            self._out.append(f"</{current}>")
+            if current == tag:
+                break
+        if not self._open and tag in EXCERPT_BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data: str) -> None:
+        if self._done:
+            self.truncated = self.truncated or bool(data.strip())
+            return
+        if data.strip():
+            self._previous_br = False
+        remaining = self.max_chars - self._chars
+        if len(data) <= remaining:
+            self._chars += len(data)
+            self._out.append(html.escape(data, quote=False))
+            return
+        cut = data[:remaining]
+        if not data[remaining].isspace() and " " in cut:
+            cut = cut.rsplit(" ", 1)[0]
+        self._out.append(html.escape(cut.rstrip(), quote=False) + ELLIPSIS)
+        self._done = self.truncated = True
+
+    def _end_block(self) -> None:
+        self._blocks += 1
+        if self._blocks >= self.max_blocks:
+            self._done = True
+
+
+def build_excerpt(
+    html_in: str,
+    max_chars: int,
+    max_blocks: int = DEFAULT_EXCERPT_BLOCKS,
+) -> str | None:
+    """Return a well-formed excerpt of ``html_in``, or None if it is already short."""
+    if max_chars <= 0:
+        return None
+    return ExcerptBuilder(max_chars, max_blocks).build(html_in)
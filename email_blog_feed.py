@@ -3,11 +3,18 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from email.utils import formatdate, parsedate_to_datetime
+from email.utils import formatdate
 from xml.etree import ElementTree
 
+from email_blog_posts import EmailPost
 
-def build_rss(emails: list[dict[str, str]], blog_title: str, base_url: str) -> str:
+
+def build_rss(
+    emails: list[EmailPost],
+    blog_title: str,
+    base_url: str,
+    last_build_date: str | None = None,
+) -> str:
     """Build an XML-safe RSS 2.0 feed for cached email posts."""
     root = ElementTree.Element("rss", version="2.0")
     channel = ElementTree.SubElement(root, "channel")
@@ -15,17 +22,17 @@ def build_rss(emails: list[dict[str, str]], blog_title: str, base_url: str) -> s
     _add_text(channel, "link", base_url)
     _add_text(channel, "description", blog_title)
     _add_text(channel, "language", "en-us")
-    _add_text(channel, "lastBuildDate", formatdate(usegmt=True))
+    _add_text(channel, "lastBuildDate", last_build_date or formatdate(usegmt=True))
 
-    for email_data in emails:
+    for post in emails:
         item = ElementTree.SubElement(channel, "item")
-        post_url = f"{base_url}/email/{email_data['uid']}"
-        _add_text(item, "title", email_data["subject"])
+        post_url = f"{base_url}/email/{post.slug}"
+        _add_text(item, "title", post.subject)
         _add_text(item, "link", post_url)
         _add_text(item, "guid", post_url)
-        _add_text(item, "description", email_data["content"])
-        _add_text(item, "author", email_data["from"])
-        _add_text(item, "pubDate", _rss_date(email_data.get("date", "")))
+        _add_text(item, "description", post.content)
+        _add_text(item, "author", post.sender)
+        _add_text(item, "pubDate", _rss_date(post.timestamp))
 
     xml_body = ElementTree.tostring(root, encoding="unicode", short_empty_elements=False)
     return f'<?xml version="1.0" encoding="UTF-8" ?>\n{xml_body}'
@@ -36,14 +43,7 @@ def _add_text(parent: ElementTree.Element, tag: str, text: str) -> None:
     child.text = text or ""
 
 
-def _rss_date(date_text: str) -> str:
-    try:
-        dt = parsedate_to_datetime(date_text)
-        if dt is None:
-            raise ValueError("parsedate_to_datetime returned None")
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=UTC)
-        timestamp = float(dt.timestamp())
-    except Exception:
-        timestamp = float(datetime.now(tz=UTC).timestamp())
+def _rss_date(timestamp: float | None) -> str:
+    if timestamp is None:
+        timestamp = datetime.now(tz=UTC).timestamp()
     return formatdate(timestamp, usegmt=True)
@@ -0,0 +1,146 @@
+"""Parse IMAP FETCH responses without copying message literals."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+_FETCH_START = re.compile(rb"\s*(?:\*\s+)?(\d+)\s+FETCH\s+\(", re.IGNORECASE)
+# One token: atom (with an optional [section] and <origin>), paren, quoted string, or literal.
+_TOKEN = re.compile(
+    rb"""[ \t]*(?:
+        (?P<atom>[^\s()\[\]{}"]+(?:\[[^\]]*\](?:<\d+>)?)?)
+        |(?P<open>\()
+        |(?P<close>\))
+        |"(?P<quoted>(?:[^"\\]|\\.)*)"
+        |\{(?P<literal>\d+)\+?\}(?:\r?\n)?
+    )""",
+    re.VERBOSE,
+)
+_QUOTED_ESCAPE = re.compile(rb"\\(.)")
+
+
+class FetchResponse:
+    """The attributes of one ``* <seq> FETCH (...)`` response.
+
+    Keys are upper-cased attribute names (``UID``, ``RFC822.SIZE``, ``BODY[]``).
+    Numbers become ``int``, ``NIL`` becomes None, strings and atoms ``str``,
+    parenthesized lists their raw ``bytes``, and literals a ``memoryview``
+    into the buffer the IMAP client returned.
+    """
+
+    __slots__ = ("seq", "attributes")
+
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.attributes: dict[str, object] = {}
+
+    @property
+    def uid(self) -> int | None:
+        uid = self.attributes.get("UID")
+        return uid if isinstance(uid, int) else None
+
+    @property
+    def size(self) -> int | None:
+        size = self.attributes.get("RFC822.SIZE")
+        return size if isinstance(size, int) else None
+
+    def body(self) -> memoryview | None:
+        """Return the first full-message literal (``BODY[]``, ``BODY[]<0>`` or ``RFC822``)."""
+        for name, value in self.attributes.items():
+            if isinstance(value, memoryview) and (name.startswith("BODY[]") or name == "RFC822"):
+                return value
+        return None
+
+
+def parse_fetch_response(data: object) -> list[FetchResponse]:
+    """Parse every FETCH response in an IMAP client's response lines.
+
+    Literals are returned as ``memoryview`` slices. A literal inside a line
+    buffer is cut at exactly the ``{n}`` bytes its marker announces; one at
+    the end of a line is the following item, which aioimaplib has already
+    read as a separate ``bytearray`` of the literal's length.
+    Lines that are not part of a FETCH response, such as the tagged status,
+    are skipped.
+    """
+    items = data if isinstance(data, (list, tuple)) else [data]
+    responses: list[FetchResponse] = []
+    current: FetchResponse | None = None
+    name: str | None = None
+    depth = 0
+    list_start: tuple[object, int] | None = None
+    index = 0
+    while index < len(items):
+        item = items[index]
+        index += 1
+        if not isinstance(item, (bytes, bytearray)):
+            continue
+        pos = 0
+        if current is None:
+            match = _FETCH_START.match(item)
+            if match is None:
+                continue
+            current = FetchResponse(int(match.group(1)))
+            responses.append(current)
+            pos, depth, name = match.end(), 1, None
+        view = memoryview(item)
+        while current is not None and (match := _TOKEN.match(item, pos)) and match.end() > pos:
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "literal":
+                size = int(match.group("literal"))
+                if len(item) - pos >= size and pos < len(item):
+                    value: object = view[pos : pos + size]
+                    pos += size
+                else:
+                    following = items[index] if index < len(items) else None
+                    index += 1
+                    # The client already framed this literal as its own buffer.
+                    value = memoryview(following) if following is not None else None
+                    # Parsing resumes on the next line, not after the literal.
+                    pos = len(item)
+            elif kind == "open":
+                if depth == 1:
+                    list_start = (item, pos - 1)
+                depth += 1
+                continue
+            elif kind == "close":
+                depth -= 1
+                if depth == 0:
+                    current = None
+                    break
+                if depth > 1 or list_start is None:
+                    continue
+                start_item, start = list_start
+                list_start = None
+                value = bytes(item[start:pos]) if start_item is item else None
+            elif depth > 1:
+                continue
+            elif kind == "quoted":
+                value = _QUOTED_ESCAPE.sub(rb"\1", match.group("quoted")).decode("utf-8", "replace")
+            else:
+                value = _atom_value(match.group("atom"))
+            if depth > 1:
+                continue
+            if name is None:
+                name = str(value).upper() if value is not None else "NIL"
+            else:
+                current.attributes[name] = value
+                name = None
+    return responses
+
+
+def iter_fetch_bodies(data: object) -> Iterator[tuple[int | None, memoryview]]:
+    """Yield ``(uid, body)`` for every FETCH response that carries a message literal."""
+    for response in parse_fetch_response(data):
+        body = response.body()
+        if body is not None:
+            yield response.uid, body
+
+
+def _atom_value(atom: bytes) -> object:
+    if atom.isdigit():
+        return int(atom)
+    if atom.upper() == b"NIL":
+        return None
+    return atom.decode("ascii", "replace")
@@ -3,61 +3,150 @@
 from __future__ import annotations
 
 import html
+import re
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import quote
 
+from email_blog_config import CONTENT_SECURITY_POLICY, LIVE_CONTENT_SECURITY_POLICY
+from email_blog_indexes import month_key, sender_key
+from email_blog_posts import EmailPost
 from email_blog_rendering import render_content_to_html
 
+PLACEHOLDER_PATTERN = re.compile(
+    r"\{(?:title|search_form|last_updated|email_content|content_security_policy|live_script)\}"
+)
+LIVE_SCRIPT_URL = "/live_updates.js"
+
 
 def build_blog_html(
     template_path: Path,
     blog_title: str,
-    emails: list[dict[str, str]],
+    emails: list[EmailPost],
     render_mode: str,
-    single_email: dict[str, str] | None = None,
+    single_email: EmailPost | None = None,
+    last_updated: str | None = None,
+    pagination: str = "",
+    sanitizer: str = "bleach",
+    heading: str = "",
+    search_query: str | None = None,
+    meta_links: bool = False,
+    excerpts: bool = False,
+    live_updates: bool = False,
 ) -> str:
-    """Render the blog index or single-post HTML page."""
+    """Render the blog index or single-post HTML page.
+
+    ``heading`` introduces a filtered listing such as search results. A search
+    form is shown in the header when ``search_query`` is not None, and
+    ``meta_links`` links each sender and date to its listing; static exports
+    have neither endpoint, so they leave both unset. With ``excerpts``, listed
+    posts show their precomputed excerpt and a link to the full permalink.
+    ``live_updates`` adds the script that follows ``/events``, and the CSP it needs.
+    """
     email_content = (
-        build_email_html(single_email, render_mode)
+        build_email_html(single_email, render_mode, sanitizer=sanitizer, meta_links=meta_links)
         if single_email
         else "".join(
-            build_email_html(email_data, render_mode, linked=True) for email_data in emails
+            build_email_html(
+                email_data,
+                render_mode,
+                linked=True,
+                sanitizer=sanitizer,
+                meta_links=meta_links,
+                excerpt=excerpts,
+            )
+            for email_data in emails
         )
     )
+    email_content += pagination
+    if heading:
+        email_content = f"""
+        <h2 class="listing">{html.escape(heading)}</h2>{email_content}"""
 
     template = template_path.read_text()
     replacements = {
         "{title}": html.escape(blog_title),
-        "{last_updated}": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "{search_form}": build_search_form(search_query) if search_query is not None else "",
+        "{last_updated}": last_updated or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "{email_content}": email_content,
+        "{content_security_policy}": (
+            LIVE_CONTENT_SECURITY_POLICY if live_updates else CONTENT_SECURITY_POLICY
+        ),
+        "{live_script}": (
+            f'\n    <script src="{LIVE_SCRIPT_URL}" defer></script>' if live_updates else ""
+        ),
     }
-    for key, value in replacements.items():
-        template = template.replace(key, value)
-    return template
+    # One pass, so placeholder-like text inside a value is never substituted again.
+    return PLACEHOLDER_PATTERN.sub(lambda match: replacements[match.group(0)], template)
+
+
+def build_search_form(query: str = "") -> str:
+    """Render the header search box, pre-filled with ``query``."""
+    return f"""
+        <form class="search" action="/search" method="get" role="search">
+            <input type="search" name="q" aria-label="Search posts"
+                value="{html.escape(query, quote=True)}">
+            <button type="submit">Search</button>
+        </form>"""
+
+
+def build_pagination_html(page: int, total_pages: int, page_href: Callable[[int], str]) -> str:
+    """Render newer/older links for one page of a paginated listing."""
+    if total_pages <= 1:
+        return ""
+    links = []
+    if page > 1:
+        links.append(f'<a href="{html.escape(page_href(page - 1))}">&larr; Newer posts</a>')
+    links.append(f"Page {page} of {total_pages}")
+    if page < total_pages:
+        links.append(f'<a href="{html.escape(page_href(page + 1))}">Older posts &rarr;</a>')
+    return f"""
+        <nav class="pagination"><p>{' | '.join(links)}</p></nav>"""
 
 
 def build_email_html(
-    email_data: dict[str, str],
+    email_data: EmailPost,
     render_mode: str,
     linked: bool = False,
+    sanitizer: str = "bleach",
+    meta_links: bool = False,
+    excerpt: bool = False,
 ) -> str:
-    """Render a single email post as an HTML article."""
-    title = html.escape(email_data["subject"])
+    """Render a single email post as an HTML article (its excerpt, if asked and present)."""
+    title = html.escape(email_data.subject)
     if linked:
-        uid = quote(str(email_data["uid"]), safe="")
-        title = f'<a href="/email/{html.escape(uid)}">{title}</a>'
+        slug = quote(email_data.slug, safe="")
+        title = f'<a href="/email/{html.escape(slug)}">{title}</a>'
 
     back_link = "" if linked else '<p><a href="/">&larr; Back to all emails</a></p>'
+    if excerpt and email_data.excerpt:
+        permalink = html.escape(f"/email/{quote(email_data.slug, safe='')}")
+        content_html = (
+            f'{email_data.excerpt}\n                <p class="read-more">'
+            f'<a href="{permalink}">Read more &rarr;</a></p>'
+        )
+    else:
+        content_html = email_data.html or render_content_to_html(
+            email_data.content, email_data.content_type, render_mode, sanitizer
+        )
+    sender = html.escape(email_data.sender)
+    date = html.escape(email_data.date)
+    if meta_links:
+        sender_href = f"/sender/{quote(sender_key(email_data.sender), safe='@')}"
+        sender = f'<a href="{html.escape(sender_href)}">{sender}</a>'
+        month = month_key(email_data.timestamp)
+        if month:
+            date = f'<a href="/archive/{month}">{date}</a>'
     return f"""
         <article>
             <h2>{title}</h2>
             <div class="meta">
-                <p><strong>From:</strong> {html.escape(email_data['from'])}</p>
-                <p><strong>Date:</strong> {html.escape(email_data['date'])}</p>
+                <p><strong>From:</strong> {sender}</p>
+                <p><strong>Date:</strong> {date}</p>
             </div>
             <div class="content">
-                {render_content_to_html(email_data.get('content', ''), email_data.get('content_type') or 'text/plain', render_mode)}
+                {content_html}
             </div>
             {back_link}
         </article>"""
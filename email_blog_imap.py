@@ -3,21 +3,32 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import ssl
+from concurrent.futures import ThreadPoolExecutor
 
 from aioimaplib import aioimaplib
 
+from email_blog_backfill import BACKFILL_CURSOR_KEY, HistoryBackfill
 from email_blog_messages import (
     extract_fetch_message_bytes,
     parse_email_message,
+    parse_fetch_message_ids,
     parse_id_list,
     parse_rfc822_size,
     parse_uid_validity,
 )
+from email_blog_pipeline import IngestPipeline
+from email_blog_posts import EmailPost
+from email_blog_search import analyze
 
 logger = logging.getLogger(__name__)
 
+# UIDs per header-only FETCH while remapping posts after a UIDVALIDITY change.
+REMAP_FETCH_BATCH = 500
+MESSAGE_ID_FIELDS = "(BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])"
+
 
 class EmailBlogImapMixin:
     """Provide IMAP UID search, fetch, and IDLE monitoring behavior."""
@@ -25,27 +36,44 @@ class EmailBlogImapMixin:
     async def connect_imap(self) -> bool:
         """Establish a TLS-protected IMAP connection and select the configured mailbox."""
         try:
-            ssl_context = ssl.create_default_context()
-            logger.info("Creating IMAP client for %s", self.imap_server)
-            self.imap_client = aioimaplib.IMAP4_SSL(host=self.imap_server, ssl_context=ssl_context)
-
-            await self.imap_client.wait_hello_from_server()
-            await self.imap_client.login(self.email_addr, self.password)
-            status, data = await self.imap_client.select(self.mailbox)
-            if status != "OK":
-                raise RuntimeError(f"Unable to select mailbox {self.mailbox!r}: {data}")
-
-            self._set_uid_validity(parse_uid_validity(data))
+            self.imap_client, uid_validity = await self._open_imap()
+            await self._load_uid_validity(uid_validity)
             logger.info("Connected to IMAP mailbox %s", self.mailbox)
             return True
         except Exception as exc:
             logger.error("Failed to connect to IMAP: %s", exc, exc_info=True)
             return False
 
-    async def fetch_email(self, uid: str) -> dict[str, str] | None:
+    async def _open_imap(self):
+        """Log in over TLS and select the mailbox; return the client and its UIDVALIDITY."""
+        ssl_context = ssl.create_default_context()
+        logger.info("Creating IMAP client for %s", self.imap_server)
+        client = aioimaplib.IMAP4_SSL(host=self.imap_server, ssl_context=ssl_context)
+        with self.tracer.command("CONNECT"):
+            await client.wait_hello_from_server()
+        with self.tracer.command("LOGIN"):
+            await client.login(self.email_addr, self.password)
+        with self.tracer.command("SELECT") as span:
+            status, data = await client.select(self.mailbox)
+            span.record(status, data)
+        if status != "OK":
+            raise RuntimeError(f"Unable to select mailbox {self.mailbox!r}: {data}")
+        return client, parse_uid_validity(data)
+
+    async def fetch_email(self, uid: str) -> EmailPost | None:
         """Fetch and process a single email by stable IMAP UID."""
+        msg_bytes = await self._fetch_message_bytes(uid)
+        if msg_bytes is None:
+            return None
+        return self._parse_message(uid, msg_bytes)
+
+    async def _fetch_message_bytes(self, uid: str, client=None) -> bytes | None:
+        """Fetch the raw RFC 822 bytes for one UID, enforcing the size limit."""
+        client = client or self.imap_client
         try:
-            status, data = await self.imap_client.uid("FETCH", uid, "(RFC822.SIZE)")
+            with self.tracer.command("UID FETCH (RFC822.SIZE)", uid) as span:
+                status, data = await client.uid("FETCH", uid, "(RFC822.SIZE)")
+                span.record(status, data)
             if status != "OK":
                 logger.error("Size fetch failed for UID %s: %s", uid, data)
                 return None
@@ -55,7 +83,9 @@ class EmailBlogImapMixin:
                 logger.warning("Skipping UID %s because size %s exceeds limit", uid, message_size)
                 return None
 
-            status, data = await self.imap_client.uid("FETCH", uid, "(BODY.PEEK[])")
+            with self.tracer.command("UID FETCH (BODY.PEEK[])", uid) as span:
+                status, data = await client.uid("FETCH", uid, "(BODY.PEEK[])")
+                span.record(status, data)
         except Exception as exc:
             logger.error("Fetch failed for UID %s: %s", uid, exc)
             return None
@@ -71,13 +101,37 @@ class EmailBlogImapMixin:
         if len(msg_bytes) > self.max_email_bytes:
             logger.warning("Skipping UID %s because payload exceeds limit", uid)
             return None
+        return msg_bytes
 
-        return parse_email_message(
+    def _parse_message(self, uid: str, msg_bytes: bytes) -> EmailPost | None:
+        """Parse raw message bytes into a post, render its HTML fragment and analyze its terms."""
+        email_data = parse_email_message(
             uid,
             msg_bytes,
             allowed_senders=self.allowed_senders,
             max_body_chars=self.max_body_chars,
+            media_store=self.media_store,
         )
+        if email_data:
+            email_data.html = self.render_content_to_html(
+                email_data.content, email_data.content_type
+            )
+            email_data.excerpt = self.build_excerpt(email_data.html)
+            email_data.search_document = analyze(email_data)
+        return email_data
+
+    async def _parse_message_off_loop(self, uid: str, msg_bytes: bytes) -> EmailPost | None:
+        if self._parse_executor is None:
+            self._parse_executor = ThreadPoolExecutor(
+                max_workers=self.ingest_parse_concurrency,
+                thread_name_prefix="email-blog-parse",
+            )
+        loop = asyncio.get_running_loop()
+        with self.tracer.stage("parse", uid) as span:
+            span.record(None, msg_bytes)
+            return await loop.run_in_executor(
+                self._parse_executor, self._parse_message, uid, msg_bytes
+            )
 
     async def monitor_inbox(self) -> None:
         """Monitor the mailbox for new messages using IMAP IDLE."""
@@ -88,6 +142,9 @@ class EmailBlogImapMixin:
                     await asyncio.sleep(10)
                     continue
 
+                if self._remap_pending:
+                    await self._remap_uids()
+                self._uid_map_ready.set()
                 await self._fetch_new_uids(limit_to_recent=True)
                 await self._idle_until_new_message()
             except asyncio.CancelledError:
@@ -105,21 +162,137 @@ class EmailBlogImapMixin:
         if limit_to_recent:
             self.processed_uids.update(set(uids) - set(uids_to_fetch))
 
-        for uid in uids_to_fetch:
-            if uid in self.processed_uids:
-                continue
-            email_data = await self.fetch_email(uid)
-            self.processed_uids.add(uid)
-            if email_data:
-                self._append_email(email_data)
+        pending = [uid for uid in uids_to_fetch if uid not in self.processed_uids]
+        if not pending:
+            return
+
+        pipeline = IngestPipeline(
+            self._fetch_message_bytes,
+            self._parse_message_off_loop,
+            self._publish_fetched,
+            fetch_concurrency=self.ingest_fetch_concurrency,
+            parse_concurrency=self.ingest_parse_concurrency,
+            queue_size=self.ingest_queue_size,
+            pace=self.ingest_scheduler.checkpoint if self.ingest_scheduler else None,
+        )
+        # Let the history backfill yield until live mail is published.
+        self._live_ingest_idle.clear()
+        try:
+            with self.tracer.stage("sync", pending):
+                published = await pipeline.run(pending)
+        finally:
+            self._live_ingest_idle.set()
+            await self._flush_unsaved_posts()
+        if published:
+            await self._after_ingest()
+
+    async def _remap_uids(self) -> None:
+        """Reattach published posts to their new UIDs after a UIDVALIDITY change.
+
+        Only the Message-ID header of each message is fetched; posts keep their
+        parsed content, rendered HTML, and permalink slug.
+        """
+        status, data = await self._search_uids()
+        if status != "OK":
+            raise RuntimeError(f"UID SEARCH failed: {data}")
+        uids = parse_id_list(data)
+        message_uids: dict[str, str] = {}
+        # Hold the history backfill until posts carry UIDs from this UIDVALIDITY.
+        self._live_ingest_idle.clear()
+        try:
+            for start in range(0, len(uids), REMAP_FETCH_BATCH):
+                batch = ",".join(uids[start : start + REMAP_FETCH_BATCH])
+                with self.tracer.command(f"UID FETCH {MESSAGE_ID_FIELDS}", batch) as span:
+                    status, data = await self.imap_client.uid("FETCH", batch, MESSAGE_ID_FIELDS)
+                    span.record(status, data)
+                if status != "OK":
+                    raise RuntimeError(f"Message-ID fetch failed: {data}")
+                message_uids.update(parse_fetch_message_ids(data))
+            kept: set[str] = set()
+            if self.post_store:
+                kept = await self._store_call(self.post_store.remap_imap_uids, message_uids)
+            reattached = self._reattach_posts(message_uids)
+        finally:
+            self._live_ingest_idle.set()
+        self.processed_uids.update(kept)
+        if self.post_store:
+            await self._store_call(self.post_store.set_meta, "uid_validity", self.uid_validity)
+        self._remap_pending = False
+        logger.info("Reattached %s cached and %s stored posts to new UIDs", reattached, len(kept))
 
-    async def _search_uids(self):
+    async def _publish_fetched(self, uid: str, email_data: EmailPost | None) -> None:
+        """Publish one fetched post; the sync stores its posts together when it ends."""
+        self.processed_uids.add(uid)
+        with self.tracer.stage("publish", uid):
+            if email_data is None:
+                return
+            slug_stored = await self._slug_in_store(email_data)
+            if self._append_email(email_data, slug_stored) and self.post_store:
+                self._unsaved_posts.append(email_data)
+
+    async def _search_uids(self, client=None):
         """Search mailbox by stable IMAP UID."""
-        protocol = getattr(self.imap_client, "protocol", None)
+        client = client or self.imap_client
+        protocol = getattr(client, "protocol", None)
         protocol_search = getattr(protocol, "search", None)
-        if protocol_search:
-            return await protocol_search("ALL", charset=None, by_uid=True)
-        return await self.imap_client.uid("SEARCH", "ALL")
+        with self.tracer.command("UID SEARCH") as span:
+            if protocol_search:
+                status, data = await protocol_search("ALL", charset=None, by_uid=True)
+            else:
+                status, data = await client.uid("SEARCH", "ALL")
+            span.record(status, data)
+        return status, data
+
+    async def backfill_history(self) -> None:
+        """Publish older mailbox history in the background over a second IMAP connection.
+
+        Runs until the configured history has been walked; connection errors are
+        retried after a pause, resuming from the persisted cursor.
+        """
+        await self._uid_map_ready.wait()
+        while True:
+            client = None
+            try:
+                client, uid_validity = await self._open_imap()
+                if uid_validity != self.uid_validity or self._remap_pending:
+                    raise RuntimeError("UIDVALIDITY changed; waiting for the UID remap")
+                status, data = await self._search_uids(client)
+                if status != "OK":
+                    raise RuntimeError(f"UID SEARCH failed: {data}")
+                backfill = HistoryBackfill(
+                    functools.partial(self._fetch_message_bytes, client=client),
+                    self._parse_message_off_loop,
+                    self._publish_backfilled,
+                    functools.partial(
+                        self._store_call, self.post_store.get_meta, BACKFILL_CURSOR_KEY
+                    ),
+                    functools.partial(
+                        self._store_call, self.post_store.set_meta, BACKFILL_CURSOR_KEY
+                    ),
+                    self._live_ingest_idle,
+                    skip=self._backfill_skips,
+                    batch_size=self.backfill_batch_size,
+                    rate=self.backfill_rate,
+                    max_messages=self.backfill_max_messages,
+                )
+                await backfill.run(parse_id_list(data), uid_validity)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("History backfill failed, retrying: %s", exc)
+                await asyncio.sleep(60)
+            finally:
+                if client is not None:
+                    try:
+                        await client.logout()
+                    except Exception as exc:
+                        logger.debug("Backfill IMAP logout failed: %s", exc)
+
+    async def _backfill_skips(self, uid: str) -> bool:
+        if uid in self.emails_cache:
+            return True
+        return await self._store_call(self.post_store.__contains__, uid)
 
     async def _idle_until_new_message(self) -> None:
         await self.imap_client.idle_start()
@@ -137,13 +310,32 @@ class EmailBlogImapMixin:
             if self.imap_client and self.imap_client.has_pending_idle():
                 await self.imap_client.idle_done()
 
-    def _set_uid_validity(self, uid_validity: str | None) -> None:
-        if uid_validity and self.uid_validity and uid_validity != self.uid_validity:
-            logger.warning("UIDVALIDITY changed; clearing cached posts and processed UIDs")
-            with self._cache_lock:
-                self.emails_cache.clear()
+    async def _load_uid_validity(self, uid_validity: str | None) -> None:
+        """Apply the UIDVALIDITY of a new connection, comparing and saving it in the store."""
+        stored = None
+        if self.uid_validity is None and uid_validity and self.post_store:
+            stored = await self._store_call(self.post_store.get_meta, "uid_validity")
+        self._set_uid_validity(uid_validity, stored)
+        if uid_validity and self.post_store and not self._remap_pending:
+            await self._store_call(self.post_store.set_meta, "uid_validity", uid_validity)
+
+    def _set_uid_validity(self, uid_validity: str | None, stored: str | None = None) -> None:
+        """Record the mailbox UIDVALIDITY; on a change, schedule the UID remap.
+
+        The previous value comes from this process or, after a restart, the
+        ``stored`` value read from the post store. Posts stay published until
+        ``_remap_uids`` moves them.
+        """
+        previous = self.uid_validity or stored
+        if uid_validity and previous and uid_validity != previous:
+            logger.warning("UIDVALIDITY changed; remapping published posts to new UIDs")
             self.processed_uids.clear()
+            self._remap_pending = True
+        elif uid_validity and self.search_index.uid_validity not in (None, uid_validity):
+            logger.info("Discarding search index saved for a different UIDVALIDITY")
+            self.search_index.clear()
         self.uid_validity = uid_validity or self.uid_validity
+        self.search_index.uid_validity = self.uid_validity
 
     async def _close_imap(self) -> None:
         if not self.imap_client:
@@ -151,7 +343,8 @@ class EmailBlogImapMixin:
         try:
             if self.imap_client.has_pending_idle():
                 await self.imap_client.idle_done()
-            await self.imap_client.logout()
+            with self.tracer.command("LOGOUT"):
+                await self.imap_client.logout()
         except Exception as exc:
             logger.error("Error during IMAP cleanup: %s", exc)
         finally:
@@ -0,0 +1,205 @@
+"""Bulk-import mbox files and Maildir directories into the post store."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from email_blog_config import DEFAULT_MAX_BODY_CHARS, DEFAULT_MAX_EMAIL_BYTES
+from email_blog_media import MediaStore
+from email_blog_messages import parse_email_message
+from email_blog_posts import EmailPost
+from email_blog_store import PostStore
+
+logger = logging.getLogger(__name__)
+
+IMPORT_UID_PREFIX = "import-"
+IMPORT_CHUNK_SIZE = 200
+PROGRESS_INTERVAL = 5.0
+_MBOXRD_QUOTED_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+
+
+class ImportProgress:
+    """Running counters for one import, reported periodically while it runs."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.skipped = 0
+
+    @property
+    def per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.read * 60 / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.read} read, {self.imported} imported, {self.duplicates} duplicates, "
+            f"{self.skipped} skipped ({self.per_minute:,.0f} messages/min)"
+        )
+
+
+def iter_mbox_messages(path: str | Path) -> Iterator[bytes]:
+    """Yield each message in an mbox file without reading the whole file into memory.
+
+    The file is memory-mapped and scanned for ``From `` separator lines; only one
+    message is copied out at a time. ``>From `` lines are unquoted one level
+    (mboxrd), which leaves mboxo files' quoting unchanged in practice.
+    """
+    with open(path, "rb") as handle:
+        if not handle.seek(0, 2):
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0 if mapped[:5] == b"From " else mapped.find(b"\nFrom ")
+            while start != -1:
+                if mapped[start] == ord("\n"):
+                    start += 1
+                body = mapped.find(b"\n", start) + 1
+                if body == 0:
+                    return
+                end = mapped.find(b"\nFrom ", body - 1)
+                message = mapped[body : len(mapped) if end == -1 else end + 1]
+                if b">From " in message:
+                    message = _MBOXRD_QUOTED_FROM.sub(rb"\1", message)
+                yield message
+                start = end
+
+
+def iter_maildir_messages(path: str | Path) -> Iterator[bytes]:
+    """Yield each message file under a Maildir's ``cur`` and ``new`` folders."""
+    root = Path(path)
+    for folder in ("cur", "new"):
+        directory = root / folder
+        if not directory.is_dir():
+            continue
+        for entry in sorted(directory.iterdir()):
+            if entry.is_file() and not entry.name.startswith("."):
+                yield entry.read_bytes()
+
+
+def iter_source_messages(path: str | Path) -> Iterator[bytes]:
+    """Yield messages from a Maildir directory or an mbox file."""
+    if Path(path).is_dir():
+        return iter_maildir_messages(path)
+    return iter_mbox_messages(path)
+
+
+def import_uid(message_id: str, msg_bytes: bytes) -> str:
+    """Derive a stable post UID for an imported message (Message-ID, else raw bytes)."""
+    message_id = message_id.strip()
+    source = message_id.encode("utf-8", "surrogateescape") if message_id else msg_bytes
+    return IMPORT_UID_PREFIX + hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+def parse_import_chunk(
+    messages: list[bytes],
+    allowed_senders: list[str] | None = None,
+    max_email_bytes: int = DEFAULT_MAX_EMAIL_BYTES,
+    max_body_chars: int = DEFAULT_MAX_BODY_CHARS,
+    media_dir: str | None = None,
+) -> tuple[list[EmailPost], int]:
+    """Parse raw messages into posts; return the posts and how many were skipped.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    posts: list[EmailPost] = []
+    skipped = 0
+    media_store = MediaStore(media_dir) if media_dir else None
+    for msg_bytes in messages:
+        if len(msg_bytes) > max_email_bytes:
+            skipped += 1
+            continue
+        try:
+            post = parse_email_message(
+                "", msg_bytes, allowed_senders, max_body_chars, media_store=media_store
+            )
+        except Exception:
+            post = None
+        if post is None:
+            skipped += 1
+            continue
+        post.uid = import_uid(post.message_id, msg_bytes)
+        posts.append(post)
+    return posts, skipped
+
+
+def import_messages(
+    messages: Iterable[bytes],
+    store: PostStore,
+    jobs: int = 1,
+    allowed_senders: list[str] | None = None,
+    max_email_bytes: int = DEFAULT_MAX_EMAIL_BYTES,
+    max_body_chars: int = DEFAULT_MAX_BODY_CHARS,
+    media_dir: str | None = None,
+    on_progress: Callable[[ImportProgress], None] | None = None,
+) -> ImportProgress:
+    """Parse ``messages`` with ``jobs`` processes and insert the posts into ``store``.
+
+    Messages are sent to the pool in chunks, with at most two chunks per
+    process in flight so memory stays bounded however large the source is.
+    Each parsed chunk is inserted in one transaction. Messages already in the
+    store (same UID or Message-ID) are counted as duplicates.
+    """
+    progress = ImportProgress()
+    on_progress = on_progress or _log_progress
+    parse = partial(
+        parse_import_chunk,
+        allowed_senders=allowed_senders,
+        max_email_bytes=max_email_bytes,
+        max_body_chars=max_body_chars,
+        media_dir=media_dir,
+    )
+    reported = time.monotonic()
+
+    def insert(result: tuple[list[EmailPost], int]) -> None:
+        nonlocal reported
+        posts, skipped = result
+        added = store.insert_many(posts) if posts else 0
+        progress.imported += added
+        progress.duplicates += len(posts) - added
+        progress.skipped += skipped
+        if time.monotonic() - reported >= PROGRESS_INTERVAL:
+            reported = time.monotonic()
+            on_progress(progress)
+
+    if jobs <= 1:
+        for chunk in _chunks(messages, IMPORT_CHUNK_SIZE):
+            progress.read += len(chunk)
+            insert(parse(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending: deque[Future] = deque()
+            for chunk in _chunks(messages, IMPORT_CHUNK_SIZE):
+                progress.read += len(chunk)
+                pending.append(pool.submit(parse, chunk))
+                if len(pending) >= jobs * 2:
+                    insert(pending.popleft().result())
+            while pending:
+                insert(pending.popleft().result())
+    on_progress(progress)
+    return progress
+
+
+def _chunks(messages: Iterable[bytes], size: int) -> Iterator[list[bytes]]:
+    chunk: list[bytes] = []
+    for message in messages:
+        chunk.append(message)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _log_progress(progress: ImportProgress) -> None:
+    logger.info("Import progress: %s", progress)
@@ -0,0 +1,111 @@
+"""Maintain per-sender and per-month listings of cached posts."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from email.utils import parseaddr
+
+from email_blog_posts import EmailPost
+
+LISTING_PAGE_SIZE = 20
+
+
+class PostIndexes:
+    """Secondary indexes of cached posts by sender address and by year/month.
+
+    Each listing is kept sorted newest-first (by parsed ``Date``, then UID) as
+    posts are added and removed, so a page of ``/sender/<addr>`` or
+    ``/archive/<yyyy>/<mm>`` is a slice rather than a scan of the whole cache.
+    Posts without a parseable date are listed by sender but not archived.
+    """
+
+    def __init__(self):
+        self._by_sender: dict[str, PostListing] = {}
+        self._by_month: dict[str, PostListing] = {}
+        self._keys: dict[str, tuple[str, str | None]] = {}
+
+    def add(self, post: EmailPost) -> None:
+        """Index ``post``, replacing any earlier post with the same UID."""
+        self.remove(post.uid)
+        sender = sender_key(post.sender)
+        month = month_key(post.timestamp)
+        self._by_sender.setdefault(sender, PostListing()).add(post)
+        if month:
+            self._by_month.setdefault(month, PostListing()).add(post)
+        self._keys[post.uid] = (sender, month)
+
+    def remove(self, uid: str) -> None:
+        keys = self._keys.pop(uid, None)
+        if keys is None:
+            return
+        sender, month = keys
+        _discard(self._by_sender, sender, uid)
+        if month:
+            _discard(self._by_month, month, uid)
+
+    def clear(self) -> None:
+        self._by_sender.clear()
+        self._by_month.clear()
+        self._keys.clear()
+
+    def by_sender(self, address: str) -> PostListing | None:
+        """Return the listing for a normalized sender address, if it has posts."""
+        return self._by_sender.get(address)
+
+    def by_month(self, year: int, month: int) -> PostListing | None:
+        """Return the listing for one calendar month (UTC), if it has posts."""
+        return self._by_month.get(f"{year:04d}/{month:02d}")
+
+
+class PostListing:
+    """Posts sorted newest-first with O(log n) lookup of the insert position."""
+
+    def __init__(self):
+        self._order: list[tuple[float, str]] = []
+        self._posts: dict[str, EmailPost] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, post: EmailPost) -> None:
+        bisect.insort(self._order, _sort_key(post))
+        self._posts[post.uid] = post
+
+    def remove(self, uid: str) -> None:
+        post = self._posts.pop(uid)
+        key = _sort_key(post)
+        del self._order[bisect.bisect_left(self._order, key)]
+
+    def page(self, number: int, size: int = LISTING_PAGE_SIZE) -> list[EmailPost]:
+        """Return the posts on 1-based page ``number``."""
+        start = (number - 1) * size
+        return [self._posts[uid] for _, uid in self._order[start : start + size]]
+
+
+def sender_key(sender: str) -> str:
+    """Normalize a ``From`` header to its lower-cased address."""
+    address = parseaddr(sender)[1] or sender
+    return address.strip().lower()
+
+
+def month_key(timestamp: float | None) -> str | None:
+    """Return ``YYYY/MM`` (UTC) for a post timestamp."""
+    if timestamp is None:
+        return None
+    parts = time.gmtime(timestamp)
+    return f"{parts.tm_year:04d}/{parts.tm_mon:02d}"
+
+
+def _sort_key(post: EmailPost) -> tuple[float, str]:
+    # Negated so ascending bisect order is newest-first.
+    return (-(post.timestamp or 0.0), post.uid)
+
+
+def _discard(listings: dict[str, PostListing], key: str, uid: str) -> None:
+    listing = listings.get(key)
+    if listing is None:
+        return
+    listing.remove(uid)
+    if not listing:
+        del listings[key]
@@ -0,0 +1,105 @@
+"""Measure event-loop lag and shed expensive requests when the server is saturated."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+LAG_SAMPLE_INTERVAL = 0.1
+DEFAULT_RETRY_AFTER = 1
+
+
+class LoopLagMonitor:
+    """Sample event-loop lag: how late a periodic ``asyncio.sleep`` wakes up.
+
+    A loop busy with synchronous work (or with too many ready callbacks)
+    wakes the sampler late, so ``lag`` tracks the queueing delay every
+    request is currently paying. ``max_lag`` is the worst sample seen.
+    """
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - expected)
+            self.max_lag = max(self.max_lag, self.lag)
+
+
+class LoadShedder:
+    """Count in-flight HTTP requests and decide when to refuse expensive work.
+
+    The server is overloaded when the latest loop-lag sample exceeds
+    ``max_lag`` seconds or more than ``max_in_flight`` requests are being
+    handled; a threshold of 0 disables that check. Routes opt in by calling
+    ``overloaded()`` and answering with ``reject()``. Long-lived streams under
+    ``untracked_paths`` are not counted as in flight: they are idle nearly
+    all of the time.
+    """
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        max_lag: float = 0.0,
+        max_in_flight: int = 0,
+        retry_after: int = DEFAULT_RETRY_AFTER,
+        untracked_paths: frozenset[str] = frozenset(),
+    ):
+        self.monitor = monitor
+        self.max_lag = max(0.0, max_lag)
+        self.max_in_flight = max(0, max_in_flight)
+        self.retry_after = max(1, retry_after)
+        self.untracked_paths = untracked_paths
+        self.in_flight = 0
+        self.shed_total = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_lag or self.max_in_flight)
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.path in self.untracked_paths:
+            return await handler(request)
+        self.in_flight += 1
+        try:
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    def overloaded(self) -> bool:
+        if self.max_lag and self.monitor.lag > self.max_lag:
+            return True
+        return bool(self.max_in_flight and self.in_flight > self.max_in_flight)
+
+    def reject(self) -> web.HTTPServiceUnavailable:
+        """Count a shed request and return the 503 to raise for it."""
+        self.shed_total += 1
+        logger.debug(
+            "Shedding request: loop lag %.3fs, %s in flight", self.monitor.lag, self.in_flight
+        )
+        return web.HTTPServiceUnavailable(
+            text="Server busy, retry shortly",
+            headers={"Retry-After": str(self.retry_after)},
+        )
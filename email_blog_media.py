@@ -0,0 +1,98 @@
+"""Store inline email images on disk, addressed by content hash."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from email.message import Message
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MEDIA_URL_PREFIX = "/media/"
+# Raster formats only: SVG can carry script and is never stored.
+IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+MEDIA_NAME_PATTERN = re.compile(r"[0-9a-f]{64}\.(?:png|jpg|gif|webp)")
+CID_REFERENCE_PATTERN = re.compile(r"""cid:([^"'\s>]+)""", re.IGNORECASE)
+
+
+class MediaStore:
+    """A directory of immutable files named ``<sha256><ext>``.
+
+    Identical images sent in different messages are stored once. Files are
+    written to a temporary name and renamed into place, so readers never see
+    a partial file, and are sharded by the first two hex digits of the hash.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, data: bytes, content_type: str) -> str | None:
+        """Store ``data`` and return its media name, or None for unsupported types."""
+        extension = IMAGE_EXTENSIONS.get(content_type.lower())
+        if extension is None:
+            return None
+        name = hashlib.sha256(data).hexdigest() + extension
+        path = self._path(name)
+        if path.exists():
+            return name
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return name
+
+    def path(self, name: str) -> Path | None:
+        """Return the file for a media name, or None if the name is invalid or unknown."""
+        if not MEDIA_NAME_PATTERN.fullmatch(name):
+            return None
+        path = self._path(name)
+        return path if path.is_file() else None
+
+    def _path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+
+def store_inline_images(msg: Message, html_body: str, media_store: MediaStore) -> str:
+    """Save the images an HTML body references by ``cid:`` and point it at ``/media/``.
+
+    Only parts that are actually referenced are decoded and written; references
+    to unknown or unsupported parts are left for the sanitizer to strip.
+    """
+    wanted = {cid.lower() for cid in CID_REFERENCE_PATTERN.findall(html_body)}
+    if not wanted:
+        return html_body
+    urls: dict[str, str] = {}
+    for part in msg.walk():
+        content_id = (part.get("content-id") or "").strip().strip("<>").lower()
+        if not content_id or content_id not in wanted or content_id in urls:
+            continue
+        data = part.get_payload(decode=True)
+        if not isinstance(data, bytes):
+            continue
+        try:
+            name = media_store.put(data, part.get_content_type())
+        except OSError as exc:
+            logger.error("Failed to store inline image %s: %s", content_id, exc)
+            continue
+        if name:
+            urls[content_id] = MEDIA_URL_PREFIX + name
+
+    def replace(match: re.Match[str]) -> str:
+        return urls.get(match.group(1).lower(), match.group(0))
+
+    return CID_REFERENCE_PATTERN.sub(replace, html_body)
@@ -0,0 +1,131 @@
+"""Report process memory and diff ``tracemalloc`` snapshots on demand."""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_TRACE_FRAMES = 1
+MAX_TRACE_FRAMES = 64
+DEFAULT_TOP_ALLOCATORS = 20
+SNAPSHOT_GROUPS = ("lineno", "filename", "traceback")
+
+# Allocations made by the import system and tracemalloc itself are noise in a leak hunt.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+)
+
+
+class AllocationTracker:
+    """Start ``tracemalloc`` on request and report what grew between snapshots.
+
+    Tracing slows every allocation, so it stays off until ``start()``. Each
+    ``snapshot()`` is compared with the previous one (or, for the first, with
+    the snapshot taken at start) and then becomes the new baseline, so
+    repeated calls show the growth since the last look.
+    """
+
+    def __init__(self):
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def status(self) -> dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "has_baseline": self._baseline is not None,
+        }
+
+    def start(self, frames: int = DEFAULT_TRACE_FRAMES) -> bool:
+        """Start tracing with ``frames`` of traceback and take a baseline.
+
+        Return False (and keep the current baseline) if tracing was already on.
+        """
+        with self._lock:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start(min(max(1, frames), MAX_TRACE_FRAMES))
+            self._baseline = _take_snapshot()
+            return True
+
+    def snapshot(
+        self, limit: int = DEFAULT_TOP_ALLOCATORS, group: str = "lineno"
+    ) -> list[dict[str, Any]]:
+        """Return the top ``limit`` allocation sites by growth since the baseline.
+
+        Raise ``RuntimeError`` if tracing is off and ``ValueError`` for an
+        unknown ``group``. Slow on a large heap; call it off the event loop.
+        """
+        if group not in SNAPSHOT_GROUPS:
+            raise ValueError(f"group must be one of: {', '.join(SNAPSHOT_GROUPS)}")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = _take_snapshot()
+            baseline, self._baseline = self._baseline, snapshot
+        if baseline is None:
+            stats = snapshot.statistics(group)
+        else:
+            stats = snapshot.compare_to(baseline, group)
+        return [_allocator(stat) for stat in stats[: max(0, limit)]]
+
+    def stop(self) -> bool:
+        """Stop tracing and drop the baseline; return False if it was not running."""
+        with self._lock:
+            self._baseline = None
+            if not tracemalloc.is_tracing():
+                return False
+            tracemalloc.stop()
+            return True
+
+
+def process_memory() -> dict[str, Any]:
+    """Return resident and peak resident bytes (``None`` where unknown) and GC state."""
+    rss = None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    max_rss = None
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":  # Linux and the BSDs report KiB; macOS reports bytes.
+            max_rss *= 1024
+    return {
+        "rss_bytes": rss,
+        "max_rss_bytes": max_rss,
+        "gc_counts": list(gc.get_count()),
+        "gc_uncollectable": len(gc.garbage),
+    }
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def _allocator(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict[str, Any]:
+    return {
+        "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "size_bytes": stat.size,
+        "size_diff_bytes": getattr(stat, "size_diff", stat.size),
+        "count": stat.count,
+        "count_diff": getattr(stat, "count_diff", stat.count),
+    }
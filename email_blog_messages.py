@@ -4,14 +4,22 @@ from __future__ import annotations
 
 import email
 import re
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from email.header import decode_header
 from email.message import Message
+from email.parser import BytesHeaderParser
 from email.utils import getaddresses
 
+from email_blog_fetch import iter_fetch_bodies, parse_fetch_response
+from email_blog_media import MediaStore, store_inline_images
+from email_blog_posts import EmailPost
+
 MARKDOWN_TYPES = {"text/markdown", "text/x-markdown"}
 TEXT_TYPES = {"text/html", *MARKDOWN_TYPES, "text/plain"}
 TRUNCATION_NOTICE = "\n\n[Message truncated at {limit} characters.]"
+_RFC822_SIZE = re.compile(rb"RFC822\.SIZE\s+(\d+)", re.IGNORECASE)
+_UID_VALIDITY = re.compile(rb"UIDVALIDITY\s+(\d+)", re.IGNORECASE)
+_ID_LIST = re.compile(rb"\s*\d+(?:\s+\d+)*\s*")
 
 
 def safe_decode(header: str | None) -> str:
@@ -81,8 +89,13 @@ def parse_email_message(
     msg_bytes: bytes,
     allowed_senders: Iterable[str] | None = None,
     max_body_chars: int | None = None,
-) -> dict[str, str] | None:
-    """Parse a raw email message into the internal blog-post dictionary."""
+    media_store: MediaStore | None = None,
+) -> EmailPost | None:
+    """Parse a raw email message into a compact blog-post record.
+
+    With a ``media_store``, inline images referenced by an HTML body are saved
+    there and their ``cid:`` URLs rewritten to ``/media/<hash>``.
+    """
     msg = email.message_from_bytes(msg_bytes)
     subject = safe_decode(msg["subject"])
     from_addr = safe_decode(msg["from"])
@@ -91,43 +104,46 @@ def parse_email_message(
         return None
 
     content, content_type = extract_email_content(msg, max_body_chars=max_body_chars)
-    return {
-        "subject": subject,
-        "from": from_addr,
-        "date": safe_decode(msg["date"]),
-        "content": content,
-        "content_type": content_type,
-        "uid": str(uid),
-        "message_id": safe_decode(msg["message-id"]),
-    }
+    if media_store is not None and content_type == "text/html":
+        content = store_inline_images(msg, content, media_store)
+    return EmailPost(
+        uid=str(uid),
+        subject=subject,
+        sender=from_addr,
+        date=safe_decode(msg["date"]),
+        content=content,
+        content_type=content_type,
+        message_id=safe_decode(msg["message-id"]),
+    )
 
 
 def parse_rfc822_size(data: object) -> int | None:
     """Parse RFC822.SIZE from an IMAP FETCH response."""
-    for item in _flatten_response_items(data):
-        text = item.decode("ascii", errors="ignore") if isinstance(item, bytes) else str(item)
-        match = re.search(r"RFC822\.SIZE\s+(\d+)", text, flags=re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-    return None
+    match = _search_response(data, _RFC822_SIZE)
+    return int(match.group(1)) if match else None
 
 
 def parse_uid_validity(data: object) -> str | None:
     """Parse UIDVALIDITY from an IMAP SELECT response."""
-    for item in _flatten_response_items(data):
-        text = item.decode("ascii", errors="ignore") if isinstance(item, bytes) else str(item)
-        match = re.search(r"UIDVALIDITY\s+(\d+)", text, flags=re.IGNORECASE)
-        if match:
-            return match.group(1)
-    return None
+    match = _search_response(data, _UID_VALIDITY)
+    return match.group(1).decode("ascii") if match else None
+
 
+def extract_fetch_message_bytes(data: object) -> bytes | bytearray | None:
+    """Extract raw message bytes from common aioimaplib FETCH response shapes.
+
+    The ``{n}`` literal of a well-formed FETCH response is used as-is: when it
+    spans a whole response item, that buffer is returned without a copy.
+    Responses without a literal marker fall back to picking the largest
+    item that looks like a message.
+    """
+    for _uid, body in iter_fetch_bodies(data):
+        if body.nbytes == len(body.obj):
+            return body.obj
+        return body.tobytes()
 
-def extract_fetch_message_bytes(data: object) -> bytes | None:
-    """Extract raw message bytes from common aioimaplib FETCH response shapes."""
     candidates = [
-        bytes(item)
-        for item in _flatten_response_items(data)
-        if isinstance(item, (bytes, bytearray))
+        item for item in _iter_response_items(data) if isinstance(item, (bytes, bytearray))
     ]
     message_candidates = [
         item
@@ -135,25 +151,44 @@ def extract_fetch_message_bytes(data: object) -> bytes | None:
         if (b"\r\n\r\n" in item or b"\n\n" in item) and not item.lstrip().startswith(b"* ")
     ]
     if message_candidates:
-        return max(message_candidates, key=len)
+        return bytes(max(message_candidates, key=len))
 
     non_metadata = [
         item
         for item in candidates
         if not item.lstrip().startswith((b"* ", b")")) and b"FETCH" not in item[:80].upper()
     ]
-    return max(non_metadata, key=len) if non_metadata else None
+    return bytes(max(non_metadata, key=len)) if non_metadata else None
+
+
+def parse_fetch_message_ids(data: object) -> dict[str, str]:
+    """Map Message-ID to UID from a ``UID FETCH`` of ``BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)]``.
+
+    Messages without a Message-ID header are left out.
+    """
+    message_uids = {}
+    for response in parse_fetch_response(data):
+        if response.uid is None:
+            continue
+        for name, value in response.attributes.items():
+            if name.startswith("BODY[HEADER") and isinstance(value, memoryview):
+                headers = BytesHeaderParser().parsebytes(value.tobytes())
+                message_id = safe_decode(headers["message-id"]).strip()
+                if message_id:
+                    message_uids[message_id] = str(response.uid)
+                break
+    return message_uids
 
 
 def parse_id_list(data: object) -> list[str]:
     """Parse a SEARCH response containing space-separated IDs."""
-    for item in _flatten_response_items(data):
-        if isinstance(item, bytes):
-            text = item.decode("ascii", errors="ignore").strip()
-        else:
-            text = str(item).strip()
-        if text and all(part.isdigit() for part in text.split()):
-            return text.split()
+    for item in _iter_response_items(data):
+        if isinstance(item, str):
+            item = item.encode("ascii", errors="ignore")
+        elif not isinstance(item, (bytes, bytearray)):
+            continue
+        if _ID_LIST.fullmatch(item):
+            return item.decode("ascii").split()
     return []
 
 
@@ -176,16 +211,24 @@ def _limit_text(text: str, limit: int | None) -> str:
     return text[:limit] + TRUNCATION_NOTICE.format(limit=limit)
 
 
-def _flatten_response_items(data: object) -> list[object]:
-    if isinstance(data, tuple):
-        return list(data)
-    if not isinstance(data, list):
-        return [data]
+def _search_response(data: object, pattern: re.Pattern[bytes]) -> re.Match[bytes] | None:
+    for item in _iter_response_items(data):
+        if isinstance(item, str):
+            item = item.encode("ascii", errors="ignore")
+        elif not isinstance(item, (bytes, bytearray)):
+            continue
+        match = pattern.search(item)
+        if match:
+            return match
+    return None
+
 
-    flattened = []
+def _iter_response_items(data: object) -> Iterator[object]:
+    if not isinstance(data, (list, tuple)):
+        yield data
+        return
     for item in data:
         if isinstance(item, tuple):
-            flattened.extend(item)
+            yield from item
         else:
-            flattened.append(item)
-    return flattened
+            yield item
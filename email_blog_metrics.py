@@ -0,0 +1,31 @@
+"""Format server gauges in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+METRICS_CONTENT_TYPE = "text/plain"
+METRIC_PREFIX = "email_blog_"
+
+
+def render_prometheus(samples: Iterable[tuple[str, str, float]]) -> str:
+    """Render ``(name, help, value)`` samples; names are prefixed with ``email_blog_``.
+
+    Names ending in ``_total`` are typed as counters, everything else as gauges.
+    """
+    lines = []
+    for name, help_text, value in samples:
+        metric = f"{METRIC_PREFIX}{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
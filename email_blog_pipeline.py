@@ -0,0 +1,132 @@
+"""Run IMAP ingestion as bounded asyncio stages: fetch, parse/render, publish."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_CONCURRENCY = 1
+DEFAULT_PARSE_CONCURRENCY = 2
+DEFAULT_QUEUE_SIZE = 16
+_DONE = object()
+
+
+class IngestPipeline:
+    """Overlap network waits with CPU work while publishing in UID order.
+
+    UIDs flow through two bounded queues (fetch -> parse -> publish). Each stage
+    runs a configurable number of worker coroutines, and a window semaphore caps
+    the number of messages in flight so memory stays bounded even when one slow
+    fetch holds back publication. The publisher reorders results and calls
+    ``publish`` in the order the UIDs were given, so appending each post to the
+    front of the cache keeps it newest-first. ``pace``, if given, is awaited
+    before each parse and publish so a scheduler can slice the work.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Any]],
+        parse: Callable[[str, Any], Awaitable[Any]],
+        publish: Callable[[str, Any], Awaitable[None] | None],
+        fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+        parse_concurrency: int = DEFAULT_PARSE_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        pace: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.fetch = fetch
+        self.parse = parse
+        self.publish = publish
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.parse_concurrency = max(1, parse_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.pace = pace
+
+    async def run(self, uids: Iterable[str]) -> int:
+        """Push ``uids`` through every stage; return how many produced a post."""
+        window = asyncio.Semaphore(
+            self.queue_size + self.fetch_concurrency + self.parse_concurrency
+        )
+        fetch_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        parse_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        publish_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def discover() -> None:
+            for seq, uid in enumerate(uids):
+                await window.acquire()
+                await fetch_queue.put((seq, uid))
+            for _ in range(self.fetch_concurrency):
+                await fetch_queue.put(_DONE)
+
+        async def fetch_worker() -> None:
+            while (item := await fetch_queue.get()) is not _DONE:
+                seq, uid = item
+                raw = await self._call_stage("fetch", uid, self.fetch, uid)
+                await parse_queue.put((seq, uid, raw))
+
+        async def parse_worker() -> None:
+            while (item := await parse_queue.get()) is not _DONE:
+                seq, uid, raw = item
+                result = None
+                if raw is not None:
+                    if self.pace:
+                        await self.pace()
+                    result = await self._call_stage("parse", uid, self.parse, uid, raw)
+                await publish_queue.put((seq, uid, result))
+
+        async def fetch_stage() -> None:
+            await asyncio.gather(*(fetch_worker() for _ in range(self.fetch_concurrency)))
+            for _ in range(self.parse_concurrency):
+                await parse_queue.put(_DONE)
+
+        async def parse_stage() -> None:
+            await asyncio.gather(*(parse_worker() for _ in range(self.parse_concurrency)))
+            await publish_queue.put(_DONE)
+
+        async def publish_stage() -> int:
+            pending: dict[int, tuple[str, Any]] = {}
+            next_seq = 0
+            published = 0
+            while (item := await publish_queue.get()) is not _DONE:
+                seq, uid, result = item
+                pending[seq] = (uid, result)
+                while next_seq in pending:
+                    if self.pace:
+                        await self.pace()
+                    uid, result = pending.pop(next_seq)
+                    outcome = self.publish(uid, result)
+                    if asyncio.iscoroutine(outcome):
+                        await outcome
+                    published += result is not None
+                    next_seq += 1
+                    window.release()
+            return published
+
+        tasks = [
+            asyncio.create_task(discover()),
+            asyncio.create_task(fetch_stage()),
+            asyncio.create_task(parse_stage()),
+        ]
+        publisher = asyncio.create_task(publish_stage())
+        try:
+            done, _ = await asyncio.wait([*tasks, publisher], return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+            return publisher.result()
+        finally:
+            for task in (*tasks, publisher):
+                task.cancel()
+            await asyncio.gather(*tasks, publisher, return_exceptions=True)
+
+    @staticmethod
+    async def _call_stage(stage: str, uid: str, func: Callable[..., Awaitable[Any]], *args):
+        try:
+            return await func(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Ingest %s stage failed for UID %s: %s", stage, uid, exc)
+            return None
@@ -0,0 +1,189 @@
+"""Compact in-memory records for cached blog posts."""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+import zlib
+from collections.abc import Mapping
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+# Bodies shorter than this are kept as plain strings; zlib would not shrink them.
+COMPRESS_MIN_CHARS = 256
+COMPRESS_LEVEL = 6
+# Mapping-style keys that differ from the attribute names.
+_KEY_ALIASES = {"from": "sender"}
+
+
+class EmailPost:
+    """One published email, stored compactly for the post cache.
+
+    The sender is interned (the same few addresses repeat across posts), the
+    ``Date`` header is parsed once into ``timestamp``, and the raw body is kept
+    zlib-compressed next to its rendered ``html`` fragment and optional index
+    ``excerpt`` (None when the full fragment is short enough to show).
+    ``slug`` is the post's permalink id. It starts out as the UID and is kept
+    when the post is moved to a new UID, so ``/email/<slug>`` never changes.
+    ``search_document`` briefly holds the search terms analyzed at parse time,
+    until the post is indexed. ``post["from"]`` style access is supported for
+    templates and callers written against the original dictionary records.
+    """
+
+    __slots__ = (
+        "uid",
+        "slug",
+        "subject",
+        "sender",
+        "date",
+        "timestamp",
+        "content_type",
+        "message_id",
+        "html",
+        "excerpt",
+        "search_document",
+        "_body",
+    )
+
+    def __init__(
+        self,
+        uid: str,
+        subject: str,
+        sender: str,
+        date: str,
+        content: str,
+        content_type: str = "text/plain",
+        message_id: str = "",
+        html: str | None = None,
+        timestamp: float | None = None,
+        excerpt: str | None = None,
+        slug: str | None = None,
+    ):
+        self.uid = str(uid)
+        self.slug = slug or self.uid
+        self.subject = subject
+        self.sender = sys.intern(sender)
+        self.date = date
+        self.timestamp = parse_timestamp(date) if timestamp is None else timestamp
+        self.content_type = sys.intern(content_type or "text/plain")
+        self.message_id = message_id
+        self.html = html
+        self.excerpt = excerpt
+        self.search_document: tuple[str, dict[str, int]] | None = None
+        self.content = content
+
+    @property
+    def content(self) -> str:
+        """Return the raw (decompressed) body text."""
+        body = self._body
+        if isinstance(body, bytes):
+            return zlib.decompress(body).decode("utf-8", "surrogatepass")
+        return body
+
+    @content.setter
+    def content(self, text: str) -> None:
+        if len(text) < COMPRESS_MIN_CHARS:
+            self._body = text
+        else:
+            self._body = zlib.compress(text.encode("utf-8", "surrogatepass"), COMPRESS_LEVEL)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> EmailPost:
+        """Build a post from a dictionary record (``from`` is the sender key)."""
+        return cls(
+            uid=data.get("uid", ""),
+            subject=data.get("subject", ""),
+            sender=data.get("from", ""),
+            date=data.get("date", ""),
+            content=data.get("content", ""),
+            content_type=data.get("content_type") or "text/plain",
+            message_id=data.get("message_id", ""),
+            html=data.get("html"),
+            excerpt=data.get("excerpt"),
+            slug=data.get("slug"),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the dictionary form used before posts became records."""
+        return {
+            "subject": self.subject,
+            "from": self.sender,
+            "date": self.date,
+            "content": self.content,
+            "content_type": self.content_type,
+            "uid": self.uid,
+            "slug": self.slug,
+            "message_id": self.message_id,
+            "html": self.html,
+            "excerpt": self.excerpt,
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, _KEY_ALIASES.get(key, key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def nbytes(self) -> int:
+        """Approximate memory held by this record, excluding the rendered ``html``.
+
+        The excerpt is charged here because it lives as long as the record.
+
+        Interned strings (sender, content type) are shared between posts and
+        are not charged.
+        """
+        fields = (
+            self.uid,
+            None if self.slug is self.uid else self.slug,
+            self.subject,
+            self.date,
+            self.timestamp,
+            self.message_id,
+            self.excerpt,
+            self._body,
+        )
+        return sys.getsizeof(self) + sum(sys.getsizeof(value) for value in fields)
+
+    def __repr__(self) -> str:
+        return f"EmailPost(uid={self.uid!r}, subject={self.subject!r})"
+
+
+def post_identity(post: EmailPost) -> str:
+    """Return the key that identifies the same message across UIDs and sources.
+
+    This is the Message-ID when there is one, else a hash of the parsed headers
+    and body, so a message keeps its identity when the mailbox renumbers it.
+    """
+    message_id = post.message_id.strip()
+    if message_id:
+        return message_id
+    parts = (post.sender, post.date, post.subject, post.content)
+    digest = hashlib.blake2b("\0".join(parts).encode("utf-8", "surrogatepass"), digest_size=16)
+    return "sha:" + digest.hexdigest()
+
+
+def as_post(post: EmailPost | Mapping[str, Any]) -> EmailPost:
+    """Return ``post`` as an ``EmailPost``, converting dictionary records."""
+    return post if isinstance(post, EmailPost) else EmailPost.from_mapping(post)
+
+
+def parse_timestamp(date_text: str | None) -> float | None:
+    """Parse an RFC 2822 ``Date`` header into a POSIX timestamp (naive dates are UTC)."""
+    if not date_text:
+        return None
+    try:
+        dt = parsedate_to_datetime(date_text)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.timestamp()
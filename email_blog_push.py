@@ -0,0 +1,170 @@
+"""Accept messages pushed by a local MTA over LMTP or HTTP."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from email.parser import BytesHeaderParser
+
+logger = logging.getLogger(__name__)
+
+PUSH_PUBLISHED = "published"
+PUSH_DUPLICATE = "duplicate"
+PUSH_REJECTED = "rejected"
+PUSH_TOO_LARGE = "too_large"
+PUSH_FAILED = "failed"
+PUSH_UID_PREFIX = "push-"
+DEFAULT_LMTP_HOST = "127.0.0.1"
+LMTP_LINE_LIMIT = 64 * 1024
+LMTP_IDLE_TIMEOUT = 300.0
+
+_LMTP_REPLIES = {
+    PUSH_PUBLISHED: b"250 2.0.0 Message published",
+    PUSH_DUPLICATE: b"250 2.0.0 Message already published",
+    PUSH_REJECTED: b"550 5.7.1 Message rejected",
+    PUSH_TOO_LARGE: b"552 5.3.4 Message too large",
+    PUSH_FAILED: b"451 4.3.0 Temporary failure, try again later",
+}
+
+Deliver = Callable[[bytes, str], Awaitable[tuple[str, str | None]]]
+
+
+def push_uid(msg_bytes: bytes) -> str:
+    """Derive a stable post UID for a pushed message.
+
+    The ``Message-ID`` is hashed when present, so the same message pushed twice
+    (or over both LMTP and HTTP) maps to one post; otherwise the raw bytes are.
+    The prefix keeps pushed UIDs apart from numeric IMAP UIDs.
+    """
+    headers = BytesHeaderParser().parsebytes(msg_bytes)
+    message_id = (headers.get("message-id") or "").strip()
+    source = message_id.encode("utf-8", "surrogateescape") if message_id else msg_bytes
+    return PUSH_UID_PREFIX + hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+class LmtpServer:
+    """A minimal RFC 2033 LMTP listener that hands each message to ``deliver``.
+
+    Supports LHLO, MAIL, RCPT, DATA, RSET, NOOP and QUIT. DATA is read with dot
+    unstuffing and stops buffering once ``max_message_bytes`` is exceeded; one
+    reply per accepted recipient is sent after the message, as LMTP requires.
+    """
+
+    def __init__(
+        self,
+        deliver: Deliver,
+        host: str = DEFAULT_LMTP_HOST,
+        port: int = 24,
+        max_message_bytes: int = 1_048_576,
+        hostname: str = "email-blog",
+    ):
+        self.deliver = deliver
+        self.host = host
+        self.port = port
+        self.max_message_bytes = max_message_bytes
+        self.hostname = hostname
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=LMTP_LINE_LIMIT
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("LMTP listener started on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await self._session(reader, writer)
+        except (TimeoutError, ValueError, ConnectionError) as exc:
+            logger.warning("LMTP session ended: %s", exc)
+        finally:
+            writer.close()
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(*lines: bytes) -> None:
+            writer.write(b"".join(line + b"\r\n" for line in lines))
+            await writer.drain()
+
+        await reply(f"220 {self.hostname} LMTP ready".encode())
+        sender: bytes | None = None
+        recipients = 0
+        while True:
+            line = await asyncio.wait_for(reader.readline(), LMTP_IDLE_TIMEOUT)
+            if not line:
+                return
+            verb, _, argument = line.strip().partition(b" ")
+            verb = verb.upper()
+            if verb == b"LHLO":
+                await reply(
+                    f"250-{self.hostname}".encode(),
+                    b"250-PIPELINING",
+                    b"250-8BITMIME",
+                    f"250 SIZE {self.max_message_bytes}".encode(),
+                )
+            elif verb == b"MAIL":
+                sender, recipients = argument, 0
+                await reply(b"250 2.1.0 OK")
+            elif verb == b"RCPT":
+                if sender is None:
+                    await reply(b"503 5.5.1 MAIL first")
+                    continue
+                recipients += 1
+                await reply(b"250 2.1.5 OK")
+            elif verb == b"DATA":
+                if not recipients:
+                    await reply(b"503 5.5.1 RCPT first")
+                    continue
+                await reply(b"354 End data with <CR><LF>.<CR><LF>")
+                message = await self._read_data(reader)
+                if message is None:
+                    status = PUSH_TOO_LARGE
+                else:
+                    status = await self._deliver(message)
+                await reply(*([_LMTP_REPLIES[status]] * recipients))
+                sender, recipients = None, 0
+            elif verb == b"RSET":
+                sender, recipients = None, 0
+                await reply(b"250 2.0.0 OK")
+            elif verb == b"NOOP":
+                await reply(b"250 2.0.0 OK")
+            elif verb == b"QUIT":
+                await reply(b"221 2.0.0 Bye")
+                return
+            else:
+                await reply(b"500 5.5.2 Command not recognized")
+
+    async def _read_data(self, reader: asyncio.StreamReader) -> bytes | None:
+        """Read a dot-terminated message; return None if it exceeded the size limit."""
+        lines: list[bytes] = []
+        size = 0
+        while True:
+            line = await asyncio.wait_for(reader.readline(), LMTP_IDLE_TIMEOUT)
+            if not line:
+                raise ConnectionError("connection closed during DATA")
+            if line in (b".\r\n", b".\n"):
+                break
+            if line.startswith(b"."):
+                line = line[1:]
+            size += len(line)
+            if size <= self.max_message_bytes:
+                lines.append(line)
+        if size > self.max_message_bytes:
+            return None
+        return b"".join(lines)
+
+    async def _deliver(self, message: bytes) -> str:
+        try:
+            status, _uid = await self.deliver(message, "lmtp")
+        except Exception as exc:
+            logger.error("LMTP delivery failed: %s", exc)
+            return PUSH_FAILED
+        return status
@@ -2,24 +2,18 @@
 
 from __future__ import annotations
 
+import hashlib
 import html
+import re
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import cache
+from types import FunctionType, ModuleType
 
-try:
-    import markdown as _markdown  # type: ignore
-
-    _MARKDOWN_AVAILABLE = True
-except Exception:
-    _markdown = None
-    _MARKDOWN_AVAILABLE = False
-
-try:
-    import bleach  # type: ignore
-
-    _BLEACH_AVAILABLE = True
-except Exception:
-    bleach = None
-    _BLEACH_AVAILABLE = False
-
+from email_blog_media import MEDIA_NAME_PATTERN, MEDIA_URL_PREFIX
+from email_blog_sanitizer import clean_and_linkify
 
 ALLOWED_TAGS = [
     "p",
@@ -44,9 +38,127 @@ ALLOWED_TAGS = [
     "h4",
     "h5",
     "h6",
+    "img",
 ]
-ALLOWED_ATTRIBUTES = {"a": ["href", "title", "rel"]}
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title", "rel"],
+    "img": ["src", "alt", "title", "width", "height"],
+}
 ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+SANITIZERS = ("bleach", "stdlib")
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "nl2br", "codehilite"]
+HIGHLIGHT_CACHE_BYTES = 4 * 1024 * 1024
+IMAGE_TAG_PATTERN = re.compile(r"<img\b[^>]*>")
+# Sanitized output always double-quotes attributes, so a literal quote cannot occur in a value.
+LOCAL_IMAGE_SRC = re.compile(rf'\ssrc="{re.escape(MEDIA_URL_PREFIX)}{MEDIA_NAME_PATTERN.pattern}"')
+
+_converters = threading.local()
+_highlight_cache: OrderedDict[str, str] = OrderedDict()
+_highlight_bytes = 0
+_highlight_lock = threading.Lock()
+
+
+@cache
+def _load_markdown() -> ModuleType | None:
+    """Import Markdown on first use so plain mode never pays for it."""
+    try:
+        import markdown  # type: ignore
+    except Exception:
+        return None
+    return markdown
+
+
+def _cached_hilite(code_hilite_cls: type) -> type:
+    """Return a ``CodeHilite`` subclass memoizing ``hilite`` by a hash of the block and options.
+
+    Repeated snippets skip Pygments lexing (and lexer guessing). The cache is an
+    LRU bounded by ``HIGHLIGHT_CACHE_BYTES`` of highlighted HTML.
+    """
+
+    class CachedCodeHilite(code_hilite_cls):
+        def hilite(self, shebang: bool = True) -> str:
+            global _highlight_bytes
+            options = (self.src, self.lang, self.guess_lang, self.use_pygments, shebang)
+            key = hashlib.sha256(
+                repr((options, sorted(self.options.items()))).encode("utf-8", "surrogatepass")
+            ).hexdigest()
+            with _highlight_lock:
+                cached = _highlight_cache.get(key)
+                if cached is not None:
+                    _highlight_cache.move_to_end(key)
+                    return cached
+
+            result = super().hilite(shebang)
+            with _highlight_lock:
+                if key not in _highlight_cache:
+                    _highlight_cache[key] = result
+                    _highlight_bytes += sys.getsizeof(result)
+                while _highlight_bytes > HIGHLIGHT_CACHE_BYTES and _highlight_cache:
+                    _highlight_bytes -= sys.getsizeof(_highlight_cache.popitem(last=False)[1])
+            return result
+
+    return CachedCodeHilite
+
+
+@cache
+def _cached_highlighting() -> type:
+    """Build the extension that routes this module's converters through ``_cached_hilite``.
+
+    The codehilite tree processor and the fenced code preprocessor both create
+    ``CodeHilite`` by its module-global name, so the extension registers
+    subclasses whose ``run`` resolves that name to the caching subclass. The
+    library's own classes stay untouched for any other ``Markdown`` user.
+    """
+    from markdown.extensions import Extension, codehilite, fenced_code  # type: ignore
+
+    cached_code_hilite = _cached_hilite(codehilite.CodeHilite)
+
+    def resolving_cached(module: ModuleType, run: Callable) -> Callable:
+        scope = {**vars(module), "CodeHilite": cached_code_hilite}
+        return FunctionType(run.__code__, scope, run.__name__, run.__defaults__)
+
+    class CachedHiliteTreeprocessor(codehilite.HiliteTreeprocessor):
+        run = resolving_cached(codehilite, codehilite.HiliteTreeprocessor.run)
+
+    class CachedFencedBlockPreprocessor(fenced_code.FencedBlockPreprocessor):
+        run = resolving_cached(fenced_code, fenced_code.FencedBlockPreprocessor.run)
+
+    class CachedHighlightExtension(Extension):
+        def extendMarkdown(self, md) -> None:
+            hiliter = CachedHiliteTreeprocessor(md)
+            hiliter.config = md.treeprocessors["hilite"].config
+            md.treeprocessors.register(hiliter, "hilite", 30)
+            fenced = md.preprocessors["fenced_code_block"]
+            md.preprocessors.register(
+                CachedFencedBlockPreprocessor(md, fenced.config), "fenced_code_block", 25
+            )
+
+    return CachedHighlightExtension
+
+
+def _markdown_converter(markdown: ModuleType, guess_lang: bool):
+    """Return this thread's reusable ``Markdown`` instance, reset for a new document."""
+    converters = getattr(_converters, "by_guess_lang", None)
+    if converters is None:
+        converters = _converters.by_guess_lang = {}
+    converter = converters.get(guess_lang)
+    if converter is None:
+        converter = converters[guess_lang] = markdown.Markdown(
+            extensions=[*MARKDOWN_EXTENSIONS, _cached_highlighting()()],
+            extension_configs={"codehilite": {"guess_lang": guess_lang}},
+            output_format="xhtml1",
+        )
+    return converter.reset()
+
+
+@cache
+def _load_bleach() -> ModuleType | None:
+    """Import bleach (and html5lib) on first use."""
+    try:
+        import bleach  # type: ignore
+    except Exception:
+        return None
+    return bleach
 
 
 def escape_plain_text(text: str) -> str:
@@ -54,9 +166,15 @@ def escape_plain_text(text: str) -> str:
     return html.escape(text).replace("\n", "<br>")
 
 
-def sanitize_html(html_in: str) -> str:
+def sanitize_html(html_in: str, sanitizer: str = "bleach") -> str:
     """Remove unsafe HTML while preserving a small publishing-oriented subset."""
-    if not _BLEACH_AVAILABLE:
+    if sanitizer == "stdlib":
+        return drop_remote_images(
+            clean_and_linkify(html_in, ALLOWED_TAGS, ALLOWED_ATTRIBUTES, ALLOWED_PROTOCOLS)
+        )
+
+    bleach = _load_bleach()
+    if bleach is None:
         return escape_plain_text(html_in)
 
     cleaned = bleach.clean(
@@ -66,28 +184,47 @@ def sanitize_html(html_in: str) -> str:
         protocols=ALLOWED_PROTOCOLS,
         strip=True,
     )
-    return bleach.linkify(
-        cleaned,
-        callbacks=[bleach.callbacks.nofollow, bleach.callbacks.target_blank],
-        parse_email=False,
+    return drop_remote_images(
+        bleach.linkify(
+            cleaned,
+            callbacks=[bleach.callbacks.nofollow, bleach.callbacks.target_blank],
+            parse_email=False,
+        )
     )
 
 
-def markdown_to_html(text: str) -> str:
+def drop_remote_images(html_out: str) -> str:
+    """Remove sanitized ``<img>`` tags that do not point at the local media store.
+
+    Remote images would let senders track readers, so only ``/media/`` images
+    extracted at ingest are kept.
+    """
+    if "<img" not in html_out:
+        return html_out
+    return IMAGE_TAG_PATTERN.sub(
+        lambda match: match.group(0) if LOCAL_IMAGE_SRC.search(match.group(0)) else "",
+        html_out,
+    )
+
+
+def markdown_to_html(text: str, sanitizer: str = "bleach", guess_lang: bool = True) -> str:
     """Render Markdown into sanitized HTML."""
-    if not _MARKDOWN_AVAILABLE:
+    markdown = _load_markdown()
+    if markdown is None:
         return escape_plain_text(text)
 
-    html_out = _markdown.markdown(
-        text,
-        extensions=["extra", "sane_lists", "nl2br", "codehilite"],
-        output_format="xhtml1",
-    )
-    return sanitize_html(html_out)
+    html_out = _markdown_converter(markdown, guess_lang).convert(text)
+    return sanitize_html(html_out, sanitizer)
 
 
-def render_content_to_html(content: str, content_type: str, render_mode: str = "plain") -> str:
-    """Render email content to safe HTML based on the configured mode."""
+def render_content_to_html(
+    content: str,
+    content_type: str,
+    render_mode: str = "plain",
+    sanitizer: str = "bleach",
+    guess_lang: bool = True,
+) -> str:
+    """Render email content to safe HTML based on the configured mode and sanitizer."""
     ctype = (content_type or "text/plain").lower()
     mode = (render_mode or "plain").lower()
 
@@ -96,11 +233,11 @@ def render_content_to_html(content: str, content_type: str, render_mode: str = "
 
     if mode == "markdown":
         if ctype == "text/html":
-            return sanitize_html(content)
-        return markdown_to_html(content)
+            return sanitize_html(content, sanitizer)
+        return markdown_to_html(content, sanitizer, guess_lang)
 
     if ctype == "text/html":
-        return sanitize_html(content)
+        return sanitize_html(content, sanitizer)
     if ctype in ("text/markdown", "text/x-markdown"):
-        return markdown_to_html(content)
+        return markdown_to_html(content, sanitizer, guess_lang)
     return escape_plain_text(content)
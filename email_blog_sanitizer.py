@@ -0,0 +1,165 @@
+"""Sanitize HTML with the standard library parser in a single pass."""
+
+from __future__ import annotations
+
+import html
+import re
+from collections.abc import Iterable, Mapping
+from html.parser import HTMLParser
+
+VOID_TAGS = frozenset({"br", "hr", "img"})
+BLOCK_TAGS = frozenset(
+    {"p", "pre", "blockquote", "ul", "ol", "hr", "h1", "h2", "h3", "h4", "h5", "h6"}
+)
+URL_ATTRIBUTES = frozenset({"href", "src"})
+NO_LINKIFY_TAGS = frozenset({"a", "pre"})
+URL_PATTERN = re.compile(r"(?:https?://|www\.)[^\s<>\"']+", re.IGNORECASE)
+TRAILING_PUNCTUATION = ".,;:!?'\""
+# Browsers ignore ASCII whitespace and control characters inside a URL scheme.
+SCHEME_NOISE = re.compile(r"[\x00-\x20\x7f]+")
+
+
+class AllowlistSanitizer(HTMLParser):
+    """Strip disallowed markup, then linkify and add nofollow/target in the same pass.
+
+    Mirrors ``bleach.clean(strip=True)`` followed by ``bleach.linkify`` with the
+    ``nofollow`` and ``target_blank`` callbacks: disallowed tags are dropped while
+    their text is kept (escaped), comments are removed, attributes and URL
+    protocols are filtered, and every open element is closed so the output is
+    always well formed.
+    """
+
+    def __init__(
+        self,
+        tags: Iterable[str],
+        attributes: Mapping[str, Iterable[str]],
+        protocols: Iterable[str],
+    ):
+        super().__init__(convert_charrefs=True)
+        self.tags = frozenset(tags)
+        self.attributes = {tag: frozenset(names) for tag, names in attributes.items()}
+        self.protocols = frozenset(protocol.lower() for protocol in protocols)
+        self._out: list[str] = []
+        self._open: list[str] = []
+
+    def sanitize(self, html_in: str) -> str:
+        """Return the sanitized, linkified form of ``html_in``."""
+        self.feed(html_in)
+        self.close()
+        while self._open:
+            self._out.append(f"</{self._open.pop()}>")
+        result = "".join(self._out)
+        self._out.clear()
+        self.reset()
+        return result
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in self.tags:
+            return
+        self._close_implied(tag)
+        self._out.append(self._render_start(tag, attrs))
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in self.tags:
+            return
+        if tag in VOID_TAGS:
+            self._close_implied(tag)
+            self._out.append(self._render_start(tag, attrs))
+        else:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self._open:
+            return
+        while self._open:
+            current = self._open.pop()
+            self._out.append(f"</{current}>")
+            if current == tag:
+                return
+
+    def handle_data(self, data: str) -> None:
+        if NO_LINKIFY_TAGS.intersection(self._open):
+            self._out.append(html.escape(data, quote=False))
+            return
+        self._out.append(self._linkify(data))
+
+    def _close_implied(self, tag: str) -> None:
+        """Apply the HTML end-tag rules that matter for a flat allowlist."""
+        if tag == "a" and "a" in self._open:
+            self.handle_endtag("a")
+        elif tag == "li" and self._open and self._open[-1] == "li":
+            self.handle_endtag("li")
+        elif tag in BLOCK_TAGS and "p" in self._open:
+            self.handle_endtag("p")
+
+    def _render_start(self, tag: str, attrs: list[tuple[str, str | None]]) -> str:
+        allowed = self.attributes.get(tag, frozenset())
+        kept: dict[str, str] = {}
+        for name, value in attrs:
+            if name not in allowed or name in kept:
+                continue
+            value = value or ""
+            if name in URL_ATTRIBUTES and not self._url_allowed(value):
+                continue
+            kept[name] = value
+        if tag == "a":
+            self._add_link_attributes(kept)
+        rendered = "".join(
+            f' {name}="{html.escape(value, quote=True)}"' for name, value in kept.items()
+        )
+        return f"<{tag}{rendered}>"
+
+    def _url_allowed(self, value: str) -> bool:
+        url = SCHEME_NOISE.sub("", value)
+        scheme, colon, _ = url.partition(":")
+        if not colon or any(char in scheme for char in "/?#"):
+            return True
+        return scheme.lower() in self.protocols
+
+    @staticmethod
+    def _add_link_attributes(attrs: dict[str, str]) -> None:
+        href = attrs.get("href")
+        if href is None or href.lower().startswith("mailto:"):
+            return
+        rel = attrs.get("rel", "").split()
+        if "nofollow" not in rel:
+            rel.append("nofollow")
+        attrs["rel"] = " ".join(rel)
+        attrs["target"] = "_blank"
+
+    def _linkify(self, text: str) -> str:
+        parts = []
+        position = 0
+        for match in URL_PATTERN.finditer(text):
+            url = _trim_url(match.group(0))
+            start, end = match.start(), match.start() + len(url)
+            parts.append(html.escape(text[position:start], quote=False))
+            href = url if "://" in url else f"http://{url}"
+            parts.append(
+                f'<a href="{html.escape(href, quote=True)}" rel="nofollow" target="_blank">'
+                f"{html.escape(url, quote=False)}</a>"
+            )
+            position = end
+        parts.append(html.escape(text[position:], quote=False))
+        return "".join(parts)
+
+
+def clean_and_linkify(
+    html_in: str,
+    tags: Iterable[str],
+    attributes: Mapping[str, Iterable[str]],
+    protocols: Iterable[str],
+) -> str:
+    """Sanitize ``html_in`` against the given allowlists using ``html.parser``."""
+    return AllowlistSanitizer(tags, attributes, protocols).sanitize(html_in)
+
+
+def _trim_url(url: str) -> str:
+    while url and url[-1] in TRAILING_PUNCTUATION:
+        url = url[:-1]
+    if url.endswith(")") and url.count("(") < url.count(")"):
+        url = url[:-1]
+    return url
@@ -0,0 +1,62 @@
+"""Slice ingest work so HTTP requests never wait behind a whole sync."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+DEFAULT_TICK_BUDGET_MS = 4
+DEFAULT_MAX_DEFER_MS = 50
+DEFER_POLL_INTERVAL = 0.002
+
+
+class IngestScheduler:
+    """Cooperative time slicing for ingest coroutines sharing the loop with HTTP.
+
+    Ingest stages call ``checkpoint()`` between messages. Once ingest has run
+    for ``tick_budget`` seconds since it last gave up the loop, the checkpoint
+    yields so ready HTTP callbacks run. While ``http_busy()`` reports requests
+    in flight, checkpoints also hold ingest back (for at most ``max_defer``
+    seconds at a time, so a steady trickle of requests cannot starve it).
+    """
+
+    def __init__(
+        self,
+        http_busy: Callable[[], bool],
+        tick_budget: float = DEFAULT_TICK_BUDGET_MS / 1000,
+        max_defer: float = DEFAULT_MAX_DEFER_MS / 1000,
+    ):
+        self.http_busy = http_busy
+        self.tick_budget = tick_budget
+        self.max_defer = max(0.0, max_defer)
+        self.yields = 0
+        self.deferred = 0.0
+        self._tick_started = time.perf_counter()
+        self._tick_pending = False
+
+    async def checkpoint(self) -> None:
+        """Yield the loop if this tick's budget is spent or HTTP requests are waiting."""
+        busy = self.http_busy()
+        if not busy and time.perf_counter() - self._tick_started < self.tick_budget:
+            return
+        self.yields += 1
+        if busy:
+            started = time.perf_counter()
+            deadline = started + self.max_defer
+            await asyncio.sleep(0)
+            while self.http_busy() and time.perf_counter() < deadline:
+                await asyncio.sleep(DEFER_POLL_INTERVAL)
+            self.deferred += time.perf_counter() - started
+            self._tick_started = time.perf_counter()
+            return
+        if not self._tick_pending:
+            # The budget is shared by every ingest coroutine: it restarts once,
+            # at the beginning of the next loop iteration, not per coroutine.
+            self._tick_pending = True
+            asyncio.get_running_loop().call_soon(self._start_tick)
+        await asyncio.sleep(0)
+
+    def _start_tick(self) -> None:
+        self._tick_pending = False
+        self._tick_started = time.perf_counter()
@@ -0,0 +1,312 @@
+"""Rank cached posts with an incrementally maintained BM25 inverted index."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from html.parser import HTMLParser
+from pathlib import Path
+
+from email_blog_posts import EmailPost
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 20
+MAX_QUERY_CHARS = 200
+SUBJECT_WEIGHT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+INDEX_FORMAT_VERSION = 1
+RESULT_CACHE_SIZE = 128
+TOKEN_PATTERN = re.compile(r"\w+")
+# Words found in nearly every post add almost nothing to a BM25 score but have
+# the longest posting lists, so they are neither indexed nor searched.
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or re "
+    "that the this to was were will with you your".split()
+)
+
+
+class SearchIndex:
+    """Map terms to the posts containing them and score matches with Okapi BM25.
+
+    Posts are added and removed one at a time, so the index follows the post
+    cache without rebuilds. Each document is fingerprinted; re-adding an
+    unchanged post (e.g. when a restarted server re-fetches recent mail into an
+    index loaded from disk) is a no-op. Scoring only walks the posting lists of
+    the query terms, and ranked results are memoized until the index changes.
+    """
+
+    def __init__(self):
+        self.uid_validity: str | None = None
+        self._postings: dict[str, dict[str, int]] = {}
+        self._docs: dict[str, tuple[str, dict[str, int]]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+        self._norms: dict[str, float] | None = None
+        self._results: OrderedDict[tuple, tuple[list[tuple[str, float]], int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._docs
+
+    def add(self, post: EmailPost) -> None:
+        """Index (or re-index) one post.
+
+        A ``post.search_document`` set by ``analyze`` at parse time is used (and
+        cleared) instead of tokenizing the post again.
+        """
+        terms = None
+        if post.search_document is not None:
+            digest, terms = post.search_document
+            post.search_document = None
+        else:
+            text = document_text(post)
+            digest = _fingerprint(text)
+        existing = self._docs.get(post.uid)
+        if existing and existing[0] == digest:
+            return
+        self.remove(post.uid)
+        self._insert(post.uid, digest, _term_counts(post, text) if terms is None else terms)
+
+    def remove(self, uid: str) -> None:
+        """Drop every posting for ``uid``."""
+        doc = self._docs.pop(uid, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(uid)
+        for term in doc[1]:
+            postings = self._postings[term]
+            del postings[uid]
+            if not postings:
+                del self._postings[term]
+        self._changed()
+
+    def rename(self, uids: Mapping[str, str]) -> None:
+        """Move documents to new UIDs (``{old: new}``) without re-tokenizing them."""
+        docs = [(uids[old], self._docs[old]) for old in uids if old in self._docs]
+        for old in uids:
+            self.remove(old)
+        for uid, (digest, terms) in docs:
+            self._insert(uid, digest, terms)
+
+    def retain(self, uids: set[str]) -> None:
+        """Remove documents whose UID is not in ``uids``."""
+        for uid in [uid for uid in self._docs if uid not in uids]:
+            self.remove(uid)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._docs.clear()
+        self._lengths.clear()
+        self._total_length = 0
+        self._changed()
+
+    def search(self, query: str, limit: int | None = None) -> tuple[list[tuple[str, float]], int]:
+        """Rank posts matching any query term.
+
+        Return the best ``limit`` ``(uid, score)`` pairs (all of them when
+        ``limit`` is None) and the total number of matching posts.
+
+        Terms are scored one at a time, rarest first. A term adds at most
+        ``idf * (k1 + 1)`` to a post, so once the ``limit``-th best score beats
+        what the remaining terms could add, posts not yet seen are skipped and
+        only candidates that can still reach the top ``limit`` keep scoring.
+        """
+        terms = frozenset(tokenize(query[:MAX_QUERY_CHARS]))
+        if not terms or not self._docs:
+            return [], 0
+        key = (terms, limit)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached
+        norms = self._length_norms()
+        total = len(self._docs)
+        weighted = []
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings:
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                weighted.append((idf * (BM25_K1 + 1), postings))
+        weighted.sort(key=lambda item: item[0], reverse=True)
+        matched = len(set().union(*(postings for _, postings in weighted)))
+        remaining = sum(bound for bound, _ in weighted)
+
+        scores: dict[str, float] = {}
+        for bound, postings in weighted:
+            if not scores:
+                scores = {
+                    uid: bound * count / (count + norms[uid]) for uid, count in postings.items()
+                }
+            elif (threshold := _kth_largest(scores.values(), limit)) <= remaining:
+                for uid, count in postings.items():
+                    scores[uid] = scores.get(uid, 0.0) + bound * count / (count + norms[uid])
+            else:
+                for uid, score in list(scores.items()):
+                    if score + remaining < threshold:
+                        del scores[uid]
+                    elif (count := postings.get(uid)) is not None:
+                        scores[uid] = score + bound * count / (count + norms[uid])
+            remaining -= bound
+        by_score = zip(scores.values(), scores.keys(), strict=True)
+        top = sorted(by_score, reverse=True) if limit is None else heapq.nlargest(limit, by_score)
+        ranked = [(uid, score) for score, uid in top]
+        self._results[key] = (ranked, matched)
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return ranked, matched
+
+    def snapshot(self) -> dict:
+        """Return what ``save`` writes, detached from later changes to the index.
+
+        Only the document table is copied; its term counts are never mutated in
+        place, so the copy is cheap and the snapshot can be written without
+        holding the lock that guards the index.
+        """
+        return {
+            "version": INDEX_FORMAT_VERSION,
+            "uid_validity": self.uid_validity,
+            "docs": dict(self._docs),
+        }
+
+    def save(self, path: str | Path) -> None:
+        """Atomically write the index as JSON."""
+        write_snapshot(path, self.snapshot())
+
+    def load(self, path: str | Path) -> bool:
+        """Replace the index with one saved by ``save``; return whether it was loaded."""
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable search index %s: %s", path, exc)
+            return False
+        if not isinstance(payload, dict) or payload.get("version") != INDEX_FORMAT_VERSION:
+            logger.warning("Ignoring search index %s with an unknown format", path)
+            return False
+        self.clear()
+        self.uid_validity = payload.get("uid_validity")
+        for uid, (digest, terms) in payload["docs"].items():
+            self._insert(uid, digest, terms)
+        logger.info("Loaded search index with %s post(s) from %s", len(self._docs), path)
+        return True
+
+    def _insert(self, uid: str, digest: str, terms: dict[str, int]) -> None:
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[uid] = count
+        length = sum(terms.values())
+        self._docs[uid] = (digest, terms)
+        self._lengths[uid] = length
+        self._total_length += length
+        self._changed()
+
+    def _changed(self) -> None:
+        self._norms = None
+        self._results.clear()
+
+    def _length_norms(self) -> dict[str, float]:
+        # BM25's length normalisation only changes when documents are added or
+        # removed, so it is computed once per change instead of once per query.
+        if self._norms is None:
+            average = self._total_length / len(self._docs) or 1.0
+            self._norms = {
+                uid: BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+                for uid, length in self._lengths.items()
+            }
+        return self._norms
+
+
+def analyze(post: EmailPost) -> tuple[str, dict[str, int]]:
+    """Return the fingerprint and weighted term counts ``SearchIndex.add`` stores for a post.
+
+    Touches no index state, so ingest can call it from its parse threads and
+    keep tokenizing off the event loop.
+    """
+    text = document_text(post)
+    return _fingerprint(text), _term_counts(post, text)
+
+
+def write_snapshot(path: str | Path, snapshot: dict) -> None:
+    """Atomically write an index ``snapshot`` as JSON."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, separators=(",", ":"))
+        os.replace(temp_name, target)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into case-folded word tokens, dropping stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.casefold()) if token not in STOPWORDS]
+
+
+def document_text(post: EmailPost) -> str:
+    """Return the searchable text of a post: subject, sender, and plain body text."""
+    body = post.content
+    if post.content_type == "text/html":
+        body = html_to_text(body)
+    return "\n".join((post.subject, post.sender, body))
+
+
+def html_to_text(html_in: str) -> str:
+    """Return the text content of an HTML document, ignoring scripts and styles."""
+    extractor = _TextExtractor()
+    extractor.feed(html_in)
+    extractor.close()
+    return " ".join(extractor.parts)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _term_counts(post: EmailPost, text: str) -> dict[str, int]:
+    terms = Counter(tokenize(text))
+    for term in tokenize(post.subject):
+        terms[term] += SUBJECT_WEIGHT - 1
+    return dict(terms)
+
+
+def _kth_largest(scores, k: int | None) -> float:
+    """Return the ``k``-th largest score, or 0.0 while there are fewer than ``k``."""
+    if not k or len(scores) < k:
+        return 0.0
+    return heapq.nlargest(k, scores)[-1]
+
+
+class _TextExtractor(HTMLParser):
+    _SKIPPED = frozenset({"script", "style"})
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self._SKIPPED:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIPPED and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
@@ -3,33 +3,128 @@
 from __future__ import annotations
 
 import asyncio
+import calendar
+import functools
+import hashlib
+import json
 import logging
+import math
 import signal
-from collections import deque
+import sqlite3
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from threading import RLock
+from typing import Any
+from urllib.parse import quote, urlencode
 
 from aiohttp import web
 
+from email_blog_api import (
+    API_DEFAULT_LIMIT,
+    API_MAX_LIMIT,
+    CursorNotFound,
+    encode_listing,
+    finish_post_json,
+    post_json_prefix,
+    select_posts,
+)
+from email_blog_backfill import DEFAULT_BACKFILL_BATCH_SIZE, DEFAULT_BACKFILL_RATE
+from email_blog_cache import (
+    DEFAULT_POST_CACHE_BYTES,
+    DEFAULT_RENDER_CACHE_BYTES,
+    PostCache,
+    RenderCache,
+)
 from email_blog_config import (
     CONTENT_SECURITY_POLICY,
     DEFAULT_MAX_BODY_CHARS,
     DEFAULT_MAX_EMAIL_BYTES,
+    LIVE_CONTENT_SECURITY_POLICY,
+    is_public_bind,
     request_has_token,
     validate_exposure,
     validate_public_url,
 )
+from email_blog_events import (
+    DEFAULT_HEARTBEAT_SECONDS,
+    DEFAULT_MAX_CLIENTS,
+    RECONNECT_MS,
+    EventBroadcaster,
+)
+from email_blog_excerpt import DEFAULT_EXCERPT_BLOCKS, build_excerpt
 from email_blog_feed import build_rss
-from email_blog_html import build_blog_html, build_email_html
+from email_blog_html import (
+    LIVE_SCRIPT_URL,
+    build_blog_html,
+    build_email_html,
+    build_pagination_html,
+)
 from email_blog_imap import EmailBlogImapMixin
+from email_blog_indexes import LISTING_PAGE_SIZE, PostIndexes, PostListing, sender_key
+from email_blog_load import DEFAULT_RETRY_AFTER, LoadShedder, LoopLagMonitor
+from email_blog_media import MediaStore
+from email_blog_memory import (
+    DEFAULT_TOP_ALLOCATORS,
+    DEFAULT_TRACE_FRAMES,
+    AllocationTracker,
+    process_memory,
+)
 from email_blog_messages import (
     extract_email_content,
     safe_decode,
 )
-from email_blog_rendering import render_content_to_html
+from email_blog_metrics import METRICS_CONTENT_TYPE, render_prometheus
+from email_blog_pipeline import (
+    DEFAULT_FETCH_CONCURRENCY,
+    DEFAULT_PARSE_CONCURRENCY,
+    DEFAULT_QUEUE_SIZE,
+)
+from email_blog_posts import EmailPost, as_post, post_identity
+from email_blog_push import (
+    DEFAULT_LMTP_HOST,
+    PUSH_DUPLICATE,
+    PUSH_FAILED,
+    PUSH_PUBLISHED,
+    PUSH_REJECTED,
+    PUSH_TOO_LARGE,
+    LmtpServer,
+    push_uid,
+)
+from email_blog_rendering import SANITIZERS, render_content_to_html
+from email_blog_scheduler import DEFAULT_MAX_DEFER_MS, DEFAULT_TICK_BUDGET_MS, IngestScheduler
+from email_blog_search import MAX_QUERY_CHARS, SEARCH_PAGE_SIZE, SearchIndex, write_snapshot
+from email_blog_static import DEFAULT_PAGE_SIZE, StaticSiteExporter
+from email_blog_store import SOURCE_IMAP, PostStore, post_source
+from email_blog_trace import DEFAULT_TRACE_FILE_BYTES, CommandTracer
 
 logger = logging.getLogger(__name__)
 STRICT_TRANSPORT_SECURITY = "max-age=31536000; includeSubDomains"
+# The index page and RSS feed list at most this many of the newest cached posts.
+INDEX_POSTS = 100
+# Seconds between the first ingest after a search index save and the next save.
+SEARCH_INDEX_SAVE_DELAY = 60.0
+# Settings a SIGHUP reload applies in place; changing any other one needs a restart.
+RENDER_SETTINGS = frozenset(
+    {"render_mode", "sanitizer", "code_guess_lang", "excerpt_chars", "excerpt_blocks"}
+)
+PAGE_SETTINGS = frozenset({"blog_title", "public_url", "stale_while_revalidate"})
+IMAP_SETTINGS = frozenset({"imap_server", "email_addr", "password", "mailbox"})
+# Read on every request or message, so nothing cached depends on them.
+RUNTIME_SETTINGS = frozenset(
+    {"access_token", "allowed_senders", "max_email_bytes", "max_body_chars"}
+)
+_RELOADABLE = RENDER_SETTINGS | PAGE_SETTINGS | IMAP_SETTINGS | RUNTIME_SETTINGS
+# Only checked, with the new access token, by validate_exposure.
+EXPOSURE_SETTINGS = frozenset({"allow_public_bind", "allow_public_without_auth"})
+PUSH_HTTP_STATUS = {
+    PUSH_PUBLISHED: 201,
+    PUSH_DUPLICATE: 200,
+    PUSH_REJECTED: 422,
+    PUSH_TOO_LARGE: 413,
+    PUSH_FAILED: 500,
+}
 
 
 class EmailBlogServer(EmailBlogImapMixin):
@@ -53,7 +148,98 @@ class EmailBlogServer(EmailBlogImapMixin):
         max_body_chars: int = DEFAULT_MAX_BODY_CHARS,
         allow_public_bind: bool = False,
         allow_public_without_auth: bool = False,
+        serve_http: bool = True,
+        static_dir: str | None = None,
+        static_page_size: int = DEFAULT_PAGE_SIZE,
+        reuse_port: bool = False,
+        sanitizer: str = "bleach",
+        code_guess_lang: bool = True,
+        ingest_fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+        ingest_parse_concurrency: int = DEFAULT_PARSE_CONCURRENCY,
+        ingest_queue_size: int = DEFAULT_QUEUE_SIZE,
+        post_cache_max_bytes: int = DEFAULT_POST_CACHE_BYTES,
+        render_cache_max_bytes: int = DEFAULT_RENDER_CACHE_BYTES,
+        search_index_path: str | None = None,
+        excerpt_chars: int = 0,
+        excerpt_blocks: int = DEFAULT_EXCERPT_BLOCKS,
+        stale_while_revalidate: bool = False,
+        ingest_token: str | None = None,
+        lmtp_host: str = DEFAULT_LMTP_HOST,
+        lmtp_port: int | None = None,
+        post_store_path: str | None = None,
+        backfill_max_messages: int = 0,
+        backfill_batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+        backfill_rate: int = DEFAULT_BACKFILL_RATE,
+        shed_loop_lag_ms: int = 0,
+        shed_max_in_flight: int = 0,
+        shed_retry_after: int = DEFAULT_RETRY_AFTER,
+        ingest_tick_budget_ms: int = DEFAULT_TICK_BUDGET_MS,
+        ingest_max_defer_ms: int = DEFAULT_MAX_DEFER_MS,
+        media_dir: str | None = None,
+        live_updates: bool = False,
+        sse_heartbeat: int = DEFAULT_HEARTBEAT_SECONDS,
+        sse_max_clients: int = DEFAULT_MAX_CLIENTS,
+        imap_trace_buffer: int = 0,
+        imap_trace_file: str | None = None,
+        imap_trace_file_bytes: int = DEFAULT_TRACE_FILE_BYTES,
+        imap_slow_ms: int = 0,
+        admin_token: str | None = None,
     ):
+        # Constructor arguments, compared against reloaded configuration.
+        self._settings: dict[str, Any] = {
+            "imap_server": imap_server,
+            "email_addr": email_addr,
+            "password": password,
+            "host": host,
+            "port": port,
+            "blog_title": blog_title,
+            "public_url": public_url,
+            "enable_imap": enable_imap,
+            "render_mode": render_mode,
+            "mailbox": mailbox,
+            "access_token": access_token,
+            "allowed_senders": allowed_senders,
+            "max_email_bytes": max_email_bytes,
+            "max_body_chars": max_body_chars,
+            "allow_public_bind": allow_public_bind,
+            "allow_public_without_auth": allow_public_without_auth,
+            "serve_http": serve_http,
+            "static_dir": static_dir,
+            "static_page_size": static_page_size,
+            "reuse_port": reuse_port,
+            "sanitizer": sanitizer,
+            "code_guess_lang": code_guess_lang,
+            "ingest_fetch_concurrency": ingest_fetch_concurrency,
+            "ingest_parse_concurrency": ingest_parse_concurrency,
+            "ingest_queue_size": ingest_queue_size,
+            "post_cache_max_bytes": post_cache_max_bytes,
+            "render_cache_max_bytes": render_cache_max_bytes,
+            "search_index_path": search_index_path,
+            "excerpt_chars": excerpt_chars,
+            "excerpt_blocks": excerpt_blocks,
+            "stale_while_revalidate": stale_while_revalidate,
+            "ingest_token": ingest_token,
+            "lmtp_host": lmtp_host,
+            "lmtp_port": lmtp_port,
+            "post_store_path": post_store_path,
+            "backfill_max_messages": backfill_max_messages,
+            "backfill_batch_size": backfill_batch_size,
+            "backfill_rate": backfill_rate,
+            "shed_loop_lag_ms": shed_loop_lag_ms,
+            "shed_max_in_flight": shed_max_in_flight,
+            "shed_retry_after": shed_retry_after,
+            "ingest_tick_budget_ms": ingest_tick_budget_ms,
+            "ingest_max_defer_ms": ingest_max_defer_ms,
+            "media_dir": media_dir,
+            "live_updates": live_updates,
+            "sse_heartbeat": sse_heartbeat,
+            "sse_max_clients": sse_max_clients,
+            "imap_trace_buffer": imap_trace_buffer,
+            "imap_trace_file": imap_trace_file,
+            "imap_trace_file_bytes": imap_trace_file_bytes,
+            "imap_slow_ms": imap_slow_ms,
+            "admin_token": admin_token,
+        }
         self.imap_server = imap_server
         self.email_addr = email_addr
         self.password = password
@@ -63,130 +249,1300 @@ class EmailBlogServer(EmailBlogImapMixin):
         self.public_url = validate_public_url(public_url) if public_url else None
         self.enable_imap = enable_imap
         self.render_mode = (render_mode or "plain").lower()
+        self.sanitizer = (sanitizer or "bleach").lower()
+        if self.sanitizer not in SANITIZERS:
+            raise ValueError(f"HTML_SANITIZER must be one of: {', '.join(SANITIZERS)}")
+        self.code_guess_lang = code_guess_lang
+        self.excerpt_chars = max(0, excerpt_chars)
+        self.excerpt_blocks = max(1, excerpt_blocks)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.ingest_fetch_concurrency = max(1, ingest_fetch_concurrency)
+        self.ingest_parse_concurrency = max(1, ingest_parse_concurrency)
+        self.ingest_queue_size = max(1, ingest_queue_size)
         self.mailbox = mailbox or "INBOX"
         self.access_token = access_token
         self.allowed_senders = allowed_senders or []
         self.max_email_bytes = max_email_bytes
         self.max_body_chars = max_body_chars
+        self.serve_http = serve_http
+        self.reuse_port = reuse_port
 
         validate_exposure(host, access_token, allow_public_bind, allow_public_without_auth)
+        if lmtp_port is not None and is_public_bind(lmtp_host) and not allow_public_bind:
+            raise ValueError("Public LMTP_HOST binding requires ALLOW_PUBLIC_BIND=true")
+        self.ingest_token = ingest_token
+        self.lmtp_server = (
+            LmtpServer(self.ingest_raw_message, lmtp_host, lmtp_port, max_email_bytes)
+            if lmtp_port is not None
+            else None
+        )
 
-        self.emails_cache: deque[dict[str, str]] = deque(maxlen=100)
+        self.emails_cache = PostCache(post_cache_max_bytes, on_evict=self._forget_post)
+        self.render_cache = RenderCache(render_cache_max_bytes)
+        self.search_index = SearchIndex()
+        self.post_indexes = PostIndexes()
+        self.search_index_path = search_index_path
+        self._search_save_task: asyncio.Task | None = None
+        self._search_save_lock = asyncio.Lock()
+        if backfill_max_messages > 0 and not post_store_path:
+            raise ValueError("BACKFILL_MAX_MESSAGES requires POST_STORE_PATH")
+        self.post_store = PostStore(post_store_path) if post_store_path else None
+        self.media_store = MediaStore(media_dir) if media_dir else None
+        self._post_store_loaded = False
+        self.backfill_max_messages = max(0, backfill_max_messages)
+        self.backfill_batch_size = max(1, backfill_batch_size)
+        self.backfill_rate = max(1, backfill_rate)
         self.processed_uids: set[str] = set()
         self.uid_validity: str | None = None
+        self.generation = 0
+        # Message-ID (or content hash) -> UID, and permalink slug -> UID, of cached posts.
+        self._identity_uids: dict[str, str] = {}
+        self._slug_uids: dict[str, str] = {}
+        # Slugs of posts dropped by a UID remap, handed back if the message is fetched again.
+        self._orphan_slugs: dict[str, str] = {}
+        self._remap_pending = False
+        self._uid_map_ready = asyncio.Event()
+        self._page_builds: dict[tuple[str, int], asyncio.Future] = {}
+        self._post_listeners: list[Callable[[str, EmailPost | None], None]] = []
+        self._reload_listeners: list[Callable[[dict[str, Any]], None]] = []
+        # Returns fresh constructor settings; set by the CLI to enable SIGHUP reloads.
+        self.config_loader: Callable[[], dict[str, Any]] | None = None
         self._cache_lock = RLock()
         self._monitor_task: asyncio.Task | None = None
+        self._backfill_task: asyncio.Task | None = None
+        self._live_ingest_idle = asyncio.Event()
+        self._live_ingest_idle.set()
+        self._parse_executor: ThreadPoolExecutor | None = None
+        # One thread owns post store I/O, so writes keep their order and never block the loop.
+        self._store_executor: ThreadPoolExecutor | None = None
+        self._unsaved_posts: list[EmailPost] = []
         self._runner: web.AppRunner | None = None
         self._closed_event: asyncio.Event | None = None
         self.imap_client = None
+        self.tracer = CommandTracer(
+            imap_trace_buffer, imap_trace_file, imap_slow_ms, imap_trace_file_bytes
+        )
+        self.admin_token = admin_token
+        self.allocations = AllocationTracker()
+
+        self.live_events = (
+            EventBroadcaster(sse_heartbeat, sse_max_clients) if live_updates else None
+        )
+        if self.live_events:
+            self.add_post_listener(self._broadcast_post)
+        self.loop_lag = LoopLagMonitor()
+        self.load_shedder = LoadShedder(
+            self.loop_lag,
+            shed_loop_lag_ms / 1000,
+            shed_max_in_flight,
+            shed_retry_after,
+            untracked_paths=frozenset({"/events"}),
+        )
+        self._etags: dict[str, tuple[str, str]] = {}
+        self._post_json: dict[str, bytes] = {}
+        self.ingest_scheduler = (
+            IngestScheduler(
+                lambda: self.load_shedder.in_flight > 0,
+                ingest_tick_budget_ms / 1000,
+                ingest_max_defer_ms / 1000,
+            )
+            if ingest_tick_budget_ms > 0
+            else None
+        )
 
-        self.app = web.Application()
+        self.app = web.Application(middlewares=[self.load_shedder.middleware])
         self.app.router.add_get("/", self.handle_blog)
         self.app.router.add_get("/health", self.handle_health)
+        self.app.router.add_get("/metrics", self.handle_metrics)
         self.app.router.add_get("/email/{uid}", self.handle_single_email)
         self.app.router.add_get("/feed.xml", self.handle_rss)
+        if self.media_store:
+            self.app.router.add_get("/media/{name}", self.handle_media)
+        self.app.router.add_get("/search", self.handle_search)
+        self.app.router.add_get("/sender/{address}", self.handle_sender)
+        self.app.router.add_get(r"/archive/{year:\d{4}}/{month:\d{2}}", self.handle_archive)
+        self.app.router.add_get("/api/posts", self.handle_api_posts)
+        self.app.router.add_get("/api/posts/{uid}", self.handle_api_post)
+        if admin_token:
+            self.app.router.add_get("/admin/trace", self.handle_admin_trace)
+            self.app.router.add_get("/admin/memory", self.handle_admin_memory)
+            self.app.router.add_post(
+                "/admin/memory/{action:start|snapshot|stop}", self.handle_admin_tracemalloc
+            )
+        if ingest_token:
+            self.app.router.add_post("/ingest", self.handle_ingest)
+        if self.live_events:
+            self.app.router.add_get("/events", self.handle_events)
+            self.app.router.add_get(LIVE_SCRIPT_URL, self.handle_live_script)
         self.template_path = Path(__file__).parent / "templates" / "blog_template.html"
+        self._live_script = (
+            (self.template_path.parent / "live_updates.js").read_bytes()
+            if self.live_events
+            else b""
+        )
+        self.static_exporter = (
+            StaticSiteExporter(
+                static_dir,
+                self.template_path,
+                self.blog_title,
+                self._base_url(),
+                self.render_mode,
+                page_size=static_page_size,
+                sanitizer=self.sanitizer,
+                excerpts=self.excerpts_enabled,
+            )
+            if static_dir
+            else None
+        )
+        self._export_lock = asyncio.Lock()
 
     safe_decode = staticmethod(safe_decode)
     get_email_content = staticmethod(extract_email_content)
 
     def render_content_to_html(self, content: str, content_type: str) -> str:
         """Render email content to safe HTML using this server's mode."""
-        return render_content_to_html(content, content_type, self.render_mode)
+        return render_content_to_html(
+            content, content_type, self.render_mode, self.sanitizer, self.code_guess_lang
+        )
+
+    @property
+    def excerpts_enabled(self) -> bool:
+        return self.excerpt_chars > 0
+
+    def build_excerpt(self, html_fragment: str) -> str | None:
+        """Return the index excerpt for a rendered fragment, if excerpts are enabled."""
+        return build_excerpt(html_fragment, self.excerpt_chars, self.excerpt_blocks)
 
-    def generate_html(self, single_email: dict[str, str] | None = None) -> str:
+    def generate_html(self, single_email: EmailPost | None = None) -> str:
         """Generate HTML blog content."""
+        key = _email_page_key(single_email.uid) if single_email else "index"
+        return self._cached_page(
+            key,
+            lambda: build_blog_html(
+                self.template_path,
+                self.blog_title,
+                [] if single_email else self._with_fragments(self._index_emails(), listed=True),
+                self.render_mode,
+                self._with_fragments([single_email])[0] if single_email else None,
+                sanitizer=self.sanitizer,
+                search_query="",
+                meta_links=True,
+                excerpts=self.excerpts_enabled,
+                live_updates=self.live_events is not None,
+            ),
+        )
+
+    def generate_sender_html(self, address: str, page: int = 1) -> str | None:
+        """Render one page of posts from a sender, or None if there is no such page."""
+        address = sender_key(address)
+        href = f"/sender/{quote(address, safe='@')}"
+        return self._listing_page(
+            _sender_page_key(address, page),
+            f"Posts from {address}",
+            lambda: self.post_indexes.by_sender(address),
+            page,
+            lambda number: f"{href}?page={number}",
+        )
+
+    def generate_archive_html(self, year: int, month: int, page: int = 1) -> str | None:
+        """Render one page of posts dated in a calendar month (UTC), or None."""
+        if not 1 <= month <= 12:
+            return None
+        return self._listing_page(
+            _archive_page_key(year, month, page),
+            f"Posts from {calendar.month_name[month]} {year}",
+            lambda: self.post_indexes.by_month(year, month),
+            page,
+            lambda number: f"/archive/{year:04d}/{month:02d}?page={number}",
+        )
+
+    def generate_search_html(self, query: str, page: int = 1) -> str:
+        """Render one page of BM25-ranked search results."""
+        query = query.strip()[:MAX_QUERY_CHARS]
+        with self._cache_lock:
+            hits, total = self.search_index.search(query, limit=page * SEARCH_PAGE_SIZE)
+            posts = [
+                post
+                for uid, _score in hits[(page - 1) * SEARCH_PAGE_SIZE :]
+                if (post := self.emails_cache.get(uid)) is not None
+            ]
+        heading = f"{total} result{'s' if total != 1 else ''} for \u201c{query}\u201d"
         return build_blog_html(
             self.template_path,
             self.blog_title,
-            self._emails(),
+            self._with_fragments(posts, listed=True),
             self.render_mode,
-            single_email,
+            pagination=build_pagination_html(
+                page,
+                max(1, math.ceil(total / SEARCH_PAGE_SIZE)),
+                lambda number: "/search?" + urlencode({"q": query, "page": number}),
+            ),
+            sanitizer=self.sanitizer,
+            heading=heading if query else "Search posts",
+            search_query=query,
+            meta_links=True,
+            excerpts=self.excerpts_enabled,
+            live_updates=self.live_events is not None,
         )
 
-    def generate_email_html(self, email_data: dict[str, str], linked: bool = False) -> str:
+    def generate_email_html(self, email_data: EmailPost, linked: bool = False) -> str:
         """Generate HTML for one email post."""
-        return build_email_html(email_data, self.render_mode, linked)
+        return build_email_html(email_data, self.render_mode, linked, self.sanitizer)
 
     def generate_rss(self) -> str:
         """Generate an XML-safe RSS feed."""
-        return build_rss(self._emails(), self.blog_title, self._base_url())
+        return self._cached_page(
+            "feed", lambda: build_rss(self._index_emails(), self.blog_title, self._base_url())
+        )
+
+    def add_post_listener(self, callback: Callable[[str, EmailPost | None], None]) -> None:
+        """Call ``callback("append", post)`` on publish and ``callback("reset", None)`` on clear.
+
+        ``callback("restore", post)`` adds an already-published post as the
+        oldest cached entry: for posts loaded from the post store or backfilled
+        from history, and, after a UID remap and ``reset``, for every cached
+        post, newest first.
+        """
+        self._post_listeners.append(callback)
+
+    def add_reload_listener(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Call ``callback(settings)`` after a configuration reload has been applied."""
+        self._reload_listeners.append(callback)
 
     async def handle_blog(self, request: web.Request) -> web.Response:
         """Handle blog page requests."""
         self._require_auth(request)
-        return self._html_response(self.generate_html())
+        return await self._conditional_page(
+            request, "index", self.generate_html, self._html_response
+        )
 
     async def handle_single_email(self, request: web.Request) -> web.Response:
         """Handle single email view requests."""
         self._require_auth(request)
-        uid = request.match_info["uid"]
-        email_data = next(
-            (email for email in self._emails() if str(email["uid"]) == str(uid)), None
-        )
+        slug = request.match_info["uid"]
+        with self._cache_lock:
+            email_data = self.emails_cache.get(self._slug_uids.get(slug, slug))
+        if email_data and email_data.slug != slug:
+            email_data = None
+        if not email_data and self.post_store:
+            # Older posts evicted from (or never loaded into) the cache are still permalinked.
+            email_data = await self._store_call(self.post_store.get_by_slug, slug)
         if not email_data:
             raise web.HTTPNotFound(text="Email not found")
-        return self._html_response(self.generate_html(single_email=email_data))
+        text = await self._render_once(
+            _email_page_key(email_data.uid), lambda: self.generate_html(single_email=email_data)
+        )
+        return self._html_response(text)
+
+    async def handle_media(self, request: web.Request) -> web.StreamResponse:
+        """Serve a stored inline image straight from disk.
+
+        ``FileResponse`` uses ``sendfile`` and answers Range and conditional
+        requests; media names are content hashes, so responses never change.
+        """
+        self._require_auth(request)
+        path = self.media_store.path(request.match_info["name"])
+        if path is None:
+            raise web.HTTPNotFound(text="Media not found")
+        visibility = "private" if self.access_token else "public"
+        return web.FileResponse(
+            path,
+            headers={
+                "Cache-Control": f"{visibility}, max-age=31536000, immutable",
+                "X-Content-Type-Options": "nosniff",
+                "Content-Security-Policy": "default-src 'none'; sandbox",
+            },
+        )
+
+    async def handle_search(self, request: web.Request) -> web.Response:
+        """Handle ``/search?q=...&page=N`` requests, ranking and rendering off the loop."""
+        self._require_auth(request)
+        query, page = request.query.get("q", "").strip()[:MAX_QUERY_CHARS], _page_number(request)
+        text = await self._render_once(
+            _search_page_key(query, page), lambda: self.generate_search_html(query, page)
+        )
+        return self._html_response(text)
+
+    async def handle_sender(self, request: web.Request) -> web.Response:
+        """Handle ``/sender/<address>`` listing requests."""
+        self._require_auth(request)
+        address, page = sender_key(request.match_info["address"]), _page_number(request)
+        text = await self._render_once(
+            _sender_page_key(address, page), lambda: self.generate_sender_html(address, page)
+        )
+        if text is None:
+            raise web.HTTPNotFound(text="No posts from this sender")
+        return self._html_response(text)
+
+    async def handle_archive(self, request: web.Request) -> web.Response:
+        """Handle ``/archive/<yyyy>/<mm>`` listing requests."""
+        self._require_auth(request)
+        year, month = int(request.match_info["year"]), int(request.match_info["month"])
+        page = _page_number(request)
+        text = await self._render_once(
+            _archive_page_key(year, month, page),
+            lambda: self.generate_archive_html(year, month, page),
+        )
+        if text is None:
+            raise web.HTTPNotFound(text="No posts for this month")
+        return self._html_response(text)
 
     async def handle_rss(self, request: web.Request) -> web.Response:
         """Handle RSS feed requests."""
         self._require_auth(request)
-        return web.Response(
-            text=self.generate_rss(),
-            content_type="application/rss+xml",
+        return await self._conditional_page(
+            request,
+            "feed",
+            self.generate_rss,
+            lambda text: web.Response(
+                text=text,
+                content_type="application/rss+xml",
+                headers={
+                    "X-Content-Type-Options": "nosniff",
+                    "Strict-Transport-Security": STRICT_TRANSPORT_SECURITY,
+                },
+            ),
+        )
+
+    async def handle_api_posts(self, request: web.Request) -> web.Response:
+        """Handle ``/api/posts?limit=N&after=<uid>|before=<uid>&html=1`` requests.
+
+        Without a cursor this lists the newest posts; ``next`` is the ``before``
+        cursor for the following page. ``after`` returns only posts published
+        since that UID, oldest first, with ``cursor`` set to resume from. A
+        cursor that has left the post cache answers 410 so the client resyncs.
+        """
+        self._require_auth(request)
+        after, before = request.query.get("after"), request.query.get("before")
+        if after is not None and before is not None:
+            raise web.HTTPBadRequest(text="Use either after or before, not both")
+        try:
+            limit = int(request.query.get("limit", API_DEFAULT_LIMIT))
+        except ValueError:
+            raise web.HTTPBadRequest(text="limit must be an integer") from None
+        limit = min(max(1, limit), API_MAX_LIMIT)
+        with_html = _query_flag(request, "html")
+
+        with self._cache_lock:
+            try:
+                posts, more = select_posts(self.emails_cache, limit, after, before)
+            except CursorNotFound:
+                raise web.HTTPGone(text="Cursor is no longer available") from None
+        if with_html:
+            await self._fragments_off_loop(posts)
+        items = [
+            self._post_json_item(post, html=post.html) if with_html else self._post_json_item(post)
+            for post in posts
+        ]
+        if after is not None:
+            body = encode_listing(items, cursor=posts[-1].uid if posts else after, more=more)
+        else:
+            body = encode_listing(items, next=posts[-1].uid if more else None)
+        return self._json_response(request, body)
+
+    async def handle_api_post(self, request: web.Request) -> web.Response:
+        """Handle ``/api/posts/<uid>``: one post with its body (and ``html=1`` fragment)."""
+        self._require_auth(request)
+        uid = request.match_info["uid"]
+        with self._cache_lock:
+            post = self.emails_cache.get(uid)
+        if not post and self.post_store:
+            post = await self._store_call(self.post_store.get, uid)
+        if not post:
+            raise web.HTTPNotFound(text="Post not found")
+        extra = {"content": post.content, "content_type": post.content_type}
+        if _query_flag(request, "html"):
+            extra["html"] = (await self._fragments_off_loop([post]))[0].html
+        return self._json_response(request, finish_post_json(post_json_prefix(post), **extra))
+
+    async def handle_events(self, request: web.Request) -> web.StreamResponse:
+        """Stream ``post`` events as Server-Sent Events while the client stays connected.
+
+        Each event carries the post's index-page article, rendered once for all
+        subscribers. Comment heartbeats keep idle connections open; a client
+        that stops reading is disconnected instead of buffered for.
+        """
+        self._require_auth(request)
+        if self.live_events.full():
+            raise self.load_shedder.reject()
+        response = web.StreamResponse(
             headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
                 "X-Content-Type-Options": "nosniff",
-                "Strict-Transport-Security": STRICT_TRANSPORT_SECURITY,
-            },
+            }
+        )
+        await response.prepare(request)
+        transport = request.transport
+        subscriber = self.live_events.subscribe(on_drop=transport.abort if transport else None)
+        try:
+            await response.write(f"retry: {RECONNECT_MS}\n\n".encode())
+            while not subscriber.dropped:
+                await subscriber.ready.wait()
+                for message in subscriber.take():
+                    await response.write(message)
+        except (ConnectionError, RuntimeError):
+            pass
+        finally:
+            self.live_events.unsubscribe(subscriber)
+        return response
+
+    async def handle_live_script(self, request: web.Request) -> web.Response:
+        """Serve the script that applies ``/events`` to the index page."""
+        return web.Response(
+            body=self._live_script,
+            content_type="text/javascript",
+            headers={"Cache-Control": "no-cache", "X-Content-Type-Options": "nosniff"},
+        )
+
+    async def handle_admin_trace(self, request: web.Request) -> web.Response:
+        """Report recent IMAP command and ingest stage timings (``ADMIN_TOKEN`` only).
+
+        ``?limit=N`` returns only the newest N spans; ``?slow=1`` only commands
+        at or over ``IMAP_SLOW_MS``.
+        """
+        self._require_admin(request)
+        records = list(self.tracer.records)
+        if _query_flag(request, "slow") and self.tracer.slow_ms:
+            records = [record for record in records if record["ms"] >= self.tracer.slow_ms]
+        limit = request.query.get("limit", "")
+        if limit.isdigit():
+            records = records[-int(limit) :] if int(limit) else []
+        return _admin_json(
+            {
+                "enabled": self.tracer.enabled,
+                "buffer_size": self.tracer.records.maxlen,
+                "slow_ms": self.tracer.slow_ms,
+                "slow_total": self.tracer.slow_total,
+                "summary": self.tracer.summary(),
+                "spans": records,
+            }
         )
 
+    async def handle_admin_memory(self, request: web.Request) -> web.Response:
+        """Report process memory and the size of every cache (``ADMIN_TOKEN`` only)."""
+        self._require_admin(request)
+        return _admin_json(self.memory_report())
+
+    async def handle_admin_tracemalloc(self, request: web.Request) -> web.Response:
+        """Start, snapshot, or stop ``tracemalloc`` (``ADMIN_TOKEN`` only).
+
+        ``start?frames=N`` begins tracing with N frames of traceback and takes a
+        baseline. ``snapshot?limit=N&group=lineno|filename|traceback`` returns the
+        top N allocation sites by growth since the previous snapshot, which it
+        replaces. ``stop`` ends tracing.
+        """
+        self._require_admin(request)
+        action = request.match_info["action"]
+        if action == "start":
+            frames = request.query.get("frames", "")
+            started = self.allocations.start(
+                int(frames) if frames.isdigit() else DEFAULT_TRACE_FRAMES
+            )
+            return _admin_json({"started": started, **self.allocations.status()})
+        if action == "stop":
+            return _admin_json({"stopped": self.allocations.stop()})
+        limit = request.query.get("limit", "")
+        try:
+            allocators = await asyncio.to_thread(
+                self.allocations.snapshot,
+                int(limit) if limit.isdigit() else DEFAULT_TOP_ALLOCATORS,
+                request.query.get("group", "lineno"),
+            )
+        except ValueError as exc:
+            raise web.HTTPBadRequest(text=str(exc)) from exc
+        except RuntimeError as exc:
+            raise web.HTTPConflict(text=str(exc)) from exc
+        return _admin_json({"allocators": allocators, **self.allocations.status()})
+
+    def memory_report(self) -> dict[str, Any]:
+        """Return process memory, cache and index sizes, and HTTP connection counts."""
+        http_server = self._runner.server if self._runner else None
+        with self._cache_lock:
+            return {
+                "process": process_memory(),
+                "post_cache": {
+                    "posts": len(self.emails_cache),
+                    "bytes": self.emails_cache.nbytes,
+                    "max_bytes": self.emails_cache.max_bytes,
+                },
+                "processed_uids": len(self.processed_uids),
+                "render_cache": {
+                    "fragments": self.render_cache.fragment_count,
+                    "pages": self.render_cache.page_count,
+                    "bytes": self.render_cache.nbytes,
+                    "max_bytes": self.render_cache.max_bytes,
+                },
+                "search_documents": len(self.search_index),
+                "lookups": {
+                    "identity_uids": len(self._identity_uids),
+                    "slug_uids": len(self._slug_uids),
+                    "orphan_slugs": len(self._orphan_slugs),
+                    "post_json": len(self._post_json),
+                    "etags": len(self._etags),
+                    "page_builds": len(self._page_builds),
+                },
+                "http": {
+                    "connections": len(http_server.connections) if http_server else None,
+                    "requests_in_flight": self.load_shedder.in_flight,
+                    "live_event_subscribers": (
+                        self.live_events.subscriber_count if self.live_events else 0
+                    ),
+                },
+                "tracemalloc": self.allocations.status(),
+            }
+
+    async def handle_ingest(self, request: web.Request) -> web.Response:
+        """Publish a raw RFC 822 message POSTed by a trusted MTA (``INGEST_TOKEN``)."""
+        if not request_has_token(request, self.ingest_token):
+            raise web.HTTPUnauthorized(
+                text="Unauthorized",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        too_large = web.json_response({"status": PUSH_TOO_LARGE}, status=413)
+        if (request.content_length or 0) > self.max_email_bytes:
+            return too_large
+        body = bytearray()
+        async for chunk in request.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > self.max_email_bytes:
+                return too_large
+        status, uid = await self.ingest_raw_message(bytes(body), "http")
+        return web.json_response({"status": status, "uid": uid}, status=PUSH_HTTP_STATUS[status])
+
+    async def ingest_raw_message(
+        self, msg_bytes: bytes, source: str = "http"
+    ) -> tuple[str, str | None]:
+        """Publish one pushed RFC 822 message; return ``(status, uid)``.
+
+        Pushed messages get a ``push-`` UID derived from their Message-ID and go
+        through the same sender allowlist, size limits, and rendering as IMAP
+        mail. When the message later shows up over IMAP, its Message-ID matches
+        the pushed post and the IMAP copy is skipped.
+        """
+        if len(msg_bytes) > self.max_email_bytes:
+            return PUSH_TOO_LARGE, None
+        uid = push_uid(msg_bytes)
+        with self._cache_lock:
+            if uid in self.emails_cache:
+                return PUSH_DUPLICATE, uid
+        try:
+            post = await self._parse_message_off_loop(uid, msg_bytes)
+        except Exception as exc:
+            logger.warning("Rejecting %s message that failed to parse: %s", source, exc)
+            return PUSH_REJECTED, None
+        if post is None:
+            return PUSH_REJECTED, None
+        if not self._append_email(post, await self._slug_in_store(post)):
+            return PUSH_DUPLICATE, self._identity_uids.get(post_identity(post))
+        await self._persist_posts([post])
+        logger.info("Published %s message as %s", source, uid)
+        await self._after_ingest()
+        return PUSH_PUBLISHED, uid
+
     async def handle_health(self, request: web.Request | None) -> web.Response:
         """Handle health check requests."""
         return web.Response(text="OK")
 
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Expose cache sizes and other gauges in Prometheus text format."""
+        self._require_auth(request)
+        return web.Response(
+            text=render_prometheus(self.collect_metrics()),
+            content_type=METRICS_CONTENT_TYPE,
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    def collect_metrics(self) -> list[tuple[str, str, float]]:
+        """Return ``(name, help, value)`` gauges describing this server."""
+        with self._cache_lock:
+            return [
+                ("posts", "Posts held in the post cache.", len(self.emails_cache)),
+                (
+                    "post_cache_bytes",
+                    "Approximate bytes held by cached post records.",
+                    self.emails_cache.nbytes,
+                ),
+                (
+                    "post_cache_max_bytes",
+                    "Byte budget of the post cache.",
+                    self.emails_cache.max_bytes,
+                ),
+                (
+                    "render_cache_bytes",
+                    "Approximate bytes held by rendered fragments and pages.",
+                    self.render_cache.nbytes,
+                ),
+                (
+                    "render_cache_max_bytes",
+                    "Byte budget of the render cache.",
+                    self.render_cache.max_bytes,
+                ),
+                (
+                    "render_cache_fragments",
+                    "Posts whose rendered HTML fragment is cached.",
+                    self.render_cache.fragment_count,
+                ),
+                (
+                    "render_cache_pages",
+                    "Whole pages in the render cache.",
+                    self.render_cache.page_count,
+                ),
+                ("cache_generation", "Post cache generation counter.", self.generation),
+                ("loop_lag_seconds", "Latest event-loop lag sample.", self.loop_lag.lag),
+                (
+                    "loop_lag_max_seconds",
+                    "Largest event-loop lag sample since start.",
+                    self.loop_lag.max_lag,
+                ),
+                (
+                    "http_requests_in_flight",
+                    "HTTP requests currently being handled.",
+                    self.load_shedder.in_flight,
+                ),
+                (
+                    "ingest_yields_total",
+                    "Times ingest gave up the event loop to other work.",
+                    self.ingest_scheduler.yields if self.ingest_scheduler else 0,
+                ),
+                (
+                    "ingest_deferred_seconds_total",
+                    "Time ingest spent waiting for in-flight HTTP requests.",
+                    self.ingest_scheduler.deferred if self.ingest_scheduler else 0,
+                ),
+                (
+                    "http_requests_shed_total",
+                    "Requests answered with 503 because the server was overloaded.",
+                    self.load_shedder.shed_total,
+                ),
+                (
+                    "live_event_subscribers",
+                    "Connected /events streams.",
+                    self.live_events.subscriber_count if self.live_events else 0,
+                ),
+                (
+                    "live_event_dropped_total",
+                    "/events streams disconnected for falling behind.",
+                    self.live_events.dropped_total if self.live_events else 0,
+                ),
+                (
+                    "imap_slow_commands_total",
+                    "IMAP commands that took at least IMAP_SLOW_MS.",
+                    self.tracer.slow_total,
+                ),
+            ]
+
     async def start(self, register_signals: bool = True) -> None:
         """Start the web server and optional IMAP monitor."""
         if self._closed_event is None:
             self._closed_event = asyncio.Event()
-        self._runner = web.AppRunner(self.app)
-        await self._runner.setup()
-        site = web.TCPSite(self._runner, self.host, self.port)
-        await site.start()
+        if self.serve_http:
+            self._runner = web.AppRunner(self.app)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port, reuse_port=self.reuse_port)
+            await site.start()
+            self.loop_lag.start()
+        if self.search_index_path:
+            await asyncio.to_thread(self._load_search_index)
+        await self.load_post_store()
+        if self.lmtp_server:
+            await self.lmtp_server.start()
+        if self.static_exporter:
+            await self.export_static()
 
         if self.enable_imap:
             self._monitor_task = asyncio.create_task(self.monitor_inbox())
+            if self.backfill_max_messages:
+                self._backfill_task = asyncio.create_task(self.backfill_history())
         if register_signals:
             self._setup_signal_handlers()
-        logger.info("Server started at http://%s:%s", self.host, self.port)
+        if self.serve_http:
+            logger.info("Server started at http://%s:%s", self.host, self.port)
 
     async def stop(self) -> None:
         """Stop this server's own IMAP and HTTP resources."""
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            await asyncio.gather(self._monitor_task, return_exceptions=True)
-            self._monitor_task = None
+        for task in (self._monitor_task, self._backfill_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._monitor_task = self._backfill_task = None
 
         await self._close_imap()
+        if self.live_events:
+            await self.live_events.close()
+        self.tracer.close()
+        await self.loop_lag.stop()
+        if self.lmtp_server:
+            await self.lmtp_server.stop()
+        if self._search_save_task:
+            self._search_save_task.cancel()
+            await asyncio.gather(self._search_save_task, return_exceptions=True)
+            self._search_save_task = None
+        await self.save_search_index()
+        if self._store_executor:
+            self._store_executor.shutdown(wait=True)
+            self._store_executor = None
+        if self.post_store:
+            self.post_store.close()
+            self.post_store = None
+        if self._parse_executor:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+            self._parse_executor = None
         if self._runner:
             await self._runner.cleanup()
             self._runner = None
         if self._closed_event:
             self._closed_event.set()
 
+    async def reload_config(self) -> bool:
+        """Re-read the configuration with ``config_loader`` and apply it; return success.
+
+        An invalid configuration is logged and leaves the running one in place.
+        The IMAP monitor reconnects only if connection settings changed.
+        """
+        try:
+            settings = self.config_loader()
+            changed = self.apply_config(settings)
+        except (ValueError, SystemExit) as exc:
+            logger.error("Configuration reload rejected; keeping current settings: %s", exc)
+            return False
+        logger.info("Configuration reloaded; changed: %s", ", ".join(sorted(changed)) or "nothing")
+        for callback in self._reload_listeners:
+            try:
+                callback(settings)
+            except Exception as exc:
+                logger.error("Reload listener failed: %s", exc)
+        if changed & IMAP_SETTINGS and self._monitor_task:
+            await self._restart_monitor()
+        if changed & (RENDER_SETTINGS | PAGE_SETTINGS):
+            await self.export_static()
+        return True
+
+    def apply_config(self, settings: Mapping[str, Any]) -> set[str]:
+        """Apply the reloadable settings in ``settings``; return the names that changed.
+
+        Every value is validated before any is applied. Only the caches a change
+        affects are dropped: rendered fragments for rendering settings, cached
+        pages for page settings. Changes to other settings are logged as
+        needing a restart.
+        """
+        current = {**self._settings, **{name: getattr(self, name) for name in _RELOADABLE}}
+        merged = {**current, **settings}
+        values = {name: merged[name] for name in _RELOADABLE}
+        values["blog_title"] = values["blog_title"] or "Live Email Blog"
+        values["public_url"] = validate_public_url(values["public_url"])
+        values["render_mode"] = (values["render_mode"] or "plain").lower()
+        values["sanitizer"] = (values["sanitizer"] or "bleach").lower()
+        values["excerpt_chars"] = max(0, values["excerpt_chars"])
+        values["excerpt_blocks"] = max(1, values["excerpt_blocks"])
+        values["mailbox"] = values["mailbox"] or "INBOX"
+        values["allowed_senders"] = values["allowed_senders"] or []
+        if values["sanitizer"] not in SANITIZERS:
+            raise ValueError(f"HTML_SANITIZER must be one of: {', '.join(SANITIZERS)}")
+        validate_exposure(
+            self.host,
+            values["access_token"],
+            merged["allow_public_bind"],
+            merged["allow_public_without_auth"],
+        )
+
+        changed = {name for name, value in values.items() if getattr(self, name) != value}
+        restart = sorted(
+            name
+            for name, value in settings.items()
+            if name in self._settings
+            and name not in _RELOADABLE | EXPOSURE_SETTINGS
+            and self._settings[name] != value
+        )
+        if restart:
+            logger.warning("Restart to apply changed settings: %s", ", ".join(restart))
+
+        with self._cache_lock:
+            for name in changed:
+                setattr(self, name, values[name])
+            self._settings.update(values)
+            self._settings.update({name: merged[name] for name in EXPOSURE_SETTINGS})
+            if changed & RENDER_SETTINGS:
+                for post in list(self.emails_cache):
+                    post.html = post.excerpt = None
+                    self.emails_cache.touch(post)
+                self.render_cache.clear()
+                self._post_json.clear()
+            elif changed & PAGE_SETTINGS:
+                self.render_cache.clear_pages()
+            if changed & (RENDER_SETTINGS | PAGE_SETTINGS):
+                self._bump_generation()
+        if self.lmtp_server:
+            self.lmtp_server.max_message_bytes = self.max_email_bytes
+        if self.static_exporter:
+            self.static_exporter.blog_title = self.blog_title
+            self.static_exporter.base_url = self._base_url()
+            self.static_exporter.render_mode = self.render_mode
+            self.static_exporter.sanitizer = self.sanitizer
+            self.static_exporter.excerpts = self.excerpts_enabled
+            if changed & (RENDER_SETTINGS | PAGE_SETTINGS):
+                self.static_exporter.invalidate()
+        return changed
+
+    async def _restart_monitor(self) -> None:
+        """Reconnect IMAP with the current connection settings."""
+        self._monitor_task.cancel()
+        await asyncio.gather(self._monitor_task, return_exceptions=True)
+        await self._close_imap()
+        self._monitor_task = asyncio.create_task(self.monitor_inbox())
+
     async def wait_closed(self) -> None:
         """Block until the server is stopped."""
         if self._closed_event is None:
             self._closed_event = asyncio.Event()
         await self._closed_event.wait()
 
-    def _append_email(self, email_data: dict[str, str]) -> None:
+    async def export_static(self) -> list[str]:
+        """Write the current posts to the static export directory, if one is configured."""
+        if not self.static_exporter:
+            return []
+        async with self._export_lock:
+            return await asyncio.to_thread(self.static_exporter.export, self._emails())
+
+    async def load_post_store(self) -> int:
+        """Fill the post cache from the post store, newest first; return posts loaded."""
+        if not self.post_store or self._post_store_loaded:
+            return 0
+        self._post_store_loaded = True
+        loaded = await asyncio.to_thread(self._load_stored_posts)
+        if loaded:
+            logger.info("Loaded %s posts from %s", len(loaded), self.post_store.path)
+        for post in loaded:
+            self._notify_post_listeners("restore", post)
+        return len(loaded)
+
+    async def save_search_index(self) -> None:
+        """Persist the search index, if a path is configured.
+
+        Only the snapshot is taken under the cache lock; encoding and writing
+        the file run in a worker thread while requests keep being served.
+        """
+        if not self.search_index_path:
+            return
+        async with self._search_save_lock:
+            with self._cache_lock:
+                snapshot = self.search_index.snapshot()
+            try:
+                await asyncio.to_thread(write_snapshot, self.search_index_path, snapshot)
+            except OSError as exc:
+                logger.error("Failed to save search index to %s: %s", self.search_index_path, exc)
+
+    async def _after_ingest(self) -> None:
+        with self._cache_lock:
+            # Drop entries loaded from disk for posts that were not fetched again.
+            self.search_index.retain({post.uid for post in self.emails_cache})
+        await self.export_static()
+        if self.search_index_path and self._search_save_task is None:
+            self._search_save_task = asyncio.create_task(self._save_search_index_later())
+
+    async def _save_search_index_later(self) -> None:
+        """Save the index once ``SEARCH_INDEX_SAVE_DELAY`` after an ingest, batching later ones."""
+        await asyncio.sleep(SEARCH_INDEX_SAVE_DELAY)
+        self._search_save_task = None
+        # A shutdown that cancels this task must not interrupt a write in progress.
+        await asyncio.shield(self.save_search_index())
+
+    def _load_search_index(self) -> None:
+        with self._cache_lock:
+            self.search_index.load(self.search_index_path)
+
+    def _load_stored_posts(self) -> list[EmailPost]:
+        """Append stored posts as the oldest cache entries until the byte budget is full.
+
+        Fragments are not rendered here; listings render them on first use.
+        Returns the posts loaded, newest first.
+        """
+        loaded = []
+        with self._cache_lock:
+            for post in self.post_store.iter_recent():
+                if post.uid in self.emails_cache:
+                    continue
+                if self.emails_cache.nbytes + post.nbytes() > self.emails_cache.max_bytes:
+                    break
+                self.emails_cache.append(post)
+                self._index_post(post)
+                loaded.append(post)
+            if loaded:
+                self._bump_generation()
+        return loaded
+
+    async def _publish_backfilled(self, posts: list[EmailPost]) -> None:
+        """Store one batch of older posts and cache them as the oldest entries while they fit."""
+        for post in posts:
+            self._assign_slug(post, await self._slug_in_store(post))
+        await self._persist_posts(posts)
+        self._restore_posts(posts)
+
+    def _restore_posts(self, posts: list[EmailPost]) -> None:
+        """Cache already-published posts as the oldest entries while they fit.
+
+        They are not announced to live-update clients, but post listeners get a
+        ``restore`` event for each one, so worker processes cache them too.
+        """
+        restored = []
+        with self._cache_lock:
+            for post in posts:
+                if post.uid in self.emails_cache or post_identity(post) in self._identity_uids:
+                    continue
+                if self.emails_cache.nbytes + post.nbytes() > self.emails_cache.max_bytes:
+                    break
+                self.render_cache.touch_fragment(post)
+                self.emails_cache.append(post)
+                self._index_post(post)
+                restored.append(post)
+            self._bump_generation()
+        for post in restored:
+            self._notify_post_listeners("restore", post)
+
+    async def _persist_posts(self, posts: list[EmailPost]) -> None:
+        """Write newly published posts to the post store in one transaction, if configured."""
+        if not self.post_store or not posts:
+            return
+        try:
+            await self._store_call(self.post_store.insert_many, posts)
+        except sqlite3.Error as exc:
+            logger.error("Failed to store %s posts: %s", len(posts), exc)
+
+    async def _flush_unsaved_posts(self) -> None:
+        """Persist the posts an IMAP sync published since the last flush."""
+        posts, self._unsaved_posts = self._unsaved_posts, []
+        await self._persist_posts(posts)
+
+    async def _store_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run one post store method on the store thread."""
+        if self._store_executor is None:
+            self._store_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="email-blog-store"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._store_executor, functools.partial(func, *args))
+
+    async def _slug_in_store(self, post: EmailPost) -> bool:
+        """Return whether a stored post other than ``post`` already holds its default slug."""
+        if not self.post_store or post.slug != post.uid or post_source(post.uid) != SOURCE_IMAP:
+            return False
+        return await self._store_call(self.post_store.slug_taken, post.slug, post.uid)
+
+    def _reattach_posts(self, message_uids: dict[str, str]) -> int:
+        """Move cached IMAP posts to the UIDs ``message_uids`` gives their Message-IDs.
+
+        Runs after a UIDVALIDITY change. Parsed posts and rendered fragments are
+        kept; only the UID-keyed indexes are rebuilt. Posts whose Message-ID is
+        missing from the mailbox are dropped, and their slugs remembered in case
+        the same message is fetched again. Returns how many posts were kept.
+        """
+        with self._cache_lock:
+            renamed = {}
+            for post in list(self.emails_cache):
+                if post_source(post.uid) != SOURCE_IMAP:
+                    continue
+                new_uid = message_uids.get(post.message_id.strip())
+                if new_uid is not None:
+                    renamed[post.uid] = new_uid
+                    continue
+                self.emails_cache.remove(post.uid)
+                self._forget_post(post)
+                self._orphan_slugs[post_identity(post)] = post.slug
+            moved = [self.emails_cache.get(uid) for uid in renamed]
+            for post in moved:
+                self._post_json.pop(post.uid, None)
+                self.render_cache.drop_fragment(post.uid)
+                self.post_indexes.remove(post.uid)
+            self.emails_cache.rename(renamed)
+            self.search_index.rename(renamed)
+            for post in moved:
+                self.render_cache.touch_fragment(post)
+                self.post_indexes.add(post)
+                self._slug_uids[post.slug] = post.uid
+                self._identity_uids[post.message_id.strip()] = post.uid
+            self.processed_uids.update(renamed.values())
+            self._bump_generation()
+            posts = list(self.emails_cache)
+        self._notify_post_listeners("reset", None)
+        for post in posts:
+            self._notify_post_listeners("restore", post)
+        return len(moved)
+
+    def _assign_slug(self, post: EmailPost, slug_stored: bool = False) -> None:
+        """Give a new IMAP post a slug no other post holds.
+
+        A UID reused after a UIDVALIDITY change may equal the slug of an older
+        post, so the new post gets ``<uid>-<uidvalidity>`` instead. Callers
+        check the post store first (``_slug_in_store``) and pass ``slug_stored``.
+        """
+        if post.slug != post.uid or post_source(post.uid) != SOURCE_IMAP:
+            return
+        with self._cache_lock:
+            orphan_slug = self._orphan_slugs.pop(post_identity(post), None)
+            holder = self._slug_uids.get(post.slug)
+        if orphan_slug:
+            post.slug = orphan_slug
+        elif (holder is not None and holder != post.uid) or slug_stored:
+            post.slug = f"{post.uid}-{self.uid_validity or 0}"
+
+    def _append_email(
+        self, email_data: EmailPost | dict[str, str], slug_stored: bool = False
+    ) -> bool:
+        """Publish a post; return False if its Message-ID is already cached under another UID."""
+        post = as_post(email_data)
         with self._cache_lock:
-            self.emails_cache.appendleft(email_data)
+            existing = self._identity_uids.get(post_identity(post))
+            if existing and existing != post.uid and existing in self.emails_cache:
+                logger.info("Skipping UID %s: already published as %s", post.uid, existing)
+                return False
+        self._assign_slug(post, slug_stored)
+        if not post.html:
+            post.html = self.render_content_to_html(post.content, post.content_type)
+        if post.excerpt is None:
+            post.excerpt = self.build_excerpt(post.html)
+        with self._cache_lock:
+            self.emails_cache.appendleft(post)
+            self.render_cache.touch_fragment(post)
+            self._index_post(post)
+            self._bump_generation()
+        self._notify_post_listeners("append", post)
+        return True
+
+    def _index_post(self, post: EmailPost) -> None:
+        self._post_json.pop(post.uid, None)
+        self.search_index.add(post)
+        self.post_indexes.add(post)
+        self._identity_uids[post_identity(post)] = post.uid
+        self._slug_uids[post.slug] = post.uid
 
-    def _emails(self) -> list[dict[str, str]]:
+    def _forget_post(self, post: EmailPost) -> None:
+        """Drop secondary state for a post evicted from the post cache."""
+        self._post_json.pop(post.uid, None)
+        self.render_cache.drop_fragment(post.uid)
+        self.search_index.remove(post.uid)
+        self.post_indexes.remove(post.uid)
+        identity = post_identity(post)
+        if self._identity_uids.get(identity) == post.uid:
+            del self._identity_uids[identity]
+        if self._slug_uids.get(post.slug) == post.uid:
+            del self._slug_uids[post.slug]
+
+    def _clear_posts(self) -> None:
+        with self._cache_lock:
+            self.emails_cache.clear()
+            self.render_cache.clear()
+            self.search_index.clear()
+            self.post_indexes.clear()
+            self._post_json.clear()
+            self._identity_uids.clear()
+            self._slug_uids.clear()
+            self._bump_generation()
+        self._notify_post_listeners("reset", None)
+
+    def _bump_generation(self) -> None:
+        """Invalidate every cached page built from the previous set of posts."""
+        self.generation += 1
+        if not self.stale_while_revalidate:
+            self.render_cache.clear_pages()
+
+    def _cached_page(self, key: str, build: Callable[[], str]) -> str:
+        with self._cache_lock:
+            generation = self.generation
+            cached = self.render_cache.get_page(key, generation)
+        if cached is not None:
+            return cached
+        text = build()
+        with self._cache_lock:
+            if generation == self.generation:
+                self.render_cache.put_page(key, generation, text)
+        return text
+
+    def _listing_page(
+        self,
+        key: str,
+        heading: str,
+        lookup: Callable[[], PostListing | None],
+        page: int,
+        page_href: Callable[[int], str],
+    ) -> str | None:
+        with self._cache_lock:
+            listing = lookup()
+            total_pages = math.ceil(len(listing) / LISTING_PAGE_SIZE) if listing else 0
+        if page > total_pages:
+            return None
+
+        def build() -> str:
+            with self._cache_lock:
+                posts = listing.page(page)
+            return build_blog_html(
+                self.template_path,
+                self.blog_title,
+                self._with_fragments(posts, listed=True),
+                self.render_mode,
+                pagination=build_pagination_html(page, total_pages, page_href),
+                sanitizer=self.sanitizer,
+                heading=heading,
+                search_query="",
+                meta_links=True,
+                excerpts=self.excerpts_enabled,
+                live_updates=self.live_events is not None,
+            )
+
+        return self._cached_page(key, build)
+
+    async def _conditional_page(
+        self,
+        request: web.Request | None,
+        key: str,
+        build: Callable[[], str],
+        respond: Callable[[str], web.Response],
+    ) -> web.StreamResponse:
+        """Serve page ``key`` with an ETag, answering revalidations with 304.
+
+        When the server is overloaded, revalidations of the current page and
+        requests it can answer from the page cache are still served; anything
+        that would need a rebuild gets a fast 503 with ``Retry-After``.
+        """
+        if_none_match = request.headers.get("If-None-Match") if request else None
+        if self.load_shedder.enabled and self.load_shedder.overloaded():
+            with self._cache_lock:
+                text = self.render_cache.get_page(key, self.generation)
+            if text is None:
+                raise self.load_shedder.reject()
+        else:
+            text = await self._render_once(key, build)
+        etag = self._page_etag(key, text)
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return web.Response(status=304, headers={"ETag": etag})
+        response = respond(text)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def _page_etag(self, key: str, text: str) -> str:
+        """Return a strong ETag for a page, hashing each distinct page text once."""
+        cached = self._etags.get(key)
+        if cached is not None and cached[0] is text:
+            return cached[1]
+        etag = '"' + hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest() + '"'
+        self._etags[key] = (text, etag)
+        return etag
+
+    async def _render_once(self, key: str, build: Callable[[], str | None]) -> str | None:
+        """Return page ``key``, building it at most once per cache generation.
+
+        Cache misses are built in a worker thread so the event loop keeps
+        serving. Concurrent requests for the same page and generation await
+        one shared build (single flight); a client disconnecting does not
+        cancel it. With ``stale_while_revalidate`` the previous generation's
+        page is returned immediately while the rebuild runs in the background.
+        """
+        with self._cache_lock:
+            generation = self.generation
+            cached = self.render_cache.get_page(key, generation)
+            stale = None
+            if cached is None and self.stale_while_revalidate:
+                stale = self.render_cache.get_stale_page(key)
+        if cached is not None:
+            return cached
+
+        flight_key = (key, generation)
+        flight = self._page_builds.get(flight_key)
+        if flight is None:
+            flight = asyncio.ensure_future(asyncio.to_thread(build))
+            self._page_builds[flight_key] = flight
+            flight.add_done_callback(lambda done: self._finish_page_build(flight_key, done))
+        if stale is not None:
+            return stale
+        return await asyncio.shield(flight)
+
+    def _finish_page_build(self, flight_key: tuple[str, int], flight: asyncio.Future) -> None:
+        self._page_builds.pop(flight_key, None)
+        if not flight.cancelled() and flight.exception() is not None:
+            logger.error("Building page %s failed: %s", flight_key[0], flight.exception())
+
+    def _with_fragments(self, posts: list[EmailPost], listed: bool = False) -> list[EmailPost]:
+        """Re-render fragments evicted from the render cache and mark them recently used.
+
+        Listings that show excerpts never need the full fragment of a post that has one.
+        """
+        for post in posts:
+            if listed and self.excerpts_enabled and post.excerpt:
+                continue
+            if post.html is None:
+                post.html = self.render_content_to_html(post.content, post.content_type)
+                if post.excerpt is None:
+                    post.excerpt = self.build_excerpt(post.html)
+                    # The cached API summary was encoded without the excerpt.
+                    self._post_json.pop(post.uid, None)
+            with self._cache_lock:
+                self.emails_cache.touch(post)
+                self.render_cache.touch_fragment(post)
+        return posts
+
+    async def _fragments_off_loop(self, posts: list[EmailPost]) -> list[EmailPost]:
+        """Like ``_with_fragments``, but render any missing fragments in a worker thread."""
+        if all(post.html is not None for post in posts):
+            return self._with_fragments(posts)
+        return await asyncio.to_thread(self._with_fragments, posts)
+
+    def _post_json_item(self, post: EmailPost, **extra: object) -> bytes:
+        """Encode a post for API listings, reusing its cached summary encoding."""
+        prefix = self._post_json.get(post.uid)
+        if prefix is None:
+            prefix = self._post_json[post.uid] = post_json_prefix(post)
+        return finish_post_json(prefix, **extra)
+
+    def _json_response(self, request: web.Request, body: bytes) -> web.Response:
+        """Answer with JSON and a content-hash ETag, or 304 if the client already has it."""
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private, no-cache" if self.access_token else "no-cache",
+            "X-Content-Type-Options": "nosniff",
+        }
+        if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+            return web.Response(status=304, headers=headers)
+        return web.Response(
+            body=body, content_type="application/json", charset="utf-8", headers=headers
+        )
+
+    def _broadcast_post(self, event: str, email_data: EmailPost | None) -> None:
+        """Announce a newly published post to ``/events`` subscribers."""
+        if event != "append" or email_data is None or not self.live_events.subscriber_count:
+            return
+        article = build_email_html(
+            email_data,
+            self.render_mode,
+            linked=True,
+            sanitizer=self.sanitizer,
+            meta_links=True,
+            excerpt=self.excerpts_enabled,
+        )
+        payload = {
+            "uid": email_data.uid,
+            "url": f"/email/{quote(email_data.slug, safe='')}",
+            "subject": email_data.subject,
+            "html": article,
+        }
+        self.live_events.publish("post", json.dumps(payload))
+
+    def _notify_post_listeners(self, event: str, email_data: EmailPost | None) -> None:
+        for callback in self._post_listeners:
+            try:
+                callback(event, email_data)
+            except Exception as exc:
+                logger.error("Post listener failed for %s event: %s", event, exc)
+
+    def _emails(self) -> list[EmailPost]:
         with self._cache_lock:
             return list(self.emails_cache)
 
+    def _index_emails(self) -> list[EmailPost]:
+        with self._cache_lock:
+            return list(islice(self.emails_cache, INDEX_POSTS))
+
     def _base_url(self) -> str:
         return (self.public_url or f"http://{self.host}:{self.port}").rstrip("/")
 
@@ -199,6 +1555,13 @@ class EmailBlogServer(EmailBlogImapMixin):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    def _require_admin(self, request: web.Request) -> None:
+        if not request_has_token(request, self.admin_token):
+            raise web.HTTPUnauthorized(
+                text="Unauthorized",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
     def _html_response(self, text: str) -> web.Response:
         return web.Response(
             text=text,
@@ -206,7 +1569,9 @@ class EmailBlogServer(EmailBlogImapMixin):
             headers={
                 "X-Content-Type-Options": "nosniff",
                 "X-Frame-Options": "DENY",
-                "Content-Security-Policy": CONTENT_SECURITY_POLICY,
+                "Content-Security-Policy": (
+                    LIVE_CONTENT_SECURITY_POLICY if self.live_events else CONTENT_SECURITY_POLICY
+                ),
                 "Strict-Transport-Security": STRICT_TRANSPORT_SECURITY,
             },
         )
@@ -220,7 +1585,55 @@ class EmailBlogServer(EmailBlogImapMixin):
                 )
             except (NotImplementedError, RuntimeError):
                 pass
+        if self.config_loader:
+            try:
+                loop.add_signal_handler(
+                    signal.SIGHUP, lambda: asyncio.create_task(self.reload_config())
+                )
+            except (NotImplementedError, RuntimeError, AttributeError):
+                pass
 
     async def _stop_for_signal(self, sig: signal.Signals) -> None:
         logger.info("Received exit signal %s", sig.name)
         await self.stop()
+
+
+def _page_number(request: web.Request) -> int:
+    """Return the 1-based ``page`` query parameter, defaulting to the first page."""
+    try:
+        return max(1, int(request.query.get("page", "1")))
+    except ValueError:
+        return 1
+
+
+def _admin_json(data: dict[str, Any]) -> web.Response:
+    return web.json_response(
+        data, headers={"Cache-Control": "no-store", "X-Content-Type-Options": "nosniff"}
+    )
+
+
+def _query_flag(request: web.Request, name: str) -> bool:
+    return request.query.get(name, "").lower() in {"1", "true", "yes"}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Apply RFC 9110 weak comparison between an If-None-Match header and an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _email_page_key(uid: str) -> str:
+    return f"email:{uid}"
+
+
+def _search_page_key(query: str, page: int) -> str:
+    return f"search:{page}:{query}"
+
+
+def _sender_page_key(address: str, page: int) -> str:
+    return f"sender:{address}:{page}"
+
+
+def _archive_page_key(year: int, month: int, page: int) -> str:
+    return f"archive:{year:04d}/{month:02d}:{page}"
@@ -0,0 +1,186 @@
+"""Pre-render the email blog into a directory for static file serving."""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from collections.abc import Callable, Iterator
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any
+
+from email_blog_feed import build_rss
+from email_blog_html import build_blog_html, build_pagination_html
+from email_blog_posts import EmailPost
+
+logger = logging.getLogger(__name__)
+DEFAULT_PAGE_SIZE = 20
+SAFE_UID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]*")
+
+
+class StaticSiteExporter:
+    """Write the index, archive pages, permalinks, and RSS feed as static files.
+
+    Pages are written atomically (temporary file + rename) next to a precompressed
+    ``.gz`` sibling, and files whose bytes did not change are left untouched so
+    CDN caches and ``If-Modified-Since`` validators stay warm. Each file remembers
+    the posts it was rendered from; a file whose posts did not change since the
+    last export is not rendered again, so an ingest renders only the new
+    permalinks, the feed, and the listing pages whose posts shifted.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        template_path: Path,
+        blog_title: str,
+        base_url: str,
+        render_mode: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        sanitizer: str = "bleach",
+        excerpts: bool = False,
+    ):
+        self.output_dir = Path(output_dir)
+        self.template_path = template_path
+        self.blog_title = blog_title
+        self.base_url = base_url
+        self.render_mode = render_mode
+        self.page_size = max(1, page_size)
+        self.sanitizer = sanitizer
+        self.excerpts = excerpts
+        self._digests: dict[str, str] = {}
+        self._sources: dict[str, Any] = {}
+        self._archive_pages: set[str] = set()
+
+    def invalidate(self) -> None:
+        """Render every file again on the next export, e.g. after a settings change."""
+        self._sources.clear()
+
+    def export(self, emails: list[EmailPost]) -> list[str]:
+        """Export the given newest-first posts; return the paths rewritten."""
+        changed = []
+        sources: dict[str, Any] = {}
+        for path, source, render in self._files(emails):
+            sources[path] = source
+            if self._sources.get(path) == source:
+                continue
+            if self._write_if_changed(path, render()):
+                changed.append(path)
+        self._sources = sources
+        self._remove_stale_archive_pages(sources)
+        if changed:
+            logger.info("Static export wrote %s file(s) to %s", len(changed), self.output_dir)
+        return changed
+
+    def _files(self, emails: list[EmailPost]) -> Iterator[tuple[str, Any, Callable[[], bytes]]]:
+        """Yield ``(path, source, render)`` for every exported file.
+
+        ``source`` names the posts the file shows (a published post never
+        changes under one UID); ``render`` is only called when it differs from
+        the previous export's.
+        """
+        keys = [(email_data.uid, email_data.slug) for email_data in emails]
+        chunks = range(0, len(emails), self.page_size) or range(1)
+        for number, start in enumerate(chunks, start=1):
+            chunk = emails[start : start + self.page_size]
+            yield (
+                _page_path(number),
+                (len(chunks), keys[start : start + self.page_size]),
+                functools.partial(self._render_page, chunk, number, len(chunks)),
+            )
+
+        for email_data, key in zip(emails, keys, strict=True):
+            slug = email_data.slug
+            if not SAFE_UID.fullmatch(slug):
+                logger.warning("Skipping static page for unsafe slug %r", slug)
+                continue
+            yield f"email/{slug}.html", key, functools.partial(self._render_permalink, email_data)
+
+        yield "feed.xml", keys, functools.partial(self._render_feed, emails)
+
+    def _render_page(self, chunk: list[EmailPost], number: int, total_pages: int) -> bytes:
+        return build_blog_html(
+            self.template_path,
+            self.blog_title,
+            chunk,
+            self.render_mode,
+            last_updated=_last_updated(chunk),
+            pagination=build_pagination_html(number, total_pages, _page_href),
+            sanitizer=self.sanitizer,
+            excerpts=self.excerpts,
+        ).encode()
+
+    def _render_permalink(self, email_data: EmailPost) -> bytes:
+        return build_blog_html(
+            self.template_path,
+            self.blog_title,
+            [],
+            self.render_mode,
+            single_email=email_data,
+            last_updated=_last_updated([email_data]),
+            sanitizer=self.sanitizer,
+        ).encode()
+
+    def _render_feed(self, emails: list[EmailPost]) -> bytes:
+        newest = (emails[0].timestamp or 0.0) if emails else 0.0
+        return build_rss(
+            emails,
+            self.blog_title,
+            self.base_url,
+            last_build_date=formatdate(newest, usegmt=True),
+        ).encode()
+
+    def _write_if_changed(self, relative_path: str, body: bytes) -> bool:
+        digest = hashlib.sha256(body).hexdigest()
+        target = self.output_dir / relative_path
+        previous = self._digests.get(relative_path)
+        if previous is None and target.is_file():
+            previous = hashlib.sha256(target.read_bytes()).hexdigest()
+        if previous == digest and target.with_name(target.name + ".gz").is_file():
+            self._digests[relative_path] = digest
+            return False
+
+        _atomic_write(target.with_name(target.name + ".gz"), gzip.compress(body, mtime=0))
+        _atomic_write(target, body)
+        self._digests[relative_path] = digest
+        return True
+
+    def _remove_stale_archive_pages(self, files: dict[str, Any]) -> None:
+        current = {path for path in files if path.startswith("page/")}
+        for path in self._archive_pages - current:
+            for stale in (self.output_dir / path, self.output_dir / f"{path}.gz"):
+                stale.unlink(missing_ok=True)
+            self._digests.pop(path, None)
+        self._archive_pages = current
+
+
+def _page_path(number: int) -> str:
+    return "index.html" if number == 1 else f"page/{number}.html"
+
+
+def _page_href(number: int) -> str:
+    return "/" if number == 1 else f"/page/{number}"
+
+
+def _last_updated(emails: list[EmailPost]) -> str:
+    """Derive a stable "last updated" stamp from post dates so unchanged pages stay byte-equal."""
+    newest = max((email_data.timestamp or 0.0 for email_data in emails), default=0.0)
+    return formatdate(newest, usegmt=True)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
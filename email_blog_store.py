@@ -0,0 +1,219 @@
+"""Persist published posts in SQLite so history survives restarts and imports."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import zlib
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from email_blog_posts import EmailPost
+
+logger = logging.getLogger(__name__)
+
+SOURCE_IMAP = "imap"
+SOURCE_PUSH = "push"
+SOURCE_IMPORT = "import"
+_SOURCE_PREFIXES = {"push-": SOURCE_PUSH, "import-": SOURCE_IMPORT}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    uid TEXT PRIMARY KEY,
+    message_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    date TEXT NOT NULL,
+    timestamp REAL,
+    content_type TEXT NOT NULL,
+    content BLOB NOT NULL,
+    source TEXT NOT NULL,
+    slug TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS posts_message_id ON posts (message_id) WHERE message_id <> '';
+CREATE INDEX IF NOT EXISTS posts_timestamp ON posts (timestamp);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+_SLUG_INDEX = "CREATE INDEX IF NOT EXISTS posts_slug ON posts (slug)"
+_COLUMNS = "uid, message_id, subject, sender, date, timestamp, content_type, content, slug"
+
+
+class PostStore:
+    """A SQLite table of posts (bodies zlib-compressed) plus a small key/value table.
+
+    Inserts ignore posts whose UID or non-empty Message-ID is already stored, so
+    imports, pushed mail, and IMAP sync can overlap safely. One connection is
+    shared by the server's threads behind a lock; the importer opens its own.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._add_slug_column()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def insert_many(self, posts: Iterable[EmailPost]) -> int:
+        """Insert posts in one transaction; return how many were new."""
+        rows = [_row(post) for post in posts]
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                f"INSERT OR IGNORE INTO posts ({_COLUMNS}, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._db.total_changes - before
+
+    def __contains__(self, uid: object) -> bool:
+        with self._lock:
+            return (
+                self._db.execute("SELECT 1 FROM posts WHERE uid = ?", (uid,)).fetchone() is not None
+            )
+
+    def get(self, uid: str) -> EmailPost | None:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM posts WHERE uid = ?", (uid,)).fetchone()
+        return _post(row) if row else None
+
+    def get_by_slug(self, slug: str) -> EmailPost | None:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM posts WHERE slug = ?", (slug,)
+            ).fetchone()
+        return _post(row) if row else None
+
+    def slug_taken(self, slug: str, uid: str) -> bool:
+        """Return whether a post other than ``uid`` already uses ``slug``."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM posts WHERE slug = ? AND uid <> ?", (slug, uid)
+            ).fetchone()
+        return row is not None
+
+    def remap_imap_uids(self, message_uids: dict[str, str]) -> set[str]:
+        """Move stored IMAP posts to the UIDs ``message_uids`` gives their Message-IDs.
+
+        Used after a UIDVALIDITY change. Slugs are kept, so permalinks survive.
+        IMAP posts whose Message-ID is missing or no longer in the mailbox are
+        deleted. Returns the new UIDs of the posts that were kept.
+        """
+        with self._lock, self._db:
+            self._db.execute("CREATE TEMP TABLE remap (message_id TEXT PRIMARY KEY, uid TEXT)")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO remap (message_id, uid) VALUES (?, ?)",
+                    message_uids.items(),
+                )
+                self._db.execute(
+                    "DELETE FROM posts WHERE source = ? AND message_id NOT IN "
+                    "(SELECT message_id FROM remap)",
+                    (SOURCE_IMAP,),
+                )
+                # Step through a prefix so no new UID collides with an old one mid-update.
+                self._db.execute(
+                    "UPDATE posts SET uid = 'remap:' || uid WHERE source = ?", (SOURCE_IMAP,)
+                )
+                self._db.execute(
+                    "UPDATE posts SET uid = (SELECT uid FROM remap "
+                    "WHERE remap.message_id = posts.message_id) WHERE source = ?",
+                    (SOURCE_IMAP,),
+                )
+                rows = self._db.execute(
+                    "SELECT uid FROM posts WHERE source = ?", (SOURCE_IMAP,)
+                ).fetchall()
+            finally:
+                self._db.execute("DROP TABLE remap")
+        return {row[0] for row in rows}
+
+    def iter_recent(self, batch_size: int = 500) -> Iterator[EmailPost]:
+        """Yield stored posts newest-first (undated posts last), fetching in batches."""
+        with self._lock:
+            cursor = self._db.execute(
+                f"SELECT {_COLUMNS} FROM posts "
+                "ORDER BY timestamp IS NULL, timestamp DESC, uid DESC"
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _post(row)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def _add_slug_column(self) -> None:
+        """Give stores created before permalink slugs a ``slug`` column (the UID)."""
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(posts)")}
+        with self._db:
+            if "slug" not in columns:
+                self._db.execute("ALTER TABLE posts ADD COLUMN slug TEXT NOT NULL DEFAULT ''")
+                self._db.execute("UPDATE posts SET slug = uid")
+            self._db.execute(_SLUG_INDEX)
+
+    def delete_source(self, source: str) -> int:
+        """Delete every post that came from ``source``; return how many were removed."""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM posts WHERE source = ?", (source,)).rowcount
+
+    def get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+
+def post_source(uid: str) -> str:
+    """Return where a post came from, based on its UID prefix."""
+    for prefix, source in _SOURCE_PREFIXES.items():
+        if uid.startswith(prefix):
+            return source
+    return SOURCE_IMAP
+
+
+def _row(post: EmailPost) -> tuple:
+    return (
+        post.uid,
+        post.message_id.strip(),
+        post.subject,
+        post.sender,
+        post.date,
+        post.timestamp,
+        post.content_type,
+        zlib.compress(post.content.encode("utf-8", "surrogatepass")),
+        post.slug,
+        post_source(post.uid),
+    )
+
+
+def _post(row: tuple) -> EmailPost:
+    uid, message_id, subject, sender, date, timestamp, content_type, content, slug = row
+    return EmailPost(
+        uid=uid,
+        subject=subject,
+        sender=sender,
+        date=date,
+        content=zlib.decompress(content).decode("utf-8", "surrogatepass"),
+        content_type=content_type,
+        message_id=message_id,
+        timestamp=timestamp,
+        slug=slug or None,
+    )
@@ -0,0 +1,177 @@
+"""Time IMAP commands and ingest stages, and log the slow ones."""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_FILE_BYTES = 10 * 1024 * 1024
+TRACE_FILE_BACKUPS = 3
+
+
+class Span:
+    """One timed command or stage; ``record`` adds the bytes of a response to it."""
+
+    __slots__ = ("name", "uids", "count", "nbytes", "status", "_command", "_tracer", "_start")
+
+    def __init__(self, tracer: CommandTracer, name: str, uids: object, command: bool):
+        self.name = name
+        self.uids, self.count = _uid_range(uids)
+        self.nbytes = 0
+        self.status: str | None = None
+        self._command = command
+        self._tracer = tracer
+        self._start = 0.0
+
+    def __enter__(self) -> Span:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if exc_type is not None:
+            self.status = exc_type.__name__
+        self._tracer._finish(self, time.perf_counter() - self._start)
+        return False
+
+    def record(self, status: str | None, data: object = None) -> None:
+        self.status = status
+        self.nbytes += response_bytes(data)
+
+
+class _NullSpan:
+    """Stands in for a span when tracing is off, so call sites need no checks."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+    def record(self, status: str | None, data: object = None) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class CommandTracer:
+    """Collect spans for IMAP commands and ingest stages.
+
+    Each finished span becomes a record with its name, UID range, bytes
+    received, duration and status. Records go to an in-memory ring of the last
+    ``buffer_size`` and, with ``path``, to a size-rotated JSON-lines file
+    written by a background thread, so the event loop never blocks on disk.
+    Commands slower than ``slow_ms`` are also logged as warnings. With all
+    three off, ``command()`` and ``stage()`` return a shared no-op span.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 0,
+        path: str | None = None,
+        slow_ms: int = 0,
+        max_file_bytes: int = DEFAULT_TRACE_FILE_BYTES,
+    ):
+        self.slow_ms = max(0, slow_ms)
+        self.records: deque[dict[str, Any]] = deque(maxlen=max(0, buffer_size))
+        self.totals: dict[str, list[float]] = {}
+        self.slow_total = 0
+        self._file: logging.Handler | None = None
+        self._writer: logging.handlers.QueueListener | None = None
+        if path:
+            records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            self._file = logging.handlers.QueueHandler(records)
+            self._writer = logging.handlers.QueueListener(
+                records,
+                logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_file_bytes, backupCount=TRACE_FILE_BACKUPS, delay=True
+                ),
+            )
+            self._writer.start()
+        self.enabled = bool(buffer_size > 0 or self._file or self.slow_ms)
+
+    def command(self, name: str, uids: object = None) -> Span | _NullSpan:
+        """Time one IMAP command; commands slower than ``slow_ms`` are logged."""
+        return Span(self, name, uids, True) if self.enabled else NULL_SPAN
+
+    def stage(self, name: str, uids: object = None) -> Span | _NullSpan:
+        """Time one ingest stage (never slow-logged; it spans many commands)."""
+        return Span(self, name, uids, False) if self.enabled else NULL_SPAN
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return count, total and max milliseconds, and bytes received per span name."""
+        return {
+            name: {"count": count, "total_ms": total, "max_ms": worst, "bytes": nbytes}
+            for name, (count, total, worst, nbytes) in sorted(self.totals.items())
+        }
+
+    def close(self) -> None:
+        """Write out queued file records and close the trace file."""
+        if self._writer:
+            self._writer.stop()
+            for handler in self._writer.handlers:
+                handler.close()
+            self._writer = self._file = None
+
+    def _finish(self, span: Span, seconds: float) -> None:
+        ms = round(seconds * 1000, 3)
+        totals = self.totals.setdefault(span.name, [0, 0.0, 0.0, 0])
+        totals[0] += 1
+        totals[1] = round(totals[1] + ms, 3)
+        totals[2] = max(totals[2], ms)
+        totals[3] += span.nbytes
+        record = {
+            "ts": round(time.time(), 3),
+            "name": span.name,
+            "uids": span.uids,
+            "count": span.count,
+            "bytes": span.nbytes,
+            "ms": ms,
+            "status": span.status,
+        }
+        if self.records.maxlen:
+            self.records.append(record)
+        if self._file:
+            self._file.handle(
+                logging.LogRecord(__name__, logging.INFO, "", 0, json.dumps(record), None, None)
+            )
+        if span._command and self.slow_ms and ms >= self.slow_ms:
+            self.slow_total += 1
+            logger.warning(
+                "Slow IMAP command %s (UIDs %s): %.0f ms, %s bytes, status %s",
+                span.name,
+                span.uids,
+                ms,
+                span.nbytes,
+                span.status,
+            )
+
+
+def response_bytes(data: object) -> int:
+    """Count the bytes in an IMAP client response (a list of lines and literals)."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, (list, tuple)):
+        return sum(response_bytes(item) for item in data)
+    return 0
+
+
+def _uid_range(uids: object) -> tuple[str | None, int]:
+    """Summarize a UID, a comma-separated UID set, or a list of UIDs as ``first:last``."""
+    if uids is None:
+        return None, 0
+    items = uids.split(",") if isinstance(uids, str) else [str(uid) for uid in uids]
+    if not items:
+        return None, 0
+    if len(items) == 1:
+        return items[0], 1
+    return f"{items[0]}:{items[-1]}", len(items)
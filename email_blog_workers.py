@@ -0,0 +1,300 @@
+"""Run several HTTP worker processes fed by a single IMAP ingest leader."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from typing import Any
+
+from email_blog_posts import EmailPost
+from email_blog_server import EmailBlogServer
+
+logger = logging.getLogger(__name__)
+SUPERVISE_INTERVAL = 1.0
+# Events queued for one worker before it counts as stuck and is restarted.
+MAX_PENDING_EVENTS = 10_000
+# A worker that dies sooner than RESTART_STABLE_SECONDS after starting waits
+# RESTART_BACKOFF seconds, doubling per crash up to RESTART_BACKOFF_MAX, before
+# it is restarted. No worker restarts more than RESTART_LIMIT times per RESTART_WINDOW.
+RESTART_BACKOFF = 1.0
+RESTART_BACKOFF_MAX = 60.0
+RESTART_STABLE_SECONDS = 60.0
+RESTART_LIMIT = 10
+RESTART_WINDOW = 600.0
+# Endpoints that only make sense in the leader, which serves no HTTP. Workers
+# never see IMAP traffic or publish, so these settings are refused up front.
+LEADER_ONLY_SETTINGS = {"ingest_token": "INGEST_TOKEN", "admin_token": "ADMIN_TOKEN"}
+_CLOSE = object()
+
+
+class _WorkerChannel:
+    """Write leader events to one worker's pipe from a thread.
+
+    ``Connection.send`` blocks once the pipe buffer is full, so writes happen
+    off the event loop. ``send`` refuses a message once ``max_pending`` are
+    queued or the pipe has failed; the pool then restarts that worker.
+    """
+
+    def __init__(self, pipe: Connection, name: str, max_pending: int = MAX_PENDING_EVENTS):
+        self.max_pending = max_pending
+        self.failed = False
+        self._pipe = pipe
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-events", daemon=True)
+        self._thread.start()
+
+    def send(self, message: tuple[str, Any]) -> bool:
+        if self.failed or self._queue.qsize() >= self.max_pending:
+            return False
+        self._queue.put(message)
+        return True
+
+    def close(self) -> None:
+        """Close the pipe once queued events are written (or the worker is gone)."""
+        self._queue.put(_CLOSE)
+
+    def _run(self) -> None:
+        try:
+            while (message := self._queue.get()) is not _CLOSE:
+                self._pipe.send(message)
+        except (BrokenPipeError, EOFError, OSError) as exc:
+            logger.warning("Lost pipe to %s: %s", self._thread.name, exc)
+            self.failed = True
+        finally:
+            self._pipe.close()
+
+
+class WorkerPool:
+    """Supervise HTTP worker processes and broadcast published posts to them.
+
+    Every worker binds the same host/port with ``SO_REUSEPORT`` so the kernel
+    balances connections across processes. Workers never talk to IMAP; the
+    leader sends each published post (with its pre-rendered ``html`` fragment)
+    over a per-worker pipe, and the worker's generation counter drops its page
+    cache when the post is applied. A worker that stops reading is restarted,
+    and crashing workers are restarted with backoff.
+    """
+
+    def __init__(self, server_kwargs: dict[str, Any], workers: int):
+        self.server_kwargs = dict(server_kwargs)
+        self.workers = max(1, workers)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list[multiprocessing.process.BaseProcess | None] = [None] * self.workers
+        self._channels: list[_WorkerChannel | None] = [None] * self.workers
+        self._started = [0.0] * self.workers
+        self._crashes = [0] * self.workers
+        self._restarts = [deque(maxlen=RESTART_LIMIT) for _ in range(self.workers)]
+        self._restart_at: list[float | None] = [None] * self.workers
+
+    def start(self, snapshot: list[EmailPost] | None = None) -> None:
+        """Spawn every worker, seeding each with the current newest-first posts."""
+        for index in range(self.workers):
+            self._spawn(index, snapshot or [])
+
+    def stop(self) -> None:
+        """Terminate all workers and close their pipes."""
+        for index, process in enumerate(self._processes):
+            if process and process.is_alive():
+                process.terminate()
+            if process:
+                process.join(timeout=5)
+            self._close_channel(index)
+            self._processes[index] = None
+
+    def broadcast(self, event: str, email_data: EmailPost | None) -> None:
+        """Forward a post listener event from the leader to every worker."""
+        self._send((event, email_data))
+
+    def reconfigure(self, settings: dict[str, Any]) -> None:
+        """Pass a reloaded configuration to every worker and to workers spawned later."""
+        self.server_kwargs = _worker_kwargs(settings)
+        self._send(("reconfigure", self.server_kwargs))
+
+    def _send(self, message: tuple[str, Any]) -> None:
+        for index, channel in enumerate(self._channels):
+            if channel is not None and not channel.send(message):
+                # It would miss this event; a restarted worker starts from a fresh snapshot.
+                logger.warning("HTTP worker %s is not reading leader events; restarting", index)
+                self._close_channel(index)
+                process = self._processes[index]
+                if process is not None and process.is_alive():
+                    process.terminate()
+
+    async def supervise(self, leader: EmailBlogServer) -> None:
+        """Respawn workers that exit unexpectedly, with backoff, until cancelled."""
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            now = time.monotonic()
+            for index, process in enumerate(self._processes):
+                if process is not None and process.is_alive():
+                    continue
+                if self._restart_at[index] is None:
+                    delay = self._restart_delay(index, now)
+                    logger.warning("HTTP worker %s exited; restarting in %.0f s", index, delay)
+                    self._close_channel(index)
+                    self._restart_at[index] = now + delay
+                if now >= self._restart_at[index]:
+                    self._restart_at[index] = None
+                    self._spawn(index, leader._emails())
+
+    def _restart_delay(self, index: int, now: float) -> float:
+        """Return how long to wait before restarting a worker that exited at ``now``."""
+        if now - self._started[index] >= RESTART_STABLE_SECONDS:
+            self._crashes[index] = 0
+            delay = 0.0
+        else:
+            self._crashes[index] += 1
+            delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF * 2 ** (self._crashes[index] - 1))
+        restarts = self._restarts[index]
+        if len(restarts) == RESTART_LIMIT:
+            delay = max(delay, restarts[0] + RESTART_WINDOW - now)
+        return delay
+
+    def _spawn(self, index: int, snapshot: list[EmailPost]) -> None:
+        receive_end, send_end = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.server_kwargs, receive_end, snapshot),
+            name=f"email-blog-http-{index}",
+            daemon=True,
+        )
+        process.start()
+        receive_end.close()
+        now = time.monotonic()
+        if self._processes[index] is not None:
+            self._restarts[index].append(now)
+        self._started[index] = now
+        self._processes[index] = process
+        self._channels[index] = _WorkerChannel(send_end, process.name)
+
+    def _close_channel(self, index: int) -> None:
+        channel = self._channels[index]
+        if channel is not None:
+            channel.close()
+        self._channels[index] = None
+
+
+async def run_leader(
+    server_kwargs: dict[str, Any],
+    workers: int,
+    config_loader: Callable[[], dict[str, Any]] | None = None,
+) -> None:
+    """Run the IMAP ingest leader plus ``workers`` HTTP worker processes.
+
+    With ``config_loader``, SIGHUP reloads the leader's configuration and
+    forwards it to the workers. Raise ``ValueError`` if a setting needs an
+    endpoint only a single process can serve (see ``LEADER_ONLY_SETTINGS``).
+    """
+    unsupported = [env for name, env in LEADER_ONLY_SETTINGS.items() if server_kwargs.get(name)]
+    if unsupported:
+        raise ValueError(
+            f"{' and '.join(unsupported)} cannot be used with WEB_WORKERS > 1: HTTP workers do "
+            "not publish or see IMAP traffic. Use LMTP_PORT for push delivery, or run one process."
+        )
+    leader = EmailBlogServer(**_leader_kwargs(server_kwargs))
+    if config_loader:
+        # Reload against the leader's own settings, so serve_http does not read as changed.
+        leader.config_loader = lambda: _leader_kwargs(config_loader())
+    pool = WorkerPool(_worker_kwargs(server_kwargs), workers)
+    leader.add_post_listener(pool.broadcast)
+    leader.add_reload_listener(pool.reconfigure)
+    pool.start(leader._emails())
+    supervisor = asyncio.create_task(pool.supervise(leader))
+    try:
+        await leader.start()
+        logger.info(
+            "Started %s HTTP workers at http://%s:%s",
+            workers,
+            server_kwargs.get("host", "127.0.0.1"),
+            server_kwargs.get("port", 8080),
+        )
+        await leader.wait_closed()
+    finally:
+        supervisor.cancel()
+        await asyncio.gather(supervisor, return_exceptions=True)
+        pool.stop()
+
+
+def run_worker(
+    server_kwargs: dict[str, Any],
+    conn: Connection,
+    snapshot: list[EmailPost],
+) -> None:
+    """Process entry point for one HTTP worker."""
+    logging.basicConfig(level=logging.INFO)
+    # Ctrl-C reaches the whole process group; the leader decides when workers stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    asyncio.run(_serve_worker(server_kwargs, conn, snapshot))
+
+
+async def _serve_worker(
+    server_kwargs: dict[str, Any],
+    conn: Connection,
+    snapshot: list[EmailPost],
+) -> None:
+    server = EmailBlogServer(**server_kwargs)
+    for email_data in reversed(snapshot):
+        server._append_email(email_data)
+    await server.start(register_signals=False)
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, lambda: loop.create_task(server.stop()))
+
+    def drain() -> None:
+        try:
+            while conn.poll():
+                apply_leader_event(server, *conn.recv())
+        except (EOFError, OSError):
+            logger.warning("Lost connection to ingest leader; stopping worker")
+            loop.remove_reader(conn.fileno())
+            loop.create_task(server.stop())
+
+    loop.add_reader(conn.fileno(), drain)
+    try:
+        await server.wait_closed()
+    finally:
+        conn.close()
+
+
+def apply_leader_event(
+    server: EmailBlogServer,
+    event: str,
+    email_data: EmailPost | dict[str, Any] | None,
+) -> None:
+    """Apply one post listener event (or a ``reconfigure`` settings dict) from the leader."""
+    if event == "append" and email_data is not None:
+        server._append_email(email_data)
+    elif event == "reset":
+        server._clear_posts()
+    elif event == "restore" and email_data is not None:
+        server._restore_posts([email_data])
+    elif event == "reconfigure" and email_data is not None:
+        server.apply_config(email_data)
+    else:
+        logger.warning("Ignoring unknown leader event %r", event)
+
+
+def _leader_kwargs(server_kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {**server_kwargs, "serve_http": False}
+
+
+def _worker_kwargs(server_kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **server_kwargs,
+        "enable_imap": False,
+        "serve_http": True,
+        "reuse_port": True,
+        "static_dir": None,
+        "search_index_path": None,
+        "lmtp_port": None,
+        "imap_trace_file": None,
+    }
@@ -0,0 +1,22 @@
+// Prepend posts announced on /events to the index page without a reload.
+(function () {
+    "use strict";
+    if (!window.EventSource) {
+        return;
+    }
+    var params = new URLSearchParams(window.location.search);
+    var token = params.get("token");
+    var url = "/events" + (token ? "?token=" + encodeURIComponent(token) : "");
+    var onIndex = window.location.pathname === "/" && !params.get("page");
+    var source = new EventSource(url);
+    source.addEventListener("post", function (event) {
+        if (!onIndex) {
+            return;
+        }
+        var post = JSON.parse(event.data);
+        var main = document.querySelector("main");
+        if (main && !document.querySelector('a[href="' + post.url + '"]')) {
+            main.insertAdjacentHTML("afterbegin", post.html);
+        }
+    });
+})();
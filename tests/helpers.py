@@ -0,0 +1,26 @@
+"""Fixtures shared by the test modules."""
+
+from email_blog_posts import EmailPost
+
+DATE = "Mon, 01 Jan 2024 00:00:00 +0000"
+SENDER = "Writer <writer@example.com>"
+
+
+def make_post(
+    uid: str | int,
+    subject: str | None = None,
+    content: str | None = None,
+    *,
+    sender: str = SENDER,
+    date: str = DATE,
+    **kwargs,
+) -> EmailPost:
+    """Build a post titled ``Post <uid>`` with body ``body <uid>`` unless told otherwise."""
+    return EmailPost(
+        uid=str(uid),
+        subject=f"Post {uid}" if subject is None else subject,
+        sender=sender,
+        date=date,
+        content=f"body {uid}" if content is None else content,
+        **kwargs,
+    )
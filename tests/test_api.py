@@ -0,0 +1,106 @@
+import threading
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from helpers import make_post
+
+from email_blog_server import EmailBlogServer
+
+
+class JsonApiTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+        for uid in ("1", "2", "3", "4", "5"):
+            self.server._append_email(make_post(uid, message_id=f"<{uid}@example.com>"))
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+
+    async def get_json(self, path: str):
+        response = await self.client.get(path)
+        self.assertEqual(response.status, 200)
+        return await response.json()
+
+    async def test_listing_pages_newest_first_with_before_cursor(self):
+        first = await self.get_json("/api/posts?limit=2")
+        second = await self.get_json(f"/api/posts?limit=2&before={first['next']}")
+        last = await self.get_json(f"/api/posts?limit=2&before={second['next']}")
+
+        self.assertEqual([post["uid"] for post in first["posts"]], ["5", "4"])
+        self.assertEqual([post["uid"] for post in second["posts"]], ["3", "2"])
+        self.assertEqual([post["uid"] for post in last["posts"]], ["1"])
+        self.assertIsNone(last["next"])
+        self.assertEqual(first["posts"][0]["url"], "/email/5")
+        self.assertEqual(first["posts"][0]["sender"], "Writer <writer@example.com>")
+        self.assertNotIn("html", first["posts"][0])
+
+    async def test_delta_query_returns_only_newer_posts_oldest_first(self):
+        self.assertEqual(
+            await self.get_json("/api/posts?after=5"), {"posts": [], "cursor": "5", "more": False}
+        )
+
+        for uid in ("6", "7", "8"):
+            self.server._append_email(make_post(uid, message_id=f"<{uid}@example.com>"))
+        delta = await self.get_json("/api/posts?after=5&limit=2")
+        rest = await self.get_json(f"/api/posts?after={delta['cursor']}&limit=2")
+
+        self.assertEqual([post["uid"] for post in delta["posts"]], ["6", "7"])
+        self.assertTrue(delta["more"])
+        self.assertEqual([post["uid"] for post in rest["posts"]], ["8"])
+        self.assertEqual(rest["cursor"], "8")
+
+    async def test_unknown_cursor_is_gone_and_bad_queries_are_rejected(self):
+        self.assertEqual((await self.client.get("/api/posts?after=missing")).status, 410)
+        self.assertEqual((await self.client.get("/api/posts?after=1&before=2")).status, 400)
+        self.assertEqual((await self.client.get("/api/posts?limit=x")).status, 400)
+
+    async def test_etag_revalidation_and_per_post_cache(self):
+        first = await self.client.get("/api/posts?html=1")
+        etag = first.headers["ETag"]
+        payload = await first.json()
+        cached = dict(self.server._post_json)
+
+        again = await self.client.get("/api/posts?html=1", headers={"If-None-Match": etag})
+        self.server._append_email(make_post("6", message_id="<6@example.com>"))
+        changed = await self.client.get("/api/posts?html=1", headers={"If-None-Match": etag})
+
+        self.assertIn("body 5", payload["posts"][0]["html"])
+        self.assertEqual(again.status, 304)
+        self.assertEqual(changed.status, 200)
+        self.assertTrue(all(self.server._post_json[uid] is cached[uid] for uid in cached))
+
+    async def test_single_post_includes_body(self):
+        post = await self.get_json("/api/posts/3?html=true")
+
+        self.assertEqual(post["uid"], "3")
+        self.assertEqual(post["content"], "body 3")
+        self.assertEqual(post["message_id"], "<3@example.com>")
+        self.assertEqual(post["sender"], "Writer <writer@example.com>")
+        self.assertIn("body 3", post["html"])
+        self.assertEqual((await self.client.get("/api/posts/nope")).status, 404)
+
+    async def test_excerpt_built_later_replaces_the_cached_summary(self):
+        self.server._append_email(make_post("6", content="word " * 200))
+        self.server.apply_config({"excerpt_chars": 20})
+        threads = []
+        render = self.server.render_content_to_html
+
+        def record_thread(content, content_type):
+            threads.append(threading.current_thread())
+            return render(content, content_type)
+
+        self.server.render_content_to_html = record_thread
+
+        before = await self.get_json("/api/posts?limit=1")
+        with_html = await self.get_json("/api/posts?limit=1&html=1")
+        after = await self.get_json("/api/posts?limit=1")
+
+        self.assertIsNone(before["posts"][0]["excerpt"])
+        self.assertIn("word", with_html["posts"][0]["excerpt"])
+        self.assertEqual(after["posts"][0]["excerpt"], with_html["posts"][0]["excerpt"])
+        self.assertNotIn(threading.main_thread(), threads)
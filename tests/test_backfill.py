@@ -0,0 +1,120 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from helpers import make_post
+
+from email_blog_backfill import HistoryBackfill
+from email_blog_server import EmailBlogServer
+
+
+class HistoryBackfillTests(unittest.IsolatedAsyncioTestCase):
+    def make_backfill(self, cursor=None, **kwargs) -> HistoryBackfill:
+        self.fetched = []
+        self.batches = []
+        self.cursor = cursor
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+        async def fetch(uid):
+            self.fetched.append(uid)
+            return b"raw"
+
+        async def parse(uid, raw):
+            return make_post(uid)
+
+        def save_cursor(value):
+            self.cursor = value
+
+        options = {"batch_size": 2, "rate": 60_000, "max_messages": 5, **kwargs}
+        return HistoryBackfill(
+            fetch,
+            parse,
+            lambda posts: self.batches.append([post.uid for post in posts]),
+            lambda: self.cursor,
+            save_cursor,
+            self.idle,
+            **options,
+        )
+
+    async def test_walks_newest_to_oldest_within_max_history(self):
+        backfill = self.make_backfill(skip=lambda uid: uid == "8")
+
+        published = await backfill.run([str(uid) for uid in range(1, 11)], "7")
+
+        self.assertEqual(published, 4)
+        self.assertEqual(self.fetched, ["10", "9", "7", "6"])
+        self.assertEqual(self.batches, [["10", "9"], ["7"], ["6"]])
+        self.assertEqual(self.cursor, "7:6")
+
+    async def test_resumes_below_cursor_for_the_same_uid_validity(self):
+        backfill = self.make_backfill(cursor="7:8")
+        await backfill.run([str(uid) for uid in range(1, 11)], "7")
+        self.assertEqual(self.fetched, ["7", "6"])
+
+        backfill = self.make_backfill(cursor="6:8")
+        await backfill.run([str(uid) for uid in range(1, 11)], "7")
+        self.assertEqual(self.fetched[0], "10")
+
+    async def test_waits_while_live_ingest_is_active(self):
+        backfill = self.make_backfill()
+        self.idle.clear()
+
+        task = asyncio.create_task(backfill.run(["1", "2"], "7"))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.fetched, [])
+
+        self.idle.set()
+        self.assertEqual(await task, 2)
+
+    async def test_rate_limits_fetches(self):
+        backfill = self.make_backfill(rate=1200, batch_size=1)
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        await backfill.run(["1", "2", "3"], "7")
+
+        # 3 messages at 20 per second
+        self.assertGreaterEqual(loop.time() - started, 0.14)
+
+    async def test_disabled_without_max_history(self):
+        backfill = self.make_backfill(max_messages=0)
+        self.assertEqual(await backfill.run(["1", "2"], "7"), 0)
+        self.assertIsNone(self.cursor)
+
+
+class BackfillServerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+
+    def test_backfill_requires_post_store(self):
+        with self.assertRaises(ValueError):
+            self.make_server(backfill_max_messages=100)
+
+    async def test_backfilled_posts_are_stored_and_cached_as_oldest(self):
+        server = self.make_server(post_store_path=str(Path(self.tmp.name) / "posts.sqlite3"))
+        self.addCleanup(server.post_store.close)
+        server._append_email(make_post("20", message_id="<20@example.com>"))
+        server._append_email(make_post("push-1", message_id="<5@example.com>"))
+
+        await server._publish_backfilled(
+            [
+                make_post("6", message_id="<6@example.com>"),
+                make_post("5", message_id="<5@example.com>"),
+            ]
+        )
+
+        self.assertEqual([post.uid for post in server._emails()], ["push-1", "20", "6"])
+        self.assertIn("6", server.post_store)
+        self.assertIn("5", server.post_store)
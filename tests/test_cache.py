@@ -0,0 +1,175 @@
+import random
+import unittest
+
+from helpers import make_post
+
+from email_blog_cache import PostCache, RenderCache
+from email_blog_server import EmailBlogServer
+
+
+class PostCacheTests(unittest.TestCase):
+    def test_accounts_bytes_and_evicts_oldest_first(self):
+        size = make_post("1").nbytes()
+        evicted = []
+        cache = PostCache(max_bytes=size * 3, on_evict=evicted.append)
+
+        for uid in ("1", "2", "3", "4"):
+            cache.appendleft(make_post(uid))
+
+        self.assertEqual([post.uid for post in cache], ["4", "3", "2"])
+        self.assertEqual([post.uid for post in evicted], ["1"])
+        self.assertEqual(cache.nbytes, sum(post.nbytes() for post in cache))
+        self.assertIsNone(cache.get("1"))
+        self.assertEqual(cache.get("3").subject, "Post 3")
+
+    def test_large_post_evicts_several_small_ones(self):
+        small = make_post("1").nbytes()
+        cache = PostCache(max_bytes=small * 4)
+        for uid in ("1", "2", "3"):
+            cache.appendleft(make_post(uid))
+
+        # Random text keeps the body large even after zlib.
+        content = random.Random(0).randbytes(small * 3).hex()
+        cache.appendleft(make_post("big", content=content))
+
+        self.assertEqual([post.uid for post in cache], ["big"])
+
+    def test_newest_post_is_kept_even_when_over_budget(self):
+        cache = PostCache(max_bytes=1)
+        cache.appendleft(make_post("1"))
+
+        self.assertEqual(len(cache), 1)
+
+    def test_reinserting_a_uid_replaces_it(self):
+        cache = PostCache()
+        cache.appendleft(make_post("1"))
+        cache.appendleft({"uid": "1", "subject": "Updated", "from": "a@example.com"})
+
+        self.assertEqual([post.subject for post in cache], ["Updated"])
+        self.assertEqual(cache.nbytes, cache.get("1").nbytes())
+
+    def test_touch_recharges_a_grown_post_and_enforces_the_budget(self):
+        size = make_post("1").nbytes()
+        evicted = []
+        cache = PostCache(max_bytes=size * 2 + 100, on_evict=evicted.append)
+        cache.appendleft(make_post("1"))
+        cache.appendleft(make_post("2"))
+
+        grown = cache.get("2")
+        grown.excerpt = "x" * 200
+        cache.touch(grown)
+
+        self.assertEqual([post.uid for post in evicted], ["1"])
+        self.assertEqual(cache.nbytes, grown.nbytes())
+        cache.touch(make_post("3"))  # Not cached: ignored.
+        self.assertEqual(len(cache), 1)
+
+    def test_rename_keeps_order_and_replaces_a_post_holding_the_new_uid(self):
+        cache = PostCache()
+        for uid in ("1", "2", "3", "4"):
+            cache.appendleft(make_post(uid))
+        cache.remove("3")
+
+        cache.rename({"2": "4", "1": "2"})
+
+        self.assertEqual(
+            [(post.uid, post.subject) for post in cache], [("4", "Post 2"), ("2", "Post 1")]
+        )
+        self.assertEqual(cache.get("4").subject, "Post 2")
+        self.assertEqual(cache.nbytes, sum(post.nbytes() for post in cache))
+
+    def test_clear_resets_accounting(self):
+        cache = PostCache()
+        cache.appendleft(make_post("1"))
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+
+class RenderCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_fragment(self):
+        first = make_post("1", html="<p>" + "a" * 1000 + "</p>")
+        second = make_post("2", html="<p>" + "b" * 1000 + "</p>")
+        third = make_post("3", html="<p>" + "c" * 1000 + "</p>")
+        cache = RenderCache(max_bytes=2500)
+
+        cache.touch_fragment(first)
+        cache.touch_fragment(second)
+        cache.touch_fragment(first)
+        cache.touch_fragment(third)
+
+        self.assertIsNotNone(first.html)
+        self.assertIsNone(second.html)
+        self.assertIsNotNone(third.html)
+        self.assertEqual(cache.fragment_count, 2)
+
+    def test_pages_are_tied_to_a_generation(self):
+        cache = RenderCache()
+        cache.put_page("index", 1, "<html>one</html>")
+
+        self.assertEqual(cache.get_page("index", 1), "<html>one</html>")
+        self.assertIsNone(cache.get_page("index", 2))
+
+        cache.clear_pages()
+        self.assertEqual(cache.page_count, 0)
+        self.assertEqual(cache.nbytes, 0)
+
+
+class ServerCacheBudgetTests(unittest.IsolatedAsyncioTestCase):
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+
+    async def test_evicted_fragments_are_rerendered_for_pages(self):
+        server = self.make_server(render_cache_max_bytes=1)
+        server._append_email(make_post("1", content="first body"))
+        server._append_email(make_post("2", content="second body"))
+
+        html = server.generate_html()
+
+        self.assertIn("first body", html)
+        self.assertIn("second body", html)
+
+    async def test_evicted_posts_leave_the_render_cache(self):
+        server = self.make_server(post_cache_max_bytes=1)
+        server._append_email(make_post("1"))
+        server._append_email(make_post("2"))
+
+        self.assertEqual([post.uid for post in server._emails()], ["2"])
+        self.assertEqual(server.render_cache.fragment_count, 1)
+
+    async def test_lazy_excerpts_and_reloads_keep_accounting_exact(self):
+        server = self.make_server(excerpt_chars=20)
+        server._append_email(make_post("1", content="word " * 200))
+        server.apply_config({"excerpt_chars": 30})
+        cache = server.emails_cache
+        self.assertEqual(cache.nbytes, sum(post.nbytes() for post in cache))
+
+        server.generate_html()
+
+        self.assertIsNotNone(cache.get("1").excerpt)
+        self.assertEqual(cache.nbytes, sum(post.nbytes() for post in cache))
+
+    async def test_metrics_report_cache_bytes(self):
+        server = self.make_server()
+        server._append_email(make_post("1"))
+        server.generate_html()
+
+        resp = await server.handle_metrics(None)
+
+        self.assertEqual(resp.content_type, "text/plain")
+        self.assertIn("# TYPE email_blog_post_cache_bytes gauge", resp.text)
+        self.assertIn(f"email_blog_post_cache_bytes {server.emails_cache.nbytes}\n", resp.text)
+        self.assertIn(f"email_blog_render_cache_bytes {server.render_cache.nbytes}\n", resp.text)
+        self.assertIn("email_blog_posts 1\n", resp.text)
+        self.assertIn("email_blog_render_cache_pages 1\n", resp.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
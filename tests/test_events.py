@@ -0,0 +1,100 @@
+import asyncio
+import json
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from helpers import make_post
+
+from email_blog_events import HEARTBEAT_MESSAGE, SUBSCRIBER_QUEUE_SIZE, EventBroadcaster
+from email_blog_server import EmailBlogServer
+
+
+class EventBroadcasterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_one_encoded_message_is_shared_by_subscribers(self):
+        broadcaster = EventBroadcaster()
+        self.addAsyncCleanup(broadcaster.close)
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+        broadcaster.publish("post", '{"uid": "1"}')
+
+        [message] = first.take()
+        self.assertEqual(message, b'event: post\ndata: {"uid": "1"}\n\n')
+        self.assertIs(second.take()[0], message)
+
+    async def test_lagging_subscriber_is_dropped(self):
+        broadcaster = EventBroadcaster()
+        self.addAsyncCleanup(broadcaster.close)
+        dropped = []
+        slow = broadcaster.subscribe(on_drop=lambda: dropped.append(True))
+        fast = broadcaster.subscribe()
+
+        for number in range(SUBSCRIBER_QUEUE_SIZE + 1):
+            broadcaster.publish("post", str(number))
+            fast.take()
+
+        self.assertTrue(slow.dropped)
+        self.assertEqual(dropped, [True])
+        self.assertEqual(broadcaster.subscriber_count, 1)
+        self.assertEqual(broadcaster.dropped_total, 1)
+
+    async def test_heartbeat_reaches_idle_subscribers(self):
+        broadcaster = EventBroadcaster()
+        broadcaster.heartbeat = 0.01
+        self.addAsyncCleanup(broadcaster.close)
+        subscriber = broadcaster.subscribe()
+
+        await asyncio.wait_for(subscriber.ready.wait(), 1)
+
+        self.assertEqual(subscriber.take()[0], HEARTBEAT_MESSAGE)
+
+
+class EventStreamRouteTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            live_updates=True,
+            shed_max_in_flight=1,
+        )
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+        self.addAsyncCleanup(self.server.live_events.close)
+
+    async def test_published_post_is_streamed_with_its_article(self):
+        stream = await self.client.get("/events")
+        self.assertEqual(stream.content_type, "text/event-stream")
+        self.assertEqual(await stream.content.readuntil(b"\n\n"), b"retry: 5000\n\n")
+        self.assertEqual(self.server.load_shedder.in_flight, 0)
+
+        self.server._append_email(make_post("7"))
+        event = await asyncio.wait_for(stream.content.readuntil(b"\n\n"), 1)
+
+        name, data = event.decode().strip().split("\n")
+        payload = json.loads(data.removeprefix("data: "))
+        self.assertEqual(name, "event: post")
+        self.assertEqual(payload["url"], "/email/7")
+        self.assertIn('<a href="/email/7">Post 7</a>', payload["html"])
+        stream.close()
+
+    async def test_pages_load_the_script_under_a_matching_csp(self):
+        page = await self.client.get("/")
+        script = await self.client.get("/live_updates.js")
+
+        self.assertIn('<script src="/live_updates.js" defer></script>', await page.text())
+        self.assertIn("script-src 'self'", page.headers["Content-Security-Policy"])
+        self.assertIn("connect-src 'self'", await page.text())
+        self.assertEqual(script.status, 200)
+        self.assertIn(b"EventSource", await script.read())
+
+    async def test_streams_are_capped(self):
+        self.server.live_events.max_clients = 1
+        first = await self.client.get("/events")
+        await first.content.readuntil(b"\n\n")
+
+        second = await self.client.get("/events")
+
+        self.assertEqual(second.status, 503)
+        first.close()
@@ -0,0 +1,114 @@
+import unittest
+from html.parser import HTMLParser
+
+from email_blog_excerpt import build_excerpt
+from email_blog_posts import EmailPost
+from email_blog_server import EmailBlogServer
+
+
+class _TagBalance(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.open: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in {"br", "hr", "img"}:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        assert self.open and self.open[-1] == tag, (self.open, tag)
+        self.open.pop()
+
+
+def assert_well_formed(testcase: unittest.TestCase, fragment: str) -> None:
+    checker = _TagBalance()
+    checker.feed(fragment)
+    checker.close()
+    testcase.assertEqual(checker.open, [])
+
+
+class BuildExcerptTests(unittest.TestCase):
+    def test_short_fragments_need_no_excerpt(self):
+        self.assertIsNone(build_excerpt("<p>short</p>", 100))
+        self.assertIsNone(build_excerpt("<p>anything</p>", 0))
+
+    def test_cuts_text_at_a_word_and_closes_tags(self):
+        excerpt = build_excerpt("<p>one <em>two three four</em> five</p><p>six</p>", 12)
+
+        self.assertEqual(excerpt, "<p>one <em>two…</em></p>")
+        assert_well_formed(self, excerpt)
+
+    def test_stops_after_block_budget(self):
+        excerpt = build_excerpt("<h1>T</h1><p>a</p><ul><li>b</li></ul><p>c</p>", 1000, 2)
+
+        self.assertEqual(excerpt, "<h1>T</h1><p>a</p>")
+
+    def test_plain_text_paragraphs_count_as_blocks(self):
+        excerpt = build_excerpt("one<br>line<br><br>two<br><br>three", 1000, 2)
+
+        self.assertEqual(excerpt, "one<br>line<br><br>two")
+
+    def test_entities_stay_escaped_and_links_are_kept(self):
+        excerpt = build_excerpt(
+            '<p>a &amp; <a href="http://x.test" rel="nofollow">b &lt;c&gt; link text</a></p>', 10
+        )
+
+        self.assertEqual(
+            excerpt, '<p>a &amp; <a href="http://x.test" rel="nofollow">b &lt;c&gt;…</a></p>'
+        )
+        assert_well_formed(self, excerpt)
+
+
+class ExcerptModeTests(unittest.IsolatedAsyncioTestCase):
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            render_mode="markdown",
+            **kwargs,
+        )
+
+    def long_post(self) -> EmailPost:
+        return EmailPost(
+            uid="7",
+            subject="Newsletter",
+            sender="news@example.com",
+            date="Mon, 01 Jan 2024 00:00:00 +0000",
+            content="\n\n".join(f"Paragraph {n} " + "word " * 50 for n in range(200)),
+        )
+
+    async def test_index_shows_excerpt_and_permalink_shows_full_body(self):
+        server = self.make_server(excerpt_chars=300)
+        server._append_email(self.long_post())
+
+        index = server.generate_html()
+        post = server._emails()[0]
+        permalink = server.generate_html(single_email=post)
+
+        self.assertIn('<a href="/email/7">Read more &rarr;</a>', index)
+        self.assertNotIn("Paragraph 3", index)
+        self.assertIn("Paragraph 199", permalink)
+        self.assertNotIn("Read more", permalink)
+
+    async def test_index_does_not_rerender_full_bodies(self):
+        server = self.make_server(excerpt_chars=300, render_cache_max_bytes=1)
+        server._append_email(self.long_post())
+        server._append_email(EmailPost("8", "Tiny", "a@example.com", "", "short"))
+        server._emails()[1].html = None
+
+        server.generate_html()
+
+        self.assertIsNone(server._emails()[1].html)
+
+    async def test_excerpts_are_off_by_default(self):
+        server = self.make_server()
+        server._append_email(self.long_post())
+
+        self.assertIsNone(server._emails()[0].excerpt)
+        self.assertIn("Paragraph 199", server.generate_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from email_blog_fetch import iter_fetch_bodies, parse_fetch_response
+from email_blog_messages import (
+    extract_fetch_message_bytes,
+    parse_id_list,
+    parse_rfc822_size,
+    parse_uid_validity,
+)
+
+RAW = b"Subject: Hello\r\n\r\nbody with ) and {3} inside\r\n"
+
+
+class FetchParserTests(unittest.TestCase):
+    def test_literal_item_is_returned_without_copy(self):
+        literal = bytearray(RAW)
+        data = [f"1 FETCH (UID 7 BODY[] {{{len(RAW)}}}".encode(), literal, b")", b"Done"]
+
+        self.assertIs(extract_fetch_message_bytes(data), literal)
+
+    def test_inline_literal_size_is_exact(self):
+        data = f"* 1 FETCH (BODY[] {{{len(RAW) - 2}}}\r\n".encode() + RAW[:-2] + b" UID 9)"
+
+        [response] = parse_fetch_response([data])
+
+        self.assertEqual(bytes(response.body()), RAW[:-2])
+        self.assertEqual(response.uid, 9)
+        self.assertEqual(extract_fetch_message_bytes([data]), RAW[:-2])
+
+    def test_inline_literal_and_attributes(self):
+        line = f'* 3 FETCH (UID 11 FLAGS (\\Seen \\Answered) X "a \\"q\\"" BODY[]<0> {{{len(RAW)}}}\r\n'
+        data = line.encode() + RAW + b" RFC822.SIZE 42 INTERNALDATE NIL)"
+
+        [response] = parse_fetch_response(data)
+
+        self.assertEqual(response.seq, 3)
+        self.assertEqual(response.uid, 11)
+        self.assertEqual(response.size, 42)
+        self.assertEqual(response.attributes["FLAGS"], b"(\\Seen \\Answered)")
+        self.assertEqual(response.attributes["X"], 'a "q"')
+        self.assertIsNone(response.attributes["INTERNALDATE"])
+        self.assertEqual(bytes(response.body()), RAW)
+
+    def test_multi_message_response_is_split_per_uid(self):
+        second = b"Subject: Two\r\n\r\nsecond"
+        data = [
+            f"1 FETCH (UID 21 BODY[] {{{len(RAW)}}}".encode(),
+            bytearray(RAW),
+            b")",
+            f"2 FETCH (UID 22 RFC822.SIZE {len(second)} BODY[] {{{len(second)}}}".encode(),
+            bytearray(second),
+            b")",
+            b"FETCH completed.",
+        ]
+
+        bodies = {uid: bytes(body) for uid, body in iter_fetch_bodies(data)}
+
+        self.assertEqual(bodies, {21: RAW, 22: second})
+        self.assertEqual(parse_fetch_response(data)[1].size, len(second))
+
+    def test_responses_without_literal_fall_back(self):
+        self.assertEqual(extract_fetch_message_bytes([b"1 (UID 1 BODY[]", RAW, b")"]), RAW)
+        self.assertEqual(parse_fetch_response([b"OK done"]), [])
+
+    def test_metadata_helpers(self):
+        self.assertEqual(parse_rfc822_size([b"1 (UID 123 RFC822.SIZE 100)"]), 100)
+        self.assertEqual(parse_uid_validity([b"OK [UIDVALIDITY 42] ok"]), "42")
+        self.assertEqual(parse_id_list([b"3 5 8", b"SEARCH completed"]), ["3", "5", "8"])
+        self.assertEqual(parse_id_list(["", "Search done"]), [])
@@ -0,0 +1,148 @@
+import tempfile
+import unittest
+from email.message import EmailMessage
+from pathlib import Path
+
+from email_blog_import import (
+    import_messages,
+    iter_maildir_messages,
+    iter_mbox_messages,
+    iter_source_messages,
+)
+from email_blog_server import EmailBlogServer
+from email_blog_store import PostStore
+
+
+def raw_message(number: int, sender: str = "writer@example.com", body: str = "") -> bytes:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["Subject"] = f"Post {number}"
+    msg["Date"] = f"Mon, {number:02d} Jan 2024 00:00:00 +0000"
+    msg["Message-ID"] = f"<post-{number}@example.com>"
+    msg.set_content(body or f"body {number}")
+    return msg.as_bytes()
+
+
+def write_mbox(path: Path, messages: list[bytes]) -> None:
+    with open(path, "wb") as handle:
+        for message in messages:
+            handle.write(b"From writer@example.com Mon Jan  1 00:00:00 2024\n")
+            handle.write(message.replace(b"\nFrom ", b"\n>From "))
+            handle.write(b"\n")
+
+
+class MailboxScanTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def test_mbox_scan_splits_on_from_lines_and_unquotes(self):
+        messages = [raw_message(1), raw_message(2, body="Hello\nFrom the list\n"), raw_message(3)]
+        write_mbox(self.root / "archive.mbox", messages)
+
+        found = list(iter_mbox_messages(self.root / "archive.mbox"))
+
+        self.assertEqual(len(found), 3)
+        self.assertEqual(found[0].rstrip(b"\n"), messages[0].rstrip(b"\n"))
+        self.assertIn(b"\nFrom the list", found[1])
+        self.assertNotIn(b">From", found[1])
+
+    def test_empty_mbox_yields_nothing(self):
+        (self.root / "empty.mbox").write_bytes(b"")
+        self.assertEqual(list(iter_mbox_messages(self.root / "empty.mbox")), [])
+
+    def test_maildir_reads_cur_and_new(self):
+        for folder, number in (("cur", 1), ("new", 2), ("tmp", 3)):
+            (self.root / folder).mkdir()
+            (self.root / folder / f"{number}.eml").write_bytes(raw_message(number))
+
+        self.assertEqual(len(list(iter_maildir_messages(self.root))), 2)
+        self.assertEqual(len(list(iter_source_messages(self.root))), 2)
+
+
+class ImportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = PostStore(Path(self.tmp.name) / "posts.sqlite3")
+        self.addCleanup(self.store.close)
+
+    def test_import_inserts_skips_and_dedupes(self):
+        messages = [raw_message(number) for number in range(1, 6)]
+        messages.append(raw_message(9, sender="stranger@example.com"))
+
+        progress = import_messages(
+            messages,
+            self.store,
+            allowed_senders=["writer@example.com"],
+            on_progress=lambda _p: None,
+        )
+        again = import_messages(messages[:2], self.store, on_progress=lambda _p: None)
+
+        self.assertEqual((progress.read, progress.imported, progress.skipped), (6, 5, 1))
+        self.assertEqual((again.imported, again.duplicates), (0, 2))
+        self.assertEqual(self.store.count(), 5)
+        newest = next(self.store.iter_recent())
+        self.assertEqual(newest.subject, "Post 5")
+        self.assertTrue(newest.uid.startswith("import-"))
+        self.assertEqual(newest.content.strip(), "body 5")
+
+    def test_import_with_process_pool(self):
+        messages = [raw_message(number) for number in range(1, 26)]
+
+        progress = import_messages(messages, self.store, jobs=2, on_progress=lambda _p: None)
+
+        self.assertEqual(progress.imported, 25)
+        self.assertEqual(self.store.count(), 25)
+
+
+class PostStoreServerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "posts.sqlite3"
+        store = PostStore(self.path)
+        import_messages(
+            [raw_message(number) for number in range(1, 4)], store, on_progress=lambda _p: None
+        )
+        store.close()
+
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            post_store_path=str(self.path),
+            **kwargs,
+        )
+
+    async def test_server_loads_stored_posts_newest_first(self):
+        server = self.make_server()
+        events = []
+        server.add_post_listener(lambda event, post: events.append((event, post.subject)))
+
+        self.assertEqual(await server.load_post_store(), 3)
+
+        self.assertEqual(
+            [post.subject for post in server._emails()], ["Post 3", "Post 2", "Post 1"]
+        )
+        self.assertIn("Post 3", server.generate_html())
+        self.assertEqual(server.search_index.search("body")[1], 3)
+        self.assertEqual(events, [("restore", f"Post {number}") for number in (3, 2, 1)])
+        server.post_store.close()
+
+    async def test_loading_stops_at_the_cache_budget(self):
+        server = self.make_server(post_cache_max_bytes=1)
+
+        self.assertEqual(await server.load_post_store(), 0)
+        server.post_store.close()
+
+    async def test_pushed_posts_are_stored(self):
+        server = self.make_server()
+        status, uid = await server.ingest_raw_message(raw_message(7))
+
+        self.assertEqual(status, "published")
+        self.assertEqual(server.post_store.get(uid).subject, "Post 7")
+        server.post_store.close()
@@ -0,0 +1,116 @@
+import unittest
+from types import SimpleNamespace
+
+from aiohttp import web
+from helpers import make_post
+
+from email_blog_indexes import PostIndexes, month_key, sender_key
+from email_blog_server import EmailBlogServer
+
+
+class PostIndexesTests(unittest.TestCase):
+    def test_keys_are_normalized(self):
+        self.assertEqual(sender_key("Alice <Alice@Example.COM>"), "alice@example.com")
+        self.assertEqual(month_key(0.0), "1970/01")
+        self.assertIsNone(month_key(None))
+
+    def test_listings_are_sorted_newest_first_and_paged(self):
+        indexes = PostIndexes()
+        indexes.add(make_post("1", sender="a@example.com", date="Mon, 01 Jan 2024 00:00:00 +0000"))
+        indexes.add(make_post("2", sender="a@example.com", date="Wed, 03 Jan 2024 00:00:00 +0000"))
+        indexes.add(
+            make_post("3", sender="A <a@example.com>", date="Tue, 02 Jan 2024 00:00:00 +0000")
+        )
+        indexes.add(make_post("4", sender="b@example.com", date="Thu, 01 Feb 2024 00:00:00 +0000"))
+
+        listing = indexes.by_sender("a@example.com")
+        self.assertEqual([post.uid for post in listing.page(1)], ["2", "3", "1"])
+        self.assertEqual([post.uid for post in listing.page(2, size=2)], ["1"])
+        self.assertEqual(len(indexes.by_month(2024, 1)), 3)
+        self.assertEqual(len(indexes.by_month(2024, 2)), 1)
+
+    def test_remove_and_replace(self):
+        indexes = PostIndexes()
+        indexes.add(make_post("1", sender="a@example.com", date="Mon, 01 Jan 2024 00:00:00 +0000"))
+        indexes.add(make_post("1", sender="b@example.com", date="Thu, 01 Feb 2024 00:00:00 +0000"))
+
+        self.assertIsNone(indexes.by_sender("a@example.com"))
+        self.assertIsNone(indexes.by_month(2024, 1))
+
+        indexes.remove("1")
+        self.assertIsNone(indexes.by_sender("b@example.com"))
+
+    def test_undated_posts_are_not_archived(self):
+        indexes = PostIndexes()
+        indexes.add(make_post("1", sender="a@example.com", date="not a date"))
+
+        self.assertEqual(len(indexes.by_sender("a@example.com")), 1)
+        self.assertIsNone(indexes.by_month(1970, 1))
+
+
+class ListingRouteTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+        self.server._append_email(
+            make_post(
+                "1",
+                sender="Alice <alice@example.com>",
+                date="Mon, 01 Jan 2024 00:00:00 +0000",
+                subject="Jan",
+            )
+        )
+        self.server._append_email(
+            make_post(
+                "2",
+                sender="Bob <bob@example.com>",
+                date="Thu, 01 Feb 2024 00:00:00 +0000",
+                subject="Feb",
+            )
+        )
+
+    def request(self, **match_info) -> SimpleNamespace:
+        return SimpleNamespace(headers={}, query={}, match_info=match_info)
+
+    async def test_sender_route_lists_only_that_sender(self):
+        resp = await self.server.handle_sender(self.request(address="ALICE@example.com"))
+
+        self.assertIn("Posts from alice@example.com", resp.text)
+        self.assertIn("/email/1", resp.text)
+        self.assertNotIn("/email/2", resp.text)
+
+    async def test_archive_route_lists_only_that_month(self):
+        resp = await self.server.handle_archive(self.request(year="2024", month="02"))
+
+        self.assertIn("Posts from February 2024", resp.text)
+        self.assertIn("/email/2", resp.text)
+        self.assertNotIn("/email/1", resp.text)
+
+    async def test_unknown_listings_are_not_found(self):
+        with self.assertRaises(web.HTTPNotFound):
+            await self.server.handle_sender(self.request(address="nobody@example.com"))
+        with self.assertRaises(web.HTTPNotFound):
+            await self.server.handle_archive(self.request(year="2023", month="13"))
+
+    async def test_post_meta_links_to_listings(self):
+        html = self.server.generate_html()
+
+        self.assertIn('<a href="/sender/alice@example.com">', html)
+        self.assertIn('<a href="/archive/2024/01">', html)
+
+    async def test_listing_pages_are_cached_until_posts_change(self):
+        first = self.server.generate_sender_html("alice@example.com")
+        self.assertIs(self.server.generate_sender_html("alice@example.com"), first)
+
+        self.server._append_email(
+            make_post("3", sender="alice@example.com", date="Fri, 05 Jan 2024 00:00:00 +0000")
+        )
+        self.assertIn("/email/3", self.server.generate_sender_html("alice@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
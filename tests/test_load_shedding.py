@@ -0,0 +1,75 @@
+import asyncio
+import time
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from helpers import make_post
+
+from email_blog_load import LoopLagMonitor
+from email_blog_server import EmailBlogServer
+
+
+class LoopLagMonitorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_blocking_work_shows_up_as_lag(self):
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        self.assertGreaterEqual(monitor.max_lag, 0.05)
+
+
+class LoadSheddingTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            shed_max_in_flight=4,
+            shed_retry_after=3,
+        )
+        self.server._append_email(make_post("1"))
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+
+    async def test_etag_revalidation_returns_304_until_posts_change(self):
+        first = await self.client.get("/")
+        etag = first.headers["ETag"]
+
+        cached = await self.client.get("/", headers={"If-None-Match": etag})
+        self.server._append_email(make_post("2"))
+        changed = await self.client.get("/", headers={"If-None-Match": etag})
+
+        self.assertEqual(cached.status, 304)
+        self.assertEqual(changed.status, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    async def test_overload_sheds_rebuilds_but_serves_cached_pages_and_health(self):
+        etag = (await self.client.get("/")).headers["ETag"]
+        self.server.load_shedder.in_flight = 10
+
+        revalidated = await self.client.get("/", headers={"If-None-Match": etag})
+        cached = await self.client.get("/")
+        shed = await self.client.get("/feed.xml")
+        health = await self.client.get("/health")
+
+        self.assertEqual(revalidated.status, 304)
+        self.assertEqual(cached.status, 200)
+        self.assertEqual(shed.status, 503)
+        self.assertEqual(shed.headers["Retry-After"], "3")
+        self.assertEqual(health.status, 200)
+
+        self.server.load_shedder.in_flight = 0
+        metrics = await (await self.client.get("/metrics")).text()
+        self.assertIn("# TYPE email_blog_http_requests_shed_total counter", metrics)
+        self.assertIn("email_blog_http_requests_shed_total 1", metrics)
+
+    async def test_lag_threshold_sheds(self):
+        self.server.load_shedder.max_lag = 0.05
+        self.server.loop_lag.lag = 0.2
+
+        self.assertEqual((await self.client.get("/feed.xml")).status, 503)
@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from email.message import EmailMessage
+from pathlib import Path
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from email_blog_media import MediaStore
+from email_blog_messages import parse_email_message
+from email_blog_rendering import sanitize_html
+from email_blog_server import EmailBlogServer
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+def html_message_with_image(html_body: str) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = "writer@example.com"
+    msg["Subject"] = "Photo"
+    msg["Message-ID"] = "<photo@example.com>"
+    msg.set_content("plain fallback")
+    msg.add_alternative(html_body, subtype="html")
+    msg.get_payload()[1].add_related(PNG, "image", "png", cid="<logo@example.com>")
+    return msg.as_bytes()
+
+
+class MediaStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = MediaStore(self.tmp.name)
+
+    def test_put_is_content_addressed_and_deduplicated(self):
+        name = self.store.put(PNG, "image/png")
+
+        self.assertEqual(self.store.put(PNG, "image/png"), name)
+        self.assertTrue(name.endswith(".png"))
+        self.assertEqual(self.store.path(name).read_bytes(), PNG)
+        self.assertEqual(len(list(Path(self.tmp.name).rglob("*.png"))), 1)
+
+    def test_rejects_unsupported_types_and_bad_names(self):
+        self.assertIsNone(self.store.put(b"<svg onload=alert(1)>", "image/svg+xml"))
+        self.assertIsNone(self.store.path("../secret.png"))
+        self.assertIsNone(self.store.path("0" * 64 + ".png"))
+
+    def test_cid_images_are_stored_and_rewritten(self):
+        raw = html_message_with_image('<p>Hi</p><img src="cid:logo@example.com" alt="logo">')
+
+        post = parse_email_message("1", raw, media_store=self.store)
+
+        name = self.store.put(PNG, "image/png")
+        self.assertEqual(post.content_type, "text/html")
+        self.assertIn(f'src="/media/{name}"', post.content)
+        self.assertNotIn("cid:", post.content)
+
+
+class ImageSanitizingTests(unittest.TestCase):
+    def test_engines_keep_local_images_and_drop_remote_ones(self):
+        local = "/media/" + "a" * 64 + ".png"
+        source = (
+            f'<img src="{local}" alt="ok" onerror="x()">'
+            '<img src="https://tracker.example/p.gif">'
+            '<img src="cid:missing@example.com">'
+        )
+        for engine in ("bleach", "stdlib"):
+            with self.subTest(engine=engine):
+                cleaned = sanitize_html(source, engine)
+                self.assertIn(local, cleaned)
+                self.assertNotIn("tracker", cleaned)
+                self.assertNotIn("onerror", cleaned)
+                self.assertEqual(cleaned.count("<img"), 1)
+
+
+class MediaRouteTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            render_mode="auto",
+            media_dir=self.tmp.name,
+        )
+        self.client = TestClient(TestServer(self.server.app))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+
+    async def test_pushed_image_is_served_immutable_with_ranges(self):
+        raw = html_message_with_image('<p>Hi</p><img src="cid:logo@example.com">')
+        _status, uid = await self.server.ingest_raw_message(raw)
+        page = await (await self.client.get(f"/email/{uid}")).text()
+        name = self.server.media_store.put(PNG, "image/png")
+        self.assertIn(f"/media/{name}", page)
+
+        response = await self.client.get(f"/media/{name}")
+        partial = await self.client.get(f"/media/{name}", headers={"Range": "bytes=0-7"})
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.read(), PNG)
+        self.assertEqual(response.content_type, "image/png")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(partial.status, 206)
+        self.assertEqual(await partial.read(), PNG[:8])
+
+    async def test_unknown_media_is_404(self):
+        self.assertEqual((await self.client.get("/media/" + "f" * 64 + ".png")).status, 404)
+        self.assertEqual((await self.client.get("/media/..%2Fposts.png")).status, 404)
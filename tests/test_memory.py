@@ -0,0 +1,119 @@
+import tracemalloc
+import unittest
+
+from aiohttp.test_utils import TestClient, TestServer
+from helpers import make_post
+
+from email_blog_memory import AllocationTracker, process_memory
+from email_blog_server import EmailBlogServer
+
+ADMIN = {"Authorization": "Bearer admin-secret"}
+
+
+class AllocationTrackerTests(unittest.TestCase):
+    def setUp(self):
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc is already running")
+        self.tracker = AllocationTracker()
+        self.addCleanup(self.tracker.stop)
+
+    def test_snapshot_reports_growth_since_the_previous_one(self):
+        self.assertTrue(self.tracker.start())
+        self.assertFalse(self.tracker.start())
+        leak = [bytearray(1024) for _ in range(200)]
+
+        allocators = self.tracker.snapshot(limit=1)
+
+        self.assertEqual(len(allocators), 1)
+        self.assertTrue(allocators[0]["traceback"][0].startswith(__file__))
+        self.assertGreaterEqual(allocators[0]["size_diff_bytes"], 200 * 1024)
+        self.assertLess(self.tracker.snapshot(limit=1)[0]["size_diff_bytes"], 200 * 1024)
+        del leak
+
+    def test_snapshot_needs_tracing_and_a_known_group(self):
+        with self.assertRaises(RuntimeError):
+            self.tracker.snapshot()
+        self.tracker.start()
+        with self.assertRaisesRegex(ValueError, "group"):
+            self.tracker.snapshot(group="module")
+
+        self.assertTrue(self.tracker.stop())
+        self.assertFalse(self.tracker.status()["tracing"])
+        self.assertFalse(self.tracker.stop())
+
+    def test_process_memory_reports_resident_bytes(self):
+        report = process_memory()
+
+        self.assertGreater(report["max_rss_bytes"], 0)
+        self.assertIn("gc_counts", report)
+
+
+class MemoryEndpointTests(unittest.IsolatedAsyncioTestCase):
+    async def start(self, **kwargs) -> TestClient:
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+        client = TestClient(TestServer(self.server.app))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        self.addCleanup(self.server.allocations.stop)
+        self.server._runner = client.server.runner
+        return client
+
+    async def test_reports_cache_sizes_and_connections(self):
+        client = await self.start(admin_token="admin-secret")
+        self.server._append_email(make_post("1"))
+        self.server.processed_uids.update({"1", "2"})
+        self.server.generate_html()
+
+        response = await client.get("/admin/memory")
+        self.assertEqual(response.status, 401)
+        response = await client.get("/admin/memory", headers=ADMIN)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["Cache-Control"], "no-store")
+        report = await response.json()
+
+        self.assertEqual(report["post_cache"]["posts"], 1)
+        self.assertEqual(report["post_cache"]["bytes"], self.server.emails_cache.nbytes)
+        self.assertEqual(report["processed_uids"], 2)
+        self.assertEqual(report["render_cache"]["fragments"], 1)
+        self.assertEqual(report["http"]["connections"], 1)
+        self.assertFalse(report["tracemalloc"]["tracing"])
+
+    async def test_tracemalloc_lifecycle(self):
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc is already running")
+        client = await self.start(admin_token="admin-secret")
+
+        response = await client.post("/admin/memory/snapshot", headers=ADMIN)
+        self.assertEqual(response.status, 409)
+        response = await client.post("/admin/memory/start?frames=3", headers=ADMIN)
+        report = await response.json()
+        self.assertTrue(report["started"])
+        self.assertEqual(report["frames"], 3)
+
+        response = await client.post("/admin/memory/snapshot?limit=5", headers=ADMIN)
+        self.assertEqual(response.status, 200)
+        self.assertLessEqual(len((await response.json())["allocators"]), 5)
+        response = await client.post("/admin/memory/snapshot?group=module", headers=ADMIN)
+        self.assertEqual(response.status, 400)
+
+        response = await client.post("/admin/memory/stop", headers=ADMIN)
+        self.assertTrue((await response.json())["stopped"])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    async def test_routes_need_an_admin_token(self):
+        client = await self.start()
+
+        response = await client.get("/admin/memory")
+        self.assertEqual(response.status, 404)
+        response = await client.post("/admin/memory/start")
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from email.message import EmailMessage
 
 from email_blog_messages import extract_email_content, extract_fetch_message_bytes
+from email_blog_posts import EmailPost
 from email_blog_server import EmailBlogServer
 
 
@@ -170,18 +171,16 @@ class MessageProcessingTests(unittest.IsolatedAsyncioTestCase):
         )
         fetched = []
 
-        async def fake_fetch_email(uid):
+        async def fake_fetch_message_bytes(uid):
             fetched.append(uid)
-            return {
-                "subject": f"Post {uid}",
-                "from": "User",
-                "date": "Mon, 01 Jan 2024 12:34:56 +0000",
-                "content": "Body",
-                "content_type": "text/plain",
-                "uid": uid,
-            }
+            msg = EmailMessage()
+            msg["From"] = "User <user@example.com>"
+            msg["Subject"] = f"Post {uid}"
+            msg["Date"] = "Mon, 01 Jan 2024 12:34:56 +0000"
+            msg.set_content("Body")
+            return msg.as_bytes()
 
-        server.fetch_email = fake_fetch_email
+        server._fetch_message_bytes = fake_fetch_message_bytes
 
         await server._fetch_new_uids(limit_to_recent=True)
         await server._fetch_new_uids()
@@ -211,6 +210,35 @@ class MessageProcessingTests(unittest.IsolatedAsyncioTestCase):
         )
 
 
+class EmailPostTests(unittest.TestCase):
+    def test_long_bodies_are_compressed_and_round_trip(self):
+        content = "paragraph text " * 500
+        post = EmailPost("1", "Subject", "User <user@example.com>", "", content)
+
+        self.assertIsInstance(post._body, bytes)
+        self.assertLess(len(post._body), len(content))
+        self.assertEqual(post.content, content)
+        self.assertEqual(post["content"], content)
+
+    def test_sender_is_interned_and_date_parsed_once(self):
+        first = EmailPost("1", "A", "".join(["User ", "<user@example.com>"]), "", "x")
+        second = EmailPost("2", "B", "".join(["User ", "<user@example.com>"]), "", "y")
+        dated = EmailPost("3", "C", "User", "Tue, 02 Jan 2024 08:00:00 +0000", "z")
+
+        self.assertIs(first.sender, second.sender)
+        self.assertEqual(first["from"], first.sender)
+        self.assertIsNone(first.timestamp)
+        self.assertEqual(dated.timestamp, 1704182400.0)
+
+    def test_dict_records_convert_to_posts(self):
+        post = EmailPost.from_mapping({"uid": 5, "subject": "S", "from": "F", "content": "C"})
+
+        self.assertEqual(post.uid, "5")
+        self.assertEqual(post.content_type, "text/plain")
+        self.assertEqual(post.get("missing", "default"), "default")
+        self.assertEqual(post.to_dict()["from"], "F")
+
+
 class FakeImapClient:
     def __init__(self, responses):
         self.responses = responses
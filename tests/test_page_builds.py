@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from helpers import make_post
+
+from email_blog_server import EmailBlogServer
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+
+    def count_builds(self, server: EmailBlogServer, delay: float = 0.05) -> list[str]:
+        calls = []
+        lock = threading.Lock()
+        generate_html = server.generate_html
+
+        def slow_generate_html(single_email=None):
+            with lock:
+                calls.append(threading.current_thread().name)
+            time.sleep(delay)
+            return generate_html(single_email)
+
+        server.generate_html = slow_generate_html
+        return calls
+
+    async def test_concurrent_misses_share_one_build(self):
+        server = self.make_server()
+        server._append_email(make_post("1"))
+        calls = self.count_builds(server)
+
+        responses = await asyncio.gather(*(server.handle_blog(None) for _ in range(20)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertNotEqual(calls[0], threading.current_thread().name)
+        self.assertEqual(len({resp.text for resp in responses}), 1)
+        self.assertEqual(server._page_builds, {})
+
+    async def test_cached_permalink_is_served_without_a_build(self):
+        server = self.make_server()
+        server._append_email(make_post("7", slug="seven"))
+        calls = self.count_builds(server, delay=0)
+        request = SimpleNamespace(headers={}, match_info={"uid": "seven"})
+
+        first = await server.handle_single_email(request)
+        second = await server.handle_single_email(request)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.text, second.text)
+        self.assertEqual(server._page_builds, {})
+
+    async def test_new_generation_builds_again(self):
+        server = self.make_server()
+        calls = self.count_builds(server, delay=0)
+        await server.handle_blog(None)
+        await server.handle_blog(None)
+
+        server._append_email(make_post("2"))
+        resp = await server.handle_blog(None)
+
+        self.assertEqual(len(calls), 2)
+        self.assertIn("Post 2", resp.text)
+
+    async def test_cancelled_request_does_not_cancel_the_build(self):
+        server = self.make_server()
+        calls = self.count_builds(server)
+        first = asyncio.ensure_future(server.handle_blog(None))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(server.handle_blog(None))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        resp = await second
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(resp.status, 200)
+
+    async def test_stale_page_is_served_while_revalidating(self):
+        server = self.make_server(stale_while_revalidate=True)
+        server._append_email(make_post("1"))
+        await server.handle_blog(None)
+        server._append_email(make_post("2"))
+        self.count_builds(server)
+
+        stale = await server.handle_blog(None)
+        self.assertNotIn("Post 2", stale.text)
+        await asyncio.gather(*server._page_builds.values())
+
+        fresh = await server.handle_blog(None)
+        self.assertIn("Post 2", fresh.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from email_blog_pipeline import IngestPipeline
+
+
+class IngestPipelineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_publishes_in_input_order_when_parsing_finishes_out_of_order(self):
+        published = []
+
+        async def fetch(uid):
+            return f"raw-{uid}"
+
+        async def parse(uid, raw):
+            await asyncio.sleep(0.01 * (5 - int(uid)))
+            return {"uid": uid, "raw": raw}
+
+        def publish(uid, result):
+            published.append(uid)
+
+        pipeline = IngestPipeline(fetch, parse, publish, fetch_concurrency=2, parse_concurrency=4)
+
+        count = await pipeline.run(["1", "2", "3", "4"])
+
+        self.assertEqual(count, 4)
+        self.assertEqual(published, ["1", "2", "3", "4"])
+
+    async def test_in_flight_messages_are_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        async def fetch(uid):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            return uid
+
+        async def parse(uid, raw):
+            await asyncio.sleep(0)
+            return raw
+
+        async def publish(uid, result):
+            nonlocal in_flight
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+        pipeline = IngestPipeline(
+            fetch, parse, publish, fetch_concurrency=1, parse_concurrency=1, queue_size=2
+        )
+
+        self.assertEqual(await pipeline.run(str(uid) for uid in range(50)), 50)
+        self.assertLessEqual(peak, 2 + 1 + 1)
+
+    async def test_stage_failures_are_published_as_missing(self):
+        published = []
+
+        async def fetch(uid):
+            if uid == "2":
+                raise ConnectionError("boom")
+            return uid
+
+        async def parse(uid, raw):
+            if uid == "3":
+                raise ValueError("bad message")
+            return raw
+
+        def publish(uid, result):
+            published.append((uid, result))
+
+        with self.assertLogs("email_blog_pipeline", level="ERROR"):
+            count = await IngestPipeline(fetch, parse, publish).run(["1", "2", "3", "4"])
+
+        self.assertEqual(count, 2)
+        self.assertEqual(published, [("1", "1"), ("2", None), ("3", None), ("4", "4")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+from email.message import EmailMessage
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from email_blog_push import LmtpServer, push_uid
+from email_blog_server import EmailBlogServer
+
+
+def raw_message(
+    subject: str = "Pushed",
+    sender: str = "writer@example.com",
+    message_id: str = "<abc@example.com>",
+    body: str = "pushed body",
+) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["Subject"] = subject
+    msg["Date"] = "Mon, 01 Jan 2024 00:00:00 +0000"
+    msg["Message-ID"] = message_id
+    msg.set_content(body)
+    return msg.as_bytes()
+
+
+class PushUidTests(unittest.TestCase):
+    def test_uid_follows_message_id(self):
+        self.assertEqual(push_uid(raw_message(subject="a")), push_uid(raw_message(subject="b")))
+        self.assertNotEqual(
+            push_uid(raw_message()), push_uid(raw_message(message_id="<other@example.com>"))
+        )
+        self.assertTrue(push_uid(raw_message()).startswith("push-"))
+
+
+class PushIngestTests(unittest.IsolatedAsyncioTestCase):
+    def make_server(self, **kwargs) -> EmailBlogServer:
+        return EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+
+    async def test_ingest_publishes_and_dedupes(self):
+        server = self.make_server()
+
+        status, uid = await server.ingest_raw_message(raw_message())
+        self.assertEqual(status, "published")
+        self.assertEqual(server._emails()[0].uid, uid)
+
+        self.assertEqual(await server.ingest_raw_message(raw_message()), ("duplicate", uid))
+        self.assertEqual(len(server._emails()), 1)
+
+    async def test_ingest_applies_sender_allowlist_and_size_limit(self):
+        server = self.make_server(allowed_senders=["boss@example.com"], max_email_bytes=2000)
+
+        self.assertEqual((await server.ingest_raw_message(raw_message()))[0], "rejected")
+        huge = raw_message(sender="boss@example.com", body="x" * 5000)
+        self.assertEqual((await server.ingest_raw_message(huge))[0], "too_large")
+        self.assertEqual(server._emails(), [])
+
+    async def test_later_imap_copy_is_skipped_by_message_id(self):
+        server = self.make_server()
+        _, uid = await server.ingest_raw_message(raw_message())
+
+        imap_copy = server._parse_message("42", raw_message())
+        await server._publish_fetched("42", imap_copy)
+
+        self.assertEqual([post.uid for post in server._emails()], [uid])
+        self.assertIn("42", server.processed_uids)
+
+    async def test_http_endpoint_requires_token(self):
+        server = self.make_server(ingest_token="push-secret", max_email_bytes=4000)
+        async with TestClient(TestServer(server.app)) as client:
+            resp = await client.post("/ingest", data=raw_message())
+            self.assertEqual(resp.status, 401)
+
+            headers = {"Authorization": "Bearer push-secret"}
+            resp = await client.post("/ingest", data=raw_message(), headers=headers)
+            self.assertEqual(resp.status, 201)
+            self.assertEqual((await resp.json())["uid"], push_uid(raw_message()))
+
+            resp = await client.post("/ingest", data=b"x" * 5000, headers=headers)
+            self.assertEqual(resp.status, 413)
+
+    async def test_http_endpoint_is_disabled_without_token(self):
+        server = self.make_server()
+        async with TestClient(TestServer(server.app)) as client:
+            resp = await client.post("/ingest", data=raw_message())
+            self.assertIn(resp.status, {404, 405})
+
+    async def test_public_lmtp_bind_requires_opt_in(self):
+        with self.assertRaisesRegex(ValueError, "LMTP_HOST"):
+            self.make_server(lmtp_host="0.0.0.0", lmtp_port=2424)
+
+
+class LmtpServerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.delivered: list[bytes] = []
+
+        async def deliver(message: bytes, source: str):
+            self.delivered.append(message)
+            return ("rejected", None) if b"spam" in message else ("published", "push-1")
+
+        self.lmtp = LmtpServer(deliver, port=0, max_message_bytes=200)
+        await self.lmtp.start()
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.lmtp.port)
+        await self.reader.readline()
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.lmtp.stop()
+
+    async def command(self, line: bytes) -> list[bytes]:
+        self.writer.write(line + b"\r\n")
+        await self.writer.drain()
+        replies = []
+        while True:
+            reply = await self.reader.readline()
+            replies.append(reply.strip())
+            if reply[3:4] != b"-":
+                return replies
+
+    async def send_message(self, body: bytes, recipients: int = 1) -> list[bytes]:
+        await self.command(b"MAIL FROM:<a@example.com>")
+        for n in range(recipients):
+            await self.command(b"RCPT TO:<blog%d@example.com>" % n)
+        self.assertTrue((await self.command(b"DATA"))[0].startswith(b"354"))
+        self.writer.write(body + b"\r\n.\r\n")
+        await self.writer.drain()
+        return [(await self.reader.readline()).strip() for _ in range(recipients)]
+
+    async def test_lhlo_advertises_size(self):
+        replies = await self.command(b"LHLO mta.example.com")
+
+        self.assertIn(b"250 SIZE 200", replies)
+
+    async def test_delivers_with_one_reply_per_recipient_and_unstuffs_dots(self):
+        replies = await self.send_message(b"Subject: hi\r\n\r\n..leading dot", recipients=2)
+
+        self.assertEqual([reply[:3] for reply in replies], [b"250", b"250"])
+        self.assertEqual(self.delivered, [b"Subject: hi\r\n\r\n.leading dot\r\n"])
+
+    async def test_rejections_and_oversized_messages(self):
+        self.assertTrue((await self.send_message(b"spam"))[0].startswith(b"550"))
+        self.assertTrue((await self.send_message(b"x" * 500))[0].startswith(b"552"))
+        self.assertEqual(len(self.delivered), 1)
+
+    async def test_data_requires_recipients(self):
+        self.assertTrue((await self.command(b"DATA"))[0].startswith(b"503"))
+        self.assertEqual(await self.command(b"QUIT"), [b"221 2.0.0 Bye"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import inspect
+import unittest
+
+from helpers import make_post
+
+from email_blog_server import EmailBlogServer
+from email_blog_workers import _leader_kwargs, _worker_kwargs, apply_leader_event
+
+SETTINGS = {
+    "imap_server": "imap.example.com",
+    "email_addr": "user@example.com",
+    "password": "secret",
+    "enable_imap": False,
+}
+
+
+class ConfigReloadTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = EmailBlogServer(**SETTINGS)
+        self.post = make_post("1", content="*emphasis*")
+        self.server._append_email(self.post)
+        self.server.generate_html()
+
+    async def test_render_mode_change_rerenders_fragments_only(self):
+        self.assertEqual(self.server.apply_config({"render_mode": "markdown"}), {"render_mode"})
+
+        self.assertIsNone(self.post.html)
+        self.assertEqual(self.server.render_cache.page_count, 0)
+        self.assertEqual(list(self.server.emails_cache), [self.post])
+        self.assertIn("<em>emphasis</em>", self.server.generate_html())
+
+    async def test_title_change_keeps_rendered_fragments(self):
+        html = self.post.html
+
+        self.assertEqual(self.server.apply_config({"blog_title": "Renamed"}), {"blog_title"})
+
+        self.assertIs(self.post.html, html)
+        self.assertEqual(self.server.render_cache.fragment_count, 1)
+        self.assertIn("Renamed", self.server.generate_html())
+
+    async def test_token_change_keeps_cached_pages(self):
+        generation = self.server.generation
+
+        self.server.apply_config({"access_token": "new-token", "allowed_senders": ["a@b.c"]})
+
+        self.assertEqual(self.server.generation, generation)
+        self.assertEqual(self.server.access_token, "new-token")
+        self.assertEqual(self.server.allowed_senders, ["a@b.c"])
+
+    async def test_invalid_configuration_changes_nothing(self):
+        with self.assertRaisesRegex(ValueError, "PUBLIC_URL"):
+            self.server.apply_config({"blog_title": "Renamed", "public_url": "not a url"})
+        self.assertEqual(self.server.blog_title, "Live Email Blog")
+
+        public = EmailBlogServer(
+            **SETTINGS, host="0.0.0.0", allow_public_bind=True, access_token="token"
+        )
+        with self.assertRaisesRegex(ValueError, "BLOG_ACCESS_TOKEN"):
+            public.apply_config({"blog_title": "Renamed", "access_token": None})
+        self.assertEqual((public.blog_title, public.access_token), ("Live Email Blog", "token"))
+
+    async def test_settings_that_need_a_restart_are_reported(self):
+        with self.assertLogs("email_blog_server", level="WARNING") as logs:
+            changed = self.server.apply_config({**SETTINGS, "port": 9999})
+
+        self.assertEqual(changed, set())
+        self.assertIn("port", logs.output[0])
+        self.assertEqual(self.server.port, 8080)
+
+    async def test_sighup_reload_reconnects_imap_only_for_connection_changes(self):
+        connects = []
+
+        async def monitor_inbox():
+            connects.append(self.server.imap_server)
+            await asyncio.Event().wait()
+
+        self.server.monitor_inbox = monitor_inbox
+        self.server._monitor_task = asyncio.create_task(monitor_inbox())
+        settings = dict(SETTINGS)
+        self.server.config_loader = lambda: settings
+        await asyncio.sleep(0)
+
+        settings["blog_title"] = "Renamed"
+        self.assertTrue(await self.server.reload_config())
+        await asyncio.sleep(0)
+        self.assertEqual(connects, ["imap.example.com"])
+
+        settings["imap_server"] = "imap2.example.com"
+        self.assertTrue(await self.server.reload_config())
+        await asyncio.sleep(0)
+        self.assertEqual(connects, ["imap.example.com", "imap2.example.com"])
+
+        settings["sanitizer"] = "unknown"
+        with self.assertLogs("email_blog_server", level="ERROR"):
+            self.assertFalse(await self.server.reload_config())
+        self.assertEqual(self.server.sanitizer, "bleach")
+        self.server._monitor_task.cancel()
+        await asyncio.gather(self.server._monitor_task, return_exceptions=True)
+
+    async def test_settings_cover_every_constructor_argument(self):
+        parameters = set(inspect.signature(EmailBlogServer.__init__).parameters) - {"self"}
+
+        self.assertEqual(set(self.server._settings), parameters)
+
+    async def test_unchanged_reload_in_worker_mode_needs_no_restart(self):
+        settings = {**SETTINGS, "enable_imap": True}
+        leader = EmailBlogServer(**_leader_kwargs(settings))
+        worker = EmailBlogServer(**_worker_kwargs(settings))
+
+        with self.assertNoLogs("email_blog_server", level="WARNING"):
+            self.assertEqual(leader.apply_config(_leader_kwargs(settings)), set())
+            self.assertEqual(worker.apply_config(_worker_kwargs(settings)), set())
+
+    async def test_workers_apply_forwarded_configuration(self):
+        apply_leader_event(self.server, "reconfigure", {**SETTINGS, "blog_title": "Renamed"})
+
+        self.assertIn("Renamed", self.server.generate_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from helpers import make_post
+
+from email_blog_messages import parse_fetch_message_ids
+from email_blog_server import EmailBlogServer
+from email_blog_store import PostStore
+from email_blog_workers import apply_leader_event
+
+
+def header_fetch(uid: int, message_id: str) -> list:
+    header = f"Message-ID: {message_id}\r\n\r\n".encode()
+    return [
+        f"* {uid} FETCH (UID {uid} BODY[HEADER.FIELDS (MESSAGE-ID)] {{{len(header)}}}".encode(),
+        bytearray(header),
+        b")",
+    ]
+
+
+class FakeImap:
+    """Answer UID SEARCH and header-only UID FETCH for a mailbox of ``{uid: message_id}``."""
+
+    def __init__(self, mailbox: dict[int, str]):
+        self.mailbox = mailbox
+        self.fetches = []
+
+    async def uid(self, command, *args):
+        if command == "SEARCH":
+            return "OK", [" ".join(str(uid) for uid in self.mailbox).encode(), b"Done"]
+        self.fetches.append(args)
+        data = []
+        for uid in args[0].split(","):
+            data += header_fetch(int(uid), self.mailbox[int(uid)])
+        return "OK", data + [b"FETCH completed"]
+
+
+class RemapTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            post_store_path=str(Path(self.tmp.name) / "posts.sqlite3"),
+        )
+        self.addCleanup(lambda: self.server.post_store and self.server.post_store.close())
+        self.server._set_uid_validity("1")
+        for post in (
+            make_post("10", message_id="<a@example.com>"),
+            make_post("11", message_id="<b@example.com>"),
+        ):
+            await self.server._publish_fetched(post.uid, post)
+        await self.server._flush_unsaved_posts()
+
+    async def remap(self, mailbox: dict[int, str]) -> FakeImap:
+        self.server.imap_client = FakeImap(mailbox)
+        self.server._set_uid_validity("2")
+        await self.server._remap_uids()
+        return self.server.imap_client
+
+    async def test_posts_move_to_new_uids_without_rerendering(self):
+        self.server.render_content_to_html = None  # Any re-render would fail.
+        events = []
+        self.server.add_post_listener(lambda event, post: events.append((event, post)))
+
+        imap = await self.remap({1: "<b@example.com>", 2: "<c@example.com>"})
+
+        self.assertEqual(imap.fetches, [("1,2", "(BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])")])
+        self.assertEqual(
+            [(post.uid, post.slug) for post in self.server.emails_cache], [("1", "11")]
+        )
+        self.assertIn("1", self.server.processed_uids)
+        self.assertNotIn("2", self.server.processed_uids)
+        self.assertFalse(self.server._remap_pending)
+        self.assertEqual([event for event, _ in events], ["reset", "restore"])
+        self.assertEqual(self.server.search_index.search("body")[0][0][0], "1")
+
+        resp = await self.server.handle_single_email(SimpleNamespace(match_info={"uid": "11"}))
+        self.assertIn("Post 11", resp.text)
+        with self.assertRaisesRegex(Exception, "Not Found"):
+            await self.server.handle_single_email(SimpleNamespace(match_info={"uid": "10"}))
+
+    async def test_store_follows_the_remap(self):
+        await self.remap({1: "<b@example.com>"})
+
+        store = self.server.post_store
+        self.assertIsNone(store.get("10"))
+        self.assertIsNone(store.get("11"))
+        self.assertEqual(store.get("1").slug, "11")
+        self.assertEqual(store.get_by_slug("11").uid, "1")
+        self.assertEqual(store.get_meta("uid_validity"), "2")
+
+    async def test_uid_validity_change_across_restarts_is_detected_from_the_store(self):
+        await self.server._load_uid_validity("1")
+        restarted = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            post_store_path=str(self.server.post_store.path),
+        )
+        self.addAsyncCleanup(restarted.stop)
+
+        with self.assertLogs("email_blog_imap", level="WARNING"):
+            await restarted._load_uid_validity("2")
+
+        self.assertTrue(restarted._remap_pending)
+        self.assertEqual(self.server.post_store.get_meta("uid_validity"), "1")
+
+    async def test_sync_stores_its_posts_in_one_transaction(self):
+        store = self.server.post_store
+        inserts = []
+        insert_many = store.insert_many
+        store.insert_many = lambda posts: inserts.append(len(posts)) or insert_many(posts)
+
+        await self.server._publish_fetched("12", make_post("12", message_id="<c@example.com>"))
+        await self.server._publish_fetched("13", make_post("13", message_id="<d@example.com>"))
+        self.assertNotIn("12", store)
+        await self.server._flush_unsaved_posts()
+
+        self.assertEqual(inserts, [2])
+        self.assertIn("13", store)
+
+    async def test_reused_uid_gets_a_distinct_slug(self):
+        await self.remap({1: "<b@example.com>", 2: "<c@example.com>"})
+
+        await self.server._publish_fetched("11", make_post("11", message_id="<d@example.com>"))
+
+        self.assertEqual(self.server.emails_cache.get("11").slug, "11-2")
+        self.assertEqual(self.server._slug_uids, {"11": "1", "11-2": "11"})
+
+    async def test_refetched_message_without_message_id_keeps_its_slug(self):
+        await self.server._publish_fetched("12", make_post("12", "No ID", "body"))
+
+        await self.remap({1: "<a@example.com>", 2: "<b@example.com>"})
+        self.assertNotIn("12", self.server.emails_cache)
+
+        await self.server._publish_fetched("3", make_post("3", "No ID", "body"))
+        self.assertEqual(self.server.emails_cache.get("3").slug, "12")
+
+    async def test_workers_restore_remapped_posts(self):
+        worker = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+        for post in reversed(list(self.server.emails_cache)):
+            apply_leader_event(worker, "append", post)
+        self.server.add_post_listener(lambda event, post: apply_leader_event(worker, event, post))
+
+        await self.remap({1: "<a@example.com>", 2: "<b@example.com>"})
+
+        self.assertEqual(
+            [(post.uid, post.slug) for post in worker.emails_cache], [("2", "11"), ("1", "10")]
+        )
+
+
+class MessageIdFetchTests(unittest.TestCase):
+    def test_maps_message_ids_to_uids(self):
+        data = header_fetch(7, "<a@example.com>") + [
+            b"* 8 FETCH (UID 8 BODY[HEADER.FIELDS (MESSAGE-ID)] {2}",
+            bytearray(b"\r\n"),
+            b")",
+            b"FETCH completed",
+        ]
+
+        self.assertEqual(parse_fetch_message_ids(data), {"<a@example.com>": "7"})
+
+
+class StoreMigrationTests(unittest.TestCase):
+    def test_existing_posts_get_their_uid_as_slug(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "posts.sqlite3"
+            db = sqlite3.connect(path)
+            db.execute(
+                "CREATE TABLE posts (uid TEXT PRIMARY KEY, message_id TEXT NOT NULL, "
+                "subject TEXT NOT NULL, sender TEXT NOT NULL, date TEXT NOT NULL, "
+                "timestamp REAL, content_type TEXT NOT NULL, content BLOB NOT NULL, "
+                "source TEXT NOT NULL)"
+            )
+            db.execute(
+                "INSERT INTO posts VALUES ('5', '', 'Old', 'Writer', '', NULL, 'text/plain', "
+                "x'789c030000000001', 'imap')"
+            )
+            db.commit()
+            db.close()
+
+            store = PostStore(path)
+            try:
+                self.assertEqual(store.get_by_slug("5").uid, "5")
+            finally:
+                store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import sys
+import threading
 import unittest
 
+import email_blog_rendering
+from email_blog_rendering import markdown_to_html
 from email_blog_server import EmailBlogServer
 
 
@@ -89,5 +93,64 @@ class RenderModeTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn("line1<br>line2", html)
 
 
+class MarkdownConverterTests(unittest.TestCase):
+    def test_reused_converter_resets_document_state(self):
+        first = markdown_to_html("Note[^1]\n\n[^1]: footnote text")
+        second = markdown_to_html("plain paragraph")
+
+        self.assertIn("footnote text", first)
+        self.assertNotIn("footnote", second)
+        self.assertIn("plain paragraph", second)
+
+    def test_converters_are_per_thread(self):
+        markdown_to_html("warm up")
+        main_converter = email_blog_rendering._converters.by_guess_lang[True]
+        seen = []
+
+        def render():
+            markdown_to_html("other thread")
+            seen.append(email_blog_rendering._converters.by_guess_lang[True])
+
+        thread = threading.Thread(target=render)
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(seen[0], main_converter)
+
+    def test_highlighted_code_blocks_are_cached_by_content(self):
+        source = "```python\nprint('cached block')\n```"
+        email_blog_rendering._highlight_cache.clear()
+
+        first = markdown_to_html(source)
+        cached = dict(email_blog_rendering._highlight_cache)
+        second = markdown_to_html(f"Intro\n\n{source}")
+
+        self.assertEqual(len(cached), 1)
+        self.assertEqual(dict(email_blog_rendering._highlight_cache), cached)
+        self.assertIn("print", first)
+        self.assertIn("print", second)
+
+    def test_highlight_cache_stays_on_this_modules_converters(self):
+        import markdown
+        from markdown.extensions.codehilite import CodeHilite
+
+        source = "```python\nprint('other converter')\n```"
+        email_blog_rendering._highlight_cache.clear()
+        email_blog_rendering._highlight_bytes = 0
+
+        markdown.markdown(source, extensions=email_blog_rendering.MARKDOWN_EXTENSIONS)
+        self.assertEqual(len(email_blog_rendering._highlight_cache), 0)
+        self.assertEqual(CodeHilite.hilite.__qualname__, "CodeHilite.hilite")
+
+        markdown_to_html(source)
+        (cached,) = email_blog_rendering._highlight_cache.values()
+        self.assertEqual(email_blog_rendering._highlight_bytes, sys.getsizeof(cached))
+
+    def test_guess_lang_can_be_disabled(self):
+        html = markdown_to_html("    x = 1 < 2", guess_lang=False)
+
+        self.assertIn("<pre><code>x = 1 &lt; 2", html)
+
+
 if __name__ == "__main__":
     unittest.main()
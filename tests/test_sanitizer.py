@@ -0,0 +1,153 @@
+import unittest
+from html.parser import HTMLParser
+
+from email_blog_rendering import (
+    ALLOWED_ATTRIBUTES,
+    ALLOWED_PROTOCOLS,
+    ALLOWED_TAGS,
+    render_content_to_html,
+    sanitize_html,
+)
+
+# Differential corpus: every entry is sanitized by both engines and both outputs must
+# pass the same safety checks and keep the same visible text.
+CORPUS = [
+    "<b>ok</b><script>alert(1)</script>",
+    "<SCRIPT SRC=http://xss.example/xss.js></SCRIPT>",
+    "<scr<script>ipt>alert(1)</scr</script>ipt>",
+    "<img src=x onerror=alert(1)>",
+    "<svg/onload=alert(1)>",
+    "<body onload=alert(1)>text</body>",
+    '<iframe src="javascript:alert(1)"></iframe>',
+    '<a href="javascript:alert(1)">x</a>',
+    '<a href="JaVaScRiPt:alert(1)">x</a>',
+    '<a href="  javascript:alert(1)">x</a>',
+    '<a href="java\tscript:alert(1)">x</a>',
+    '<a href="java&#x09;script:alert(1)">x</a>',
+    '<a href="&#106;&#97;&#118;&#97;&#115;&#99;&#114;&#105;&#112;&#116;&#58;alert(1)">x</a>',
+    '<a href="jav&#x0A;ascript:alert(1)">x</a>',
+    '<a href="vbscript:msgbox(1)">x</a>',
+    '<a href="data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==">x</a>',
+    '<a href="ftp://files.example.com">ftp</a>',
+    '<a href="http://x.example" onclick="alert(1)" style="color:red">x</a>',
+    '<a href="https://e.example" title="t" rel="me">t</a>',
+    '<a href="/relative/path">r</a>',
+    '<a href="#fragment">f</a>',
+    '<a href="mailto:user@example.com">mail</a>',
+    '<a href="http://a.example"><a href="http://b.example">nested</a></a>',
+    '<p style="background:url(javascript:alert(1))">styled</p>',
+    '<div><span class="x">t</span></div>',
+    "<style>body{background:red}</style>after",
+    "<!-- <script>alert(1)</script> -->visible",
+    "<![CDATA[<script>alert(1)</script>]]>",
+    "<p>a<p>b",
+    "<ul><li>one<li>two</ul>",
+    "<blockquote><p>quoted</blockquote>",
+    "<pre><code>if (a < b) { return; }</code></pre>",
+    "</b>stray end tag",
+    "a < b > c & d",
+    "&lt;script&gt;alert(1)&lt;/script&gt;",
+    "<math><mtext><table><mglyph><style><img src=x onerror=alert(1)>",
+    '<noscript><p title="</noscript><img src=x onerror=alert(1)>">',
+    "<form><button formaction=javascript:alert(1)>x</button></form>",
+    '<object data="javascript:alert(1)"></object>',
+    '<meta http-equiv="refresh" content="0;url=javascript:alert(1)">',
+    "visit http://example.com/a?b=1&c=2 now",
+    "see https://example.com/path).",
+    "<h1>Title</h1><h2>Sub</h2><hr><br/>tail",
+    "<em><strong>nested <u>inline</u></strong></em><s>gone</s>",
+    '<a href="http://x.example" title="&quot;><script>alert(1)</script>">q</a>',
+    "<table><tr><td>cell</td></tr></table>",
+]
+
+# html.parser drops a CDATA section whole; html5lib turns "<![CDATA[...>" into a bogus
+# comment and keeps the rest as text. Both outputs are safe, only the visible text differs.
+TEXT_DIVERGENCES = {"<![CDATA[<script>alert(1)</script>]]>"}
+
+
+class OutputInspector(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements = []
+        self.text = []
+        self.comments = []
+
+    def handle_starttag(self, tag, attrs):
+        self.elements.append((tag, dict(attrs)))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def handle_comment(self, data):
+        self.comments.append(data)
+
+
+def inspect(html_out):
+    parser = OutputInspector()
+    parser.feed(html_out)
+    parser.close()
+    return parser
+
+
+def visible_text(html_out):
+    return " ".join("".join(inspect(html_out).text).split())
+
+
+class SanitizerSafetyTests(unittest.TestCase):
+    def assert_safe(self, html_out, source):
+        parsed = inspect(html_out)
+        self.assertEqual(parsed.comments, [], source)
+        for tag, attrs in parsed.elements:
+            self.assertIn(tag, ALLOWED_TAGS, source)
+            allowed = set(ALLOWED_ATTRIBUTES.get(tag, []))
+            if tag == "a":
+                allowed.add("target")
+            self.assertLessEqual(set(attrs), allowed, source)
+            href = attrs.get("href")
+            if href and ":" in href.split("/", 1)[0]:
+                scheme = "".join(href.split(":", 1)[0].split()).lower()
+                self.assertIn(scheme, ALLOWED_PROTOCOLS, source)
+
+    def test_engines_are_equally_safe_on_corpus(self):
+        for source in CORPUS:
+            with self.subTest(source=source):
+                bleach_out = sanitize_html(source, "bleach")
+                stdlib_out = sanitize_html(source, "stdlib")
+                self.assert_safe(bleach_out, source)
+                self.assert_safe(stdlib_out, source)
+                if source not in TEXT_DIVERGENCES:
+                    self.assertEqual(visible_text(stdlib_out), visible_text(bleach_out))
+
+    def test_engines_agree_on_allowed_markup(self):
+        for source in (
+            "<b>ok</b><script>alert(1)</script>",
+            '<a href="http://x.example" onclick="y">x</a>',
+            '<a href="mailto:user@example.com">mail</a>',
+            '<a href="https://e.example" title="t" rel="me">t</a>',
+            "visit http://example.com/a?b=1&c=2 now",
+            "<p>a<p>b",
+            "<ul><li>one<li>two</ul>",
+            "<pre>http://not.linked.example</pre>",
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(sanitize_html(source, "stdlib"), sanitize_html(source, "bleach"))
+
+    def test_stdlib_output_is_well_formed(self):
+        self.assertEqual(
+            sanitize_html("<blockquote><em>open", "stdlib"),
+            "<blockquote><em>open</em></blockquote>",
+        )
+
+    def test_render_mode_uses_selected_sanitizer(self):
+        html_out = render_content_to_html(
+            "<b>x</b><script>y</script>", "text/html", "auto", sanitizer="stdlib"
+        )
+
+        self.assertEqual(html_out, "<b>x</b>y")
+
+
+if __name__ == "__main__":
+    unittest.main()
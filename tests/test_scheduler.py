@@ -0,0 +1,98 @@
+import asyncio
+import time
+import unittest
+from email.message import EmailMessage
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from email_blog_scheduler import IngestScheduler
+from email_blog_server import EmailBlogServer
+
+SYNC_MESSAGES = 1000
+
+
+def raw_message(uid: int) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = "writer@example.com"
+    msg["Subject"] = f"Post {uid}"
+    msg["Date"] = "Mon, 01 Jan 2024 00:00:00 +0000"
+    msg["Message-ID"] = f"<post-{uid}@example.com>"
+    msg.set_content(f"Paragraph for post {uid}. " * 40)
+    return msg.as_bytes()
+
+
+class FakeImapServer:
+    """Answers UID SEARCH and FETCH instantly from memory, like a fast local server."""
+
+    def __init__(self, count: int):
+        self.messages = {str(uid): raw_message(uid) for uid in range(1, count + 1)}
+
+    async def uid(self, command, *args):
+        if command == "SEARCH":
+            return "OK", [" ".join(self.messages).encode()]
+        uid, spec = args
+        raw = self.messages[uid]
+        if spec == "(RFC822.SIZE)":
+            return "OK", [f"1 (UID {uid} RFC822.SIZE {len(raw)})".encode()]
+        return "OK", [f"1 FETCH (UID {uid} BODY[] {{{len(raw)}}}".encode(), raw, b")"]
+
+    def has_pending_idle(self):
+        return False
+
+    async def logout(self):
+        return "OK", []
+
+
+class IngestSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_checkpoint_yields_once_the_budget_is_spent(self):
+        scheduler = IngestScheduler(lambda: False, tick_budget=0.005)
+
+        await scheduler.checkpoint()
+        self.assertEqual(scheduler.yields, 0)
+        time.sleep(0.01)
+        await scheduler.checkpoint()
+        self.assertEqual(scheduler.yields, 1)
+
+    async def test_checkpoint_defers_to_http_for_at_most_max_defer(self):
+        busy = True
+        scheduler = IngestScheduler(lambda: busy, tick_budget=1.0, max_defer=0.03)
+
+        started = time.perf_counter()
+        await scheduler.checkpoint()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.03)
+
+        busy = False
+        await scheduler.checkpoint()
+        self.assertEqual(scheduler.yields, 1)
+        self.assertGreaterEqual(scheduler.deferred, 0.03)
+
+
+class SyncLatencyTests(unittest.IsolatedAsyncioTestCase):
+    async def test_http_p99_stays_bounded_during_bulk_sync(self):
+        server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            ingest_parse_concurrency=2,
+        )
+        server.imap_client = FakeImapServer(SYNC_MESSAGES)
+        client = TestClient(TestServer(server.app))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        self.addAsyncCleanup(server.stop)
+
+        sync = asyncio.create_task(server._fetch_new_uids())
+        latencies = []
+        while not sync.done():
+            started = time.perf_counter()
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - started)
+            self.assertEqual(response.status, 200)
+        await sync
+
+        self.assertEqual(len(server._emails()), SYNC_MESSAGES)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        self.assertGreater(len(latencies), 50)
+        self.assertLess(p99, 0.05, f"p99 {p99 * 1000:.1f} ms over {len(latencies)} requests")
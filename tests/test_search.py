@@ -0,0 +1,188 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from helpers import make_post
+
+from email_blog_search import SearchIndex, analyze, tokenize, write_snapshot
+from email_blog_server import EmailBlogServer
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_tokenize_casefolds_and_drops_stopwords(self):
+        self.assertEqual(tokenize("The Quick, quick FOX"), ["quick", "quick", "fox"])
+
+    def test_ranks_subject_and_frequent_matches_first(self):
+        index = SearchIndex()
+        index.add(make_post("1", "Weekly notes", "nothing about gardens"))
+        index.add(make_post("2", "Gardens", "tomatoes and gardens"))
+        index.add(make_post("3", "Misc", "unrelated"))
+
+        hits, total = index.search("gardens")
+
+        self.assertEqual(total, 2)
+        self.assertEqual([uid for uid, _ in hits], ["2", "1"])
+
+    def test_indexes_sender_and_html_text_only(self):
+        index = SearchIndex()
+        index.add(
+            make_post(
+                "1",
+                "Hello",
+                "<p>visible <b>words</b></p><script>hidden()</script>",
+                content_type="text/html",
+                sender="Alice <alice@example.com>",
+            )
+        )
+
+        self.assertEqual(index.search("alice")[1], 1)
+        self.assertEqual(index.search("words")[1], 1)
+        self.assertEqual(index.search("hidden")[1], 0)
+        self.assertEqual(index.search("script")[1], 0)
+
+    def test_remove_and_limit(self):
+        index = SearchIndex()
+        for uid in ("1", "2", "3"):
+            index.add(make_post(uid, "Shared", f"shared topic {uid}"))
+        index.search("shared")
+        index.remove("2")
+
+        hits, total = index.search("shared", limit=1)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(len(hits), 1)
+        self.assertNotIn("2", index)
+
+    def test_pruned_top_hits_match_the_full_ranking(self):
+        rng = random.Random(7)
+        words = [f"w{number}" for number in range(60)] + ["common"] * 20
+        index = SearchIndex()
+        for uid in range(300):
+            index.add(make_post(uid, "Post", " ".join(rng.choices(words, k=rng.randint(5, 60)))))
+
+        for query in ("common", "w1 common", "w1 w2 w3 common", "w7 w40 w59"):
+            full, total = index.search(query)
+            with self.subTest(query=query):
+                self.assertEqual(index.search(query, limit=10), (full[:10], total))
+
+    def test_add_uses_terms_analyzed_at_parse_time(self):
+        index = SearchIndex()
+        post = make_post("1", "Parsed", "analyzed words")
+        post.search_document = analyze(post)
+
+        index.add(post)
+
+        self.assertIsNone(post.search_document)
+        self.assertEqual(index.search("analyzed")[1], 1)
+
+    def test_save_and_load_round_trip(self):
+        index = SearchIndex()
+        index.uid_validity = "42"
+        index.add(make_post("1", "Persisted", "durable words"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            index.save(path)
+            loaded = SearchIndex()
+
+            self.assertTrue(loaded.load(path))
+
+        self.assertEqual(loaded.uid_validity, "42")
+        self.assertEqual(loaded.search("durable"), index.search("durable"))
+
+    def test_snapshot_is_detached_from_later_changes(self):
+        index = SearchIndex()
+        index.add(make_post("1", "Kept", "snapshot words"))
+        snapshot = index.snapshot()
+        index.remove("1")
+        index.add(make_post("2", "Later", "newer words"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            write_snapshot(path, snapshot)
+            loaded = SearchIndex()
+            loaded.load(path)
+
+        self.assertIn("1", loaded)
+        self.assertNotIn("2", loaded)
+
+    def test_load_ignores_missing_or_corrupt_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            self.assertFalse(SearchIndex().load(path))
+            path.write_text("{not json")
+            self.assertFalse(SearchIndex().load(path))
+
+
+class SearchEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+
+    async def test_search_page_lists_matches_and_escapes_query(self):
+        self.server._append_email(make_post("1", "Gardening", "tomatoes everywhere"))
+        self.server._append_email(make_post("2", "Cooking", "pasta"))
+        request = SimpleNamespace(headers={}, query={"q": "tomatoes <b>"})
+
+        resp = await self.server.handle_search(request)
+
+        self.assertIn("Gardening", resp.text)
+        self.assertNotIn("Cooking", resp.text)
+        self.assertIn("1 result for", resp.text)
+        self.assertIn('value="tomatoes &lt;b&gt;"', resp.text)
+        self.assertNotIn("<b>", resp.text)
+
+    async def test_search_is_paginated(self):
+        for uid in range(25):
+            self.server._append_email(make_post(str(uid), f"Post {uid}", "common topic"))
+        request = SimpleNamespace(headers={}, query={"q": "topic", "page": "2"})
+
+        resp = await self.server.handle_search(request)
+
+        self.assertEqual(resp.text.count("<article>"), 5)
+        self.assertIn("Page 2 of 2", resp.text)
+        self.assertIn('href="/search?q=topic&amp;page=1"', resp.text)
+
+    async def test_eviction_and_reset_remove_index_entries(self):
+        server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            post_cache_max_bytes=1,
+        )
+        server._append_email(make_post("1", "Old", "evicted words"))
+        server._append_email(make_post("2", "New", "kept words"))
+
+        self.assertEqual(server.search_index.search("evicted")[1], 0)
+        server._set_uid_validity("1")
+        server._set_uid_validity("2")
+        server._reattach_posts({})
+        self.assertEqual(len(server.search_index), 0)
+
+    async def test_ingest_schedules_one_save_and_stop_writes_it(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "search.json"
+            self.server.search_index_path = str(path)
+            self.server._append_email(make_post("1", "Saved", "persistent words"))
+
+            await self.server._after_ingest()
+            pending = self.server._search_save_task
+            await self.server._after_ingest()
+
+            self.assertIs(self.server._search_save_task, pending)
+            self.assertFalse(path.exists())
+            await self.server.stop()
+            self.assertTrue(pending.cancelled())
+
+            restored = SearchIndex()
+            self.assertTrue(restored.load(path))
+            self.assertEqual(restored.search("persistent")[1], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -162,7 +162,7 @@ class EmailBlogServerTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertIsNone(server._runner)
 
-    async def test_uid_validity_change_clears_instance_state(self):
+    async def test_uid_validity_change_schedules_uid_remap(self):
         self.server.uid_validity = "1"
         self.server.processed_uids.add("10")
         self.server.emails_cache.appendleft(
@@ -179,8 +179,9 @@ class EmailBlogServerTests(unittest.IsolatedAsyncioTestCase):
             self.server._set_uid_validity("2")
 
         self.assertEqual(self.server.uid_validity, "2")
-        self.assertEqual(list(self.server.emails_cache), [])
+        self.assertEqual([post.uid for post in self.server.emails_cache], ["10"])
         self.assertEqual(self.server.processed_uids, set())
+        self.assertTrue(self.server._remap_pending)
 
 
 if __name__ == "__main__":
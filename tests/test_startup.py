@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("markdown", "bleach", "html5lib", "pygments")
+# About twice the measured cold import (roughly 400 ms), so an eager heavy import trips it.
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "800"))
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def cumulative_import_us(stderr: str, module: str) -> int:
+    """Return the cumulative -X importtime figure for a top-level module."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line.split("|"))
+        if name == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+class StartupTests(unittest.TestCase):
+    def test_server_modules_do_not_import_heavy_renderers(self):
+        result = run_python(
+            "-c",
+            "import sys\n"
+            "import email_blog_server, email_blog_workers\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_plain_mode_does_not_import_heavy_renderers(self):
+        result = run_python(
+            "-c",
+            "import sys\n"
+            "from email_blog_rendering import render_content_to_html\n"
+            "import email_blog_server\n"
+            "render_content_to_html('<b>x</b>', 'text/html', 'plain')\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_import_time_within_budget(self):
+        result = run_python("-X", "importtime", "-c", "import email_blog_server")
+
+        elapsed_ms = cumulative_import_us(result.stderr, "email_blog_server") / 1000
+        self.assertLess(
+            elapsed_ms,
+            IMPORT_TIME_BUDGET_MS,
+            f"email_blog_server import took {elapsed_ms:.1f} ms "
+            f"(budget {IMPORT_TIME_BUDGET_MS} ms, set IMPORT_TIME_BUDGET_MS to adjust)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
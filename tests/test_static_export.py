@@ -0,0 +1,129 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from helpers import make_post
+
+from email_blog_server import EmailBlogServer
+from email_blog_static import StaticSiteExporter
+
+TEMPLATE = Path(__file__).resolve().parents[1] / "templates" / "blog_template.html"
+
+
+class StaticExportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.out = Path(self.tmp.name)
+        self.exporter = StaticSiteExporter(
+            self.out, TEMPLATE, "Static Blog", "https://blog.example.com", "plain", page_size=2
+        )
+
+    def test_export_writes_pages_feed_and_gzip_siblings(self):
+        posts = [
+            make_post(3, date="Mon, 03 Jan 2024 12:34:56 +0000"),
+            make_post(2, date="Mon, 02 Jan 2024 12:34:56 +0000"),
+            make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000"),
+        ]
+
+        changed = self.exporter.export(posts)
+
+        self.assertEqual(
+            set(changed),
+            {
+                "index.html",
+                "page/2.html",
+                "email/1.html",
+                "email/2.html",
+                "email/3.html",
+                "feed.xml",
+            },
+        )
+        index = (self.out / "index.html").read_bytes()
+        self.assertEqual(gzip.decompress((self.out / "index.html.gz").read_bytes()), index)
+        self.assertIn(b"Post 3", index)
+        self.assertIn(b'href="/page/2"', index)
+        self.assertIn(b"https://blog.example.com/email/1", (self.out / "feed.xml").read_bytes())
+
+    def test_unchanged_files_are_not_rewritten(self):
+        posts = [
+            make_post(2, date="Mon, 02 Jan 2024 12:34:56 +0000"),
+            make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000"),
+        ]
+        self.exporter.export(posts)
+
+        self.assertEqual(self.exporter.export(posts), [])
+
+        fresh = StaticSiteExporter(
+            self.out, TEMPLATE, "Static Blog", "https://blog.example.com", "plain", page_size=2
+        )
+        self.assertEqual(fresh.export(posts), [])
+
+    def test_new_post_rewrites_listing_but_not_existing_permalinks(self):
+        self.exporter.export([make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000")])
+
+        changed = self.exporter.export(
+            [
+                make_post(2, date="Mon, 02 Jan 2024 12:34:56 +0000"),
+                make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000"),
+            ]
+        )
+
+        self.assertEqual(set(changed), {"index.html", "email/2.html", "feed.xml"})
+
+    def test_export_renders_only_files_whose_posts_changed(self):
+        posts = [
+            make_post(2, date="Mon, 02 Jan 2024 12:34:56 +0000"),
+            make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000"),
+        ]
+        self.exporter.export(posts)
+        rendered = []
+        render = self.exporter._render_permalink
+        self.exporter._render_permalink = lambda post: rendered.append(post.uid) or render(post)
+
+        self.exporter.export([make_post(3, date="Mon, 03 Jan 2024 12:34:56 +0000"), *posts])
+        self.assertEqual(rendered, ["3"])
+
+        self.exporter.invalidate()
+        self.exporter.export([make_post(3, date="Mon, 03 Jan 2024 12:34:56 +0000"), *posts])
+        self.assertEqual(rendered, ["3", "3", "2", "1"])
+
+    def test_stale_archive_pages_are_removed(self):
+        self.exporter.export(
+            [
+                make_post(3, date="Mon, 03 Jan 2024 12:34:56 +0000"),
+                make_post(2, date="Mon, 02 Jan 2024 12:34:56 +0000"),
+                make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000"),
+            ]
+        )
+
+        self.exporter.export([make_post(1, date="Mon, 01 Jan 2024 12:34:56 +0000")])
+
+        self.assertFalse((self.out / "page" / "2.html").exists())
+        self.assertFalse((self.out / "page" / "2.html.gz").exists())
+        self.assertTrue((self.out / "email" / "3.html").exists())
+
+
+class ServerStaticExportTests(unittest.IsolatedAsyncioTestCase):
+    async def test_ingest_exports_without_http(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = EmailBlogServer(
+                imap_server="imap.example.com",
+                email_addr="user@example.com",
+                password="secret",
+                enable_imap=False,
+                serve_http=False,
+                static_dir=tmp,
+            )
+            await server.start(register_signals=False)
+            server._append_email(make_post(7))
+            await server._after_ingest()
+            await server.stop()
+
+            self.assertIsNone(server._runner)
+            self.assertIn("Post 7", (Path(tmp) / "email" / "7.html").read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from email_blog_server import EmailBlogServer
+from email_blog_trace import NULL_SPAN, CommandTracer
+
+
+class FakeImapClient:
+    async def uid(self, command, uid, parts):
+        if parts == "(RFC822.SIZE)":
+            return "OK", [b"1 FETCH (UID 7 RFC822.SIZE 12)", b"Success"]
+        return "OK", [b"1 FETCH (UID 7 BODY[] {12}", bytearray(b"Subject: x\r\n"), b")", b"OK"]
+
+
+class CommandTracerTests(unittest.TestCase):
+    def test_disabled_tracer_hands_out_the_shared_null_span(self):
+        tracer = CommandTracer()
+
+        self.assertFalse(tracer.enabled)
+        self.assertIs(tracer.command("UID FETCH", "1"), NULL_SPAN)
+        self.assertIs(tracer.stage("parse"), NULL_SPAN)
+
+    def test_records_uid_range_bytes_and_status(self):
+        tracer = CommandTracer(buffer_size=2)
+
+        with tracer.command("UID FETCH", "1,2,3") as span:
+            span.record("OK", [b"abc", bytearray(b"de")])
+        with self.assertRaises(TimeoutError), tracer.command("UID SEARCH"):
+            raise TimeoutError
+        with tracer.stage("sync", ["4", "5"]):
+            pass
+
+        self.assertEqual(
+            [(r["name"], r["uids"], r["count"], r["status"]) for r in tracer.records],
+            [("UID SEARCH", None, 0, "TimeoutError"), ("sync", "4:5", 2, None)],
+        )
+        self.assertEqual(tracer.summary()["UID FETCH"]["bytes"], 5)
+        self.assertEqual(tracer.summary()["UID FETCH"]["count"], 1)
+
+    def test_slow_commands_are_logged_but_stages_are_not(self):
+        tracer = CommandTracer(slow_ms=1)
+        tracer.slow_ms = 0.0001  # Anything measurable is slow.
+
+        with self.assertLogs("email_blog_trace", level="WARNING") as logs:
+            with tracer.command("SELECT"):
+                sum(range(10_000))
+            with tracer.stage("sync"):
+                sum(range(10_000))
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("SELECT", logs.output[0])
+        self.assertEqual(tracer.slow_total, 1)
+
+    def test_writes_json_lines_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "imap-trace.jsonl"
+            tracer = CommandTracer(path=str(path))
+            with tracer.command("LOGIN"):
+                pass
+            with tracer.command("SELECT"):
+                pass
+            tracer.close()
+
+            lines = path.read_text().splitlines()
+
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["LOGIN", "SELECT"])
+
+    def test_file_is_written_off_the_calling_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tracer = CommandTracer(path=str(Path(tmp) / "imap-trace.jsonl"))
+            (file_handler,) = tracer._writer.handlers
+            writers = []
+            emit = file_handler.emit
+
+            def recording_emit(record):
+                writers.append(threading.current_thread())
+                emit(record)
+
+            file_handler.emit = recording_emit
+
+            with tracer.command("NOOP"):
+                pass
+            tracer.close()
+            tracer.close()
+
+        self.assertEqual(len(writers), 1)
+        self.assertIsNot(writers[0], threading.current_thread())
+
+
+class TraceEndpointTests(unittest.IsolatedAsyncioTestCase):
+    async def start(self, **kwargs) -> TestClient:
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+            **kwargs,
+        )
+        client = TestClient(TestServer(self.server.app))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        return client
+
+    async def test_fetch_commands_are_traced_and_served_to_admins(self):
+        client = await self.start(imap_trace_buffer=10, admin_token="admin-secret")
+
+        body = await self.server._fetch_message_bytes("7", client=FakeImapClient())
+        self.assertEqual(body, b"Subject: x\r\n")
+
+        response = await client.get("/admin/trace")
+        self.assertEqual(response.status, 401)
+        response = await client.get(
+            "/admin/trace?limit=1", headers={"Authorization": "Bearer admin-secret"}
+        )
+        self.assertEqual(response.status, 200)
+        report = await response.json()
+        self.assertEqual(
+            [(span["name"], span["uids"]) for span in report["spans"]],
+            [("UID FETCH (BODY.PEEK[])", "7")],
+        )
+        self.assertEqual(report["spans"][0]["bytes"], 41)
+        self.assertEqual(report["summary"]["UID FETCH (RFC822.SIZE)"]["count"], 1)
+
+    async def test_endpoint_needs_an_admin_token(self):
+        client = await self.start(imap_trace_buffer=10, access_token="reader")
+
+        response = await client.get("/admin/trace", headers={"Authorization": "Bearer reader"})
+
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import asyncio
+import socket
+import threading
+import unittest
+
+import aiohttp
+from helpers import make_post
+
+from email_blog_server import EmailBlogServer
+from email_blog_workers import (
+    RESTART_BACKOFF,
+    RESTART_LIMIT,
+    RESTART_STABLE_SECONDS,
+    RESTART_WINDOW,
+    WorkerPool,
+    _WorkerChannel,
+    apply_leader_event,
+    run_leader,
+)
+
+
+class StuckPipe:
+    """A pipe whose reader never drains it: every send blocks until released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.closed = False
+
+    def send(self, message):
+        self.released.wait()
+        raise BrokenPipeError
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProcess:
+    name = "email-blog-http-0"
+
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LeaderEventTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+
+    async def test_append_event_invalidates_cached_pages(self):
+        self.assertNotIn("Post 1", self.server.generate_html())
+        generation = self.server.generation
+
+        apply_leader_event(self.server, "append", make_post(1, html="<p>pre-rendered</p>"))
+
+        self.assertGreater(self.server.generation, generation)
+        page = self.server.generate_html()
+        self.assertIn("Post 1", page)
+        self.assertIn("<p>pre-rendered</p>", page)
+
+    async def test_backfilled_posts_reach_workers_as_restore_events(self):
+        leader = EmailBlogServer(
+            imap_server="imap.example.com",
+            email_addr="user@example.com",
+            password="secret",
+            enable_imap=False,
+        )
+        leader.add_post_listener(lambda event, post: apply_leader_event(self.server, event, post))
+        apply_leader_event(leader, "append", make_post(3))
+
+        await leader._publish_backfilled([make_post(2), make_post(1)])
+
+        self.assertEqual([post.uid for post in self.server._emails()], ["3", "2", "1"])
+        self.assertIn("Post 1", self.server.generate_html())
+
+    async def test_reset_event_clears_posts(self):
+        apply_leader_event(self.server, "append", make_post(1))
+        self.server.generate_rss()
+
+        apply_leader_event(self.server, "reset", None)
+
+        self.assertEqual(list(self.server.emails_cache), [])
+        self.assertNotIn("Post 1", self.server.generate_rss())
+
+
+class WorkerPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_workers_share_port_and_receive_broadcasts(self):
+        port = free_port()
+        pool = WorkerPool(
+            {
+                "imap_server": "imap.example.com",
+                "email_addr": "user@example.com",
+                "password": "secret",
+                "host": "127.0.0.1",
+                "port": port,
+                "enable_imap": False,
+                "reuse_port": True,
+            },
+            workers=2,
+        )
+        pool.start([make_post(1)])
+        self.addCleanup(pool.stop)
+
+        async with aiohttp.ClientSession() as session:
+            await self._wait_for(session, port, "Post 1")
+            pool.broadcast("append", make_post(2))
+            for _ in range(4):
+                await self._wait_for(session, port, "Post 2")
+
+    async def test_worker_that_stops_reading_is_terminated(self):
+        pool = WorkerPool({}, workers=1)
+        pipe, process = StuckPipe(), FakeProcess()
+        pool._processes[0] = process
+        pool._channels[0] = _WorkerChannel(pipe, process.name, max_pending=2)
+
+        for uid in range(4):
+            pool.broadcast("append", make_post(uid))  # Never blocks the caller.
+
+        self.assertFalse(process.alive)
+        self.assertIsNone(pool._channels[0])
+        pipe.released.set()
+        for _ in range(100):
+            if pipe.closed:
+                break
+            await asyncio.sleep(0.01)
+        self.assertTrue(pipe.closed)
+
+    async def test_leader_refuses_endpoints_the_workers_cannot_serve(self):
+        settings = {"imap_server": "imap.example.com", "email_addr": "u", "password": "p"}
+
+        with self.assertRaisesRegex(ValueError, "INGEST_TOKEN and ADMIN_TOKEN .* WEB_WORKERS"):
+            await run_leader({**settings, "ingest_token": "push", "admin_token": "admin"}, 2)
+        with self.assertRaisesRegex(ValueError, "^ADMIN_TOKEN"):
+            await run_leader({**settings, "admin_token": "admin"}, 2)
+
+    def test_crashing_worker_restarts_with_backoff_and_a_rate_limit(self):
+        pool = WorkerPool({}, workers=1)
+        now = 1000.0
+
+        delays = []
+        for _ in range(3):
+            pool._started[0] = now
+            delays.append(pool._restart_delay(0, now + 1))
+        self.assertEqual(delays, [RESTART_BACKOFF, RESTART_BACKOFF * 2, RESTART_BACKOFF * 4])
+
+        pool._started[0] = now
+        self.assertEqual(pool._restart_delay(0, now + RESTART_STABLE_SECONDS), 0)
+
+        pool._restarts[0].extend([now] * RESTART_LIMIT)
+        pool._started[0] = now
+        # RESTART_LIMIT restarts at ``now``: the next waits until the first leaves the window.
+        self.assertEqual(
+            pool._restart_delay(0, now + RESTART_STABLE_SECONDS),
+            RESTART_WINDOW - RESTART_STABLE_SECONDS,
+        )
+
+    async def _wait_for(self, session, port, text):
+        for _ in range(200):
+            try:
+                async with session.get(f"http://127.0.0.1:{port}/") as resp:
+                    if text in await resp.text():
+                        return
+            except aiohttp.ClientConnectionError:
+                pass
+            await asyncio.sleep(0.05)
+        self.fail(f"{text!r} never served")
+
+
+if __name__ == "__main__":
+    unittest.main()